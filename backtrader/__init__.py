@@ -59,6 +59,8 @@ from .writer import *
 
 from .signal import *
 
+from .executor import *
+from .indcache import *
 from .cerebro import *
 from .timer import *
 from .flt import *
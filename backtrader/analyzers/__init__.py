@@ -41,3 +41,7 @@ from .logreturnsrolling import *
 
 from .calmar import *
 from .periodstats import *
+
+from .profile import *
+from .equity import *
+from .pruner import *
@@ -58,8 +58,10 @@ class AnnualReturn(Analyzer):
         self.rets = list()
         self.ret = OrderedDict()
 
+        # decode all timestamps in one go
+        dts = self.data.datetime.datetimes(size=len(self.data))
         for i in range(len(self.data) - 1, -1, -1):
-            dt = self.data.datetime.date(-i)
+            dt = dts[-1 - i].date()
             value_cur = self.strategy.stats.broker.value[-i]
 
             if dt.year > cur_year:
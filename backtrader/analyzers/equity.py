@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from backtrader import Analyzer
+from backtrader.utils import AutoOrderedDict
+
+
+__all__ = ['EquityCurve']
+
+
+class EquityCurve(Analyzer):
+    '''Records on each bar (``prenext`` included) the datetime, cash, value
+    and position size of the strategy in ``numpy`` arrays, sized for the
+    whole data in advance if it is preloaded, and calculates the performance
+    figures of the resulting equity curve at the end of the run
+
+    Params:
+
+      - ``data`` (default: ``None``)
+
+        Data whose datetime and position are recorded. ``None`` for the 1st
+        data of the strategy
+
+      - ``factor`` (default: ``None``)
+
+        Number of bars per year, to annualize the figures. If ``None`` it is
+        estimated from the recorded datetimes (bars per 365 days)
+
+      - ``riskfreerate`` (default: ``0.0``)
+
+        Annual rate, converted to a rate per bar with ``factor``
+
+    Methods:
+
+      - get_analysis
+
+        Returns a dictionary with the keys:
+
+          - ``len``: number of recorded bars
+          - ``start``, ``end``: first and last recorded value
+          - ``totalreturn``: ``end / start - 1``
+          - ``annualreturn``: compounded annual return
+          - ``sharpe``, ``sortino``: annualized ratios of the returns per bar
+            (in excess of the risk free rate). The *Sortino* ratio uses the
+            downside deviation
+          - ``maxdrawdown``: largest fall of the value from a previous peak
+            (as a fraction of the peak)
+          - ``calmar``: ``annualreturn / maxdrawdown``
+          - ``factor``: bars per year used for the annual figures
+
+        Figures which cannot be calculated (ex: no variation) are ``None``
+
+      - get_arrays
+
+        Returns a 2D ``numpy`` array with one row per bar and the columns
+        ``datetime`` (as a float), ``cash``, ``value`` and ``position``
+
+      - get_dataframe
+
+        Returns a ``pandas.DataFrame`` indexed by datetime with the columns
+        ``cash``, ``value`` and ``position``. The values are not copied: the
+        frame is a view on the recorded arrays
+    '''
+    params = (
+        ('data', None),
+        ('factor', None),
+        ('riskfreerate', 0.0),
+    )
+
+    Columns = ('datetime', 'cash', 'value', 'position')
+
+    def create_analysis(self):
+        self.rets = AutoOrderedDict()
+
+    def start(self):
+        import numpy as np  # keep the import very local
+
+        self._data = self.p.data
+        if self._data is None:
+            self._data = self.strategy.data
+
+        # a preloaded data knows already how many bars will come
+        size = max(self._data.buflen(), 256)
+        self._rows = np.empty((size, len(self.Columns)))
+        self._len = 0
+
+    def next(self):
+        rows = self._rows
+        if self._len == len(rows):  # not preloaded (or growing): double
+            import numpy as np  # keep the import very local
+            rows = self._rows = np.concatenate((rows, np.empty_like(rows)))
+
+        broker = self.strategy.broker
+        rows[self._len] = (self._data.datetime[0],
+                           broker.getcash(), broker.getvalue(),
+                           self.strategy.getposition(self._data).size)
+        self._len += 1
+
+    def get_arrays(self):
+        return self._rows[:self._len]
+
+    def get_dataframe(self):
+        import pandas as pd  # keep the import very local
+        from backtrader.utils.dateintern import num2dtarray
+
+        rows = self.get_arrays()
+        index = pd.DatetimeIndex(num2dtarray(rows[:, 0]), name='datetime')
+        return pd.DataFrame(rows[:, 1:], index=index,
+                            columns=self.Columns[1:], copy=False)
+
+    def stop(self):
+        import numpy as np  # keep the import very local
+
+        rows = self.get_arrays()
+        dts, values = rows[:, 0], rows[:, 2]
+
+        self.rets.len = n = len(values)
+        if not n:
+            self.rets._close()
+            return
+
+        start, end = float(values[0]), float(values[-1])
+        self.rets.start = start
+        self.rets.end = end
+        self.rets.totalreturn = end / start - 1.0 if start else None
+
+        factor = self.p.factor
+        if factor is None and n > 1 and dts[-1] > dts[0]:
+            factor = float((n - 1) * 365.0 / (dts[-1] - dts[0]))  # in days
+
+        self.rets.factor = factor
+
+        annualreturn = None
+        if factor and n > 1 and start > 0.0 and end > 0.0:
+            annualreturn = (end / start) ** (factor / (n - 1)) - 1.0
+
+        self.rets.annualreturn = annualreturn
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = values[1:] / values[:-1] - 1.0
+
+        sharpe = sortino = None
+        if factor and len(returns) > 1:
+            rate = (1.0 + self.p.riskfreerate) ** (1.0 / factor) - 1.0
+            excess = returns - rate
+            mean = excess.mean()
+
+            stddev = excess.std(ddof=1)
+            if stddev > 0.0:
+                sharpe = float(mean / stddev * factor ** 0.5)
+
+            downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2))
+            if downside > 0.0:
+                sortino = float(mean / downside * factor ** 0.5)
+
+        self.rets.sharpe = sharpe
+        self.rets.sortino = sortino
+
+        peaks = np.maximum.accumulate(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            maxdrawdown = float(np.nanmax(1.0 - values / peaks))
+
+        self.rets.maxdrawdown = maxdrawdown
+        if annualreturn is not None and maxdrawdown > 0.0:
+            self.rets.calmar = annualreturn / maxdrawdown
+        else:
+            self.rets.calmar = None
+
+        self.rets._close()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from backtrader import Analyzer
+from backtrader.utils import AutoOrderedDict
+
+
+__all__ = ['Profile']
+
+
+class Profile(Analyzer):
+    '''Reports where the wall time of the run loop went, per component of the
+    strategy. It is added automatically to each strategy (with the name
+    ``profile``) when running with ``cerebro.run(profile=True)`` and delivers
+    nothing if profiling is not active
+
+    The components are grouped in the categories ``preload`` (of the datas,
+    before the loop starts), ``datas`` (loading and advancing), ``broker``,
+    ``strategy`` (the ``prenext``/``nextstart``/``next`` methods),
+    ``notifications`` (delivery of orders, trades, cash and value),
+    ``indicators``, ``observers``, ``analyzers`` and ``writers``. Indicators
+    created by other indicators (and by observers) are named after the owner,
+    for example ``MACD.EMA#1``. The datas, broker and writers are shared by
+    all strategies
+
+    Methods:
+
+      - get_analysis
+
+        Returns a dictionary with the keys:
+
+          - ``total``: wall time of the run loop (seconds)
+          - ``other``: part of ``total`` not charged to any component
+            (synchronization of the datas, clocks, timers)
+          - one per category, holding one entry per component with the keys
+            ``calls``, ``tottime`` (time spent in the component itself,
+            excluding other profiled components it calls), ``cumtime``
+            (including them), ``percall`` (``tottime`` per call) and ``pct``
+            (``tottime`` as percentage of ``total``). The components are
+            sorted by descending ``tottime``
+    '''
+    _noprofile = True  # not charged to itself
+
+    def create_analysis(self):
+        self.rets = AutoOrderedDict()
+
+    def stop(self):
+        profiler = getattr(self.strategy.env, '_profiler', None)
+        if profiler is None:
+            return
+
+        total = profiler.total
+        self.rets.total = total
+
+        charged = 0.0
+        stats = sorted(profiler.getstats(self.strategy),
+                       key=lambda x: (profiler.Categories.index(x[0]),
+                                      -x[2].tottime))
+        for category, name, stat in stats:
+            if category != 'preload':  # not part of the loop
+                charged += stat.tottime
+
+            entry = self.rets[category][name]
+            entry.calls = stat.calls
+            entry.tottime = stat.tottime
+            entry.cumtime = stat.cumtime
+            entry.percall = stat.tottime / (stat.calls or 1)
+            entry.pct = 100.0 * stat.tottime / total if total else 0.0
+
+        self.rets.other = max(0.0, total - charged)
+        self.rets._close()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+from backtrader import Analyzer
+from backtrader.utils import AutoOrderedDict
+from backtrader.utils.py3 import range, string_types
+
+
+__all__ = ['Pruner', 'PruneHistory']
+
+
+class PruneHistory(object):
+    '''Values reached at the checkpoints by the trials of an optimization, to
+    let the ``Pruner`` of each new trial compare against the former ones
+
+    Each trial is kept as ``(values, final)``: the values at the checkpoints
+    it reached and the final value (``None`` if it was pruned), all of them
+    relative to its starting value
+
+    ``store`` is the list holding the trials. Pass a
+    ``multiprocessing.Manager().list()`` to share the history among the
+    processes of an optimization. It is read once at the start of each trial
+    and appended to once at the end
+    '''
+    Rules = ('median', 'best',)
+
+    def __init__(self, store=None):
+        self.store = list() if store is None else store
+
+    def __len__(self):
+        return len(self.store)
+
+    def add(self, values, final=None):
+        self.store.append((list(values), final))
+
+    def references(self, rule, ncheckpoints, mintrials=1):
+        '''Returns for each checkpoint the relative value a trial has to
+        reach to go on (``None`` if there is no reference yet)
+
+          - ``median``: the median of the values of the trials which reached
+            the checkpoint
+          - ``best``: the value of the trial with the best final value
+        '''
+        trials = list(self.store)  # a single transfer if shared
+        refs = [None] * ncheckpoints
+
+        if rule == 'median':
+            for i in range(ncheckpoints):
+                values = sorted(v[i] for v, _ in trials if len(v) > i)
+                n = len(values)
+                if n and n >= mintrials:
+                    mid = n // 2
+                    if n % 2:
+                        refs[i] = values[mid]
+                    else:
+                        refs[i] = (values[mid - 1] + values[mid]) / 2.0
+
+        elif rule == 'best':
+            done = [(final, v) for v, final in trials if final is not None]
+            if done and len(done) >= mintrials:
+                values = max(done, key=lambda x: x[0])[1]
+                for i, value in enumerate(values[:ncheckpoints]):
+                    refs[i] = value
+
+        else:
+            raise ValueError('rule must be one of %s' % (self.Rules,))
+
+        return refs
+
+
+class Pruner(Analyzer):
+    '''Stops the run with ``cerebro.runprune()`` as soon as the trial crosses
+    one of the bounds, to skip the rest of the bars of the clearly losing
+    trials of an optimization. The figures of the strategy (broker value,
+    trades, other analyzers) are then those of the bar at which it stopped:
+    a partial score
+
+    The value of the broker is checked on each bar (``prenext`` included)
+    and recorded at the checkpoints, relative to the starting value
+
+    Note:
+
+      - ``runprune`` stops all strategies running together in the same run
+
+      - The checkpoints need the length of the data in advance: they are only
+        active if the data is preloaded
+
+    Params:
+
+      - ``data`` (default: ``None``)
+
+        Data whose progress marks the checkpoints. ``None`` for the 1st data
+        of the strategy
+
+      - ``maxdrawdown`` (default: ``None``)
+
+        Prune if the value falls this fraction (``0.2`` is 20%) below its
+        former peak
+
+      - ``minvalue`` (default: ``None``)
+
+        Prune if the value goes below this one
+
+      - ``checkpoints`` (default: ``(0.2, 0.4, 0.6, 0.8)``)
+
+        Fractions of the bars of the data at which the value is recorded and
+        compared against the ``history``
+
+      - ``history`` (default: ``None``)
+
+        A ``PruneHistory`` with the former trials. The checkpoints of this
+        trial are added to it when it stops. If ``None`` the checkpoints are
+        only recorded
+
+      - ``rule`` (default: ``median``)
+
+        Reference of the history a trial has to reach at each checkpoint:
+        ``median`` (median stopping rule) or ``best`` (the trial with the
+        best final value, the incumbent)
+
+      - ``mintrials`` (default: ``5``)
+
+        Trials needed in the history before ``rule`` is applied
+
+      - ``margin`` (default: ``0.0``)
+
+        Tolerance below the reference, as a fraction of the starting value
+
+      - ``bounds`` (default: ``()``)
+
+        Additional bounds: callables which are called on each bar with the
+        pruner as argument and return a reason (a string or ``True``) to
+        prune or a false value to go on. The attributes ``value``, ``peak``,
+        ``drawdown`` and ``progress`` of the pruner can be used
+
+    Methods:
+
+      - get_analysis
+
+        Returns a dictionary with the keys:
+
+          - ``pruned``: ``True`` if the run was stopped
+          - ``reason``: ``maxdrawdown``, ``minvalue``, ``median``, ``best``
+            or the one returned by a bound (``None`` if not pruned)
+          - ``bars``: bars of the data seen
+          - ``progress``: fraction of the bars of the data seen (``None`` if
+            the length of the data was not known)
+          - ``value``: value of the broker at the end
+          - ``checkpoints``: relative values at the checkpoints reached
+    '''
+    params = (
+        ('data', None),
+        ('maxdrawdown', None),
+        ('minvalue', None),
+        ('checkpoints', (0.2, 0.4, 0.6, 0.8)),
+        ('history', None),
+        ('rule', 'median'),
+        ('mintrials', 5),
+        ('margin', 0.0),
+        ('bounds', ()),
+    )
+
+    def create_analysis(self):
+        self.rets = AutoOrderedDict()
+        self.rets.pruned = False
+        self.rets.reason = None
+        self.rets.checkpoints = list()
+
+    def start(self):
+        self._data = self.p.data
+        if self._data is None:
+            self._data = self.strategy.data
+
+        self.value = self.peak = self._start = self.strategy.broker.getvalue()
+        self.drawdown = 0.0
+
+        # the bars at which the checkpoints fall, if the length is known
+        self._buflen = None
+        self._bars = list()
+        if self.strategy.env._dopreload:
+            self._buflen = buflen = self._data.buflen()
+            self._bars = [max(1, int(round(f * buflen)))
+                          for f in sorted(self.p.checkpoints)]
+
+        self._refs = [None] * len(self._bars)
+        if self.p.history is not None:
+            self._refs = self.p.history.references(
+                self.p.rule, len(self._bars), self.p.mintrials)
+
+    @property
+    def progress(self):
+        if not self._buflen:
+            return None
+
+        return len(self._data) / self._buflen
+
+    def next(self):
+        if self.rets.pruned:
+            return  # stop requested: other strategies may still be notified
+
+        self.value = value = self.strategy.broker.getvalue()
+        self.peak = peak = max(self.peak, value)
+        self.drawdown = 1.0 - value / peak if peak > 0.0 else 0.0
+
+        reason = None
+        if self.p.maxdrawdown is not None and \
+                self.drawdown > self.p.maxdrawdown:
+            reason = 'maxdrawdown'
+
+        elif self.p.minvalue is not None and value < self.p.minvalue:
+            reason = 'minvalue'
+
+        checkpoints = self.rets.checkpoints
+        i = len(checkpoints)
+        if i < len(self._bars) and len(self._data) >= self._bars[i]:
+            relvalue = value / self._start if self._start else 0.0
+            checkpoints.append(relvalue)
+            ref = self._refs[i]
+            if reason is None and ref is not None and \
+                    relvalue < ref - self.p.margin:
+                reason = self.p.rule
+
+        if reason is None:
+            for bound in self.p.bounds:
+                reason = bound(self)
+                if reason:
+                    break
+
+        if reason:
+            self.prune(reason)
+
+    def prune(self, reason='bound'):
+        '''Stops the run, recording ``reason``'''
+        self.rets.pruned = True
+        self.rets.reason = reason if isinstance(reason, string_types) \
+            else 'bound'
+        self.strategy.env.runprune()
+
+    def stop(self):
+        self.rets.bars = len(self._data)
+        self.rets.progress = self.progress
+        self.rets.value = value = self.strategy.broker.getvalue()
+
+        if self.p.history is not None:
+            final = None
+            if not self.rets.pruned:
+                final = value / self._start if self._start else 0.0
+
+            self.p.history.add(self.rets.checkpoints, final)
+
+        self.rets._close()
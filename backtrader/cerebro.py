@@ -21,10 +21,14 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import copy
 import datetime
 import collections
+import contextlib
+import functools
 import itertools
-import multiprocessing
+import operator
+import os
 
 try:  # For new Python versions
     collectionsAbc = collections.abc  # collections.Iterable -> collections.abc.Iterable
@@ -35,12 +39,16 @@ import backtrader as bt
 from .utils.py3 import (map, range, zip, with_metaclass, string_types,
                         integer_types)
 
+from . import checkpoint
 from . import linebuffer
 from . import indicator
 from .brokers import BackBroker
 from .metabase import MetaParams
 from . import observers
 from .writer import WriterFile
+from .executor import ProcessExecutor
+from .indcache import IndicatorCache
+from .profiler import Profiler
 from .utils import OrderedDict, tzparse, num2date, date2num
 from .strategy import Strategy, SignalStrategy
 from .tradingcal import (TradingCalendarBase, TradingCalendar,
@@ -86,6 +94,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
          How many cores to use simultaneously for optimization
 
+      - ``optexecutor`` (default: ``None``)
+
+        Executor (``ProcessExecutor``, ``ThreadExecutor`` or a subclass of
+        ``OptExecutor``) which runs the combinations of an optimization. The
+        pool of the executor survives the call to ``run`` and can be reused
+        by later calls and other ``Cerebro`` instances. It has to be closed
+        by the owner.
+
+        If ``None``, a ``ProcessExecutor`` with ``maxcpus`` processes is
+        created and closed for each call to ``run``
+
       - ``stdstats`` (default: ``True``)
 
         If True default Observers will be added: Broker (Cash and Value),
@@ -175,6 +194,20 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Corner cases may happen in which this drives a line object off its
         minimum period and breaks things and it is therefore disabled.
 
+      - ``indcache`` (default: ``False``)
+
+        Reuse across runs the values calculated by the indicators in vector
+        mode (``preload`` and ``runonce`` active). An indicator created with
+        the same params on the same input values as in a previous run in the
+        same process is not calculated again. In an optimization only the
+        indicators whose params (or inputs) change between combinations are
+        calculated in each run
+
+        ``True`` uses a process wide ``IndicatorCache``. An ``IndicatorCache``
+        instance can also be passed (to control its size or inspect the hits),
+        but in the workers of an optimization each run gets a copy of it and
+        only the process wide cache is kept across runs
+
       - ``writer`` (default: ``False``)
 
         If set to ``True`` a default WriterFile will be created which will
@@ -196,6 +229,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         The tests show an approximate ``20%`` speed-up moving from a sample
         execution in ``83`` seconds to ``66``
 
+        If ``'shared'``, the preloaded lines are additionally placed (once) in
+        a shared memory block. The worker processes attach to it and read the
+        values without copying, instead of receiving a pickled copy of the
+        datas with each task and holding it in memory. The lines of the datas
+        are read-only for the strategies in this mode. Requires Python >= 3.8
+
       - ``optreturn`` (default: ``True``)
 
         If ``True`` the optimization results will not be full ``Strategy``
@@ -214,6 +253,18 @@ class Cerebro(with_metaclass(MetaParams, object)):
         with ``optdatas`` the total gain increases to a total speed-up of
         ``32%`` in an optimization run.
 
+      - ``optreducer`` (default: ``None``)
+
+        Callable which receives each finished strategy of an optimization and
+        returns what is to be kept as its result (for example a tuple with
+        the params and some floats). It is executed inside the worker
+        processes and only what it returns is sent to the main process,
+        delivered to the callbacks and kept in the results of ``run``. It
+        takes precedence over ``optreturn``
+
+        It has to be picklable (for example a function defined at module
+        level) to reach the worker processes
+
       - ``oldsync`` (default: ``False``)
 
         Starting with release 1.9.0.99 the synchronization of multiple datas
@@ -269,12 +320,85 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         Set to ``False`` for compatibility. May be changed to ``True``
 
+      - ``npbuffers`` (default: ``False``)
+
+        Store the values of the *lines* in ``numpy`` arrays instead of
+        ``array.array`` (or ``collections.deque`` when saving memory with
+        ``exactbars``). The arrays are preallocated and grow geometrically (or
+        work as a ring when saving memory)
+
+        Slicing a line with ``get``, ``getzero`` or ``plotrange`` returns then
+        a read-only ``numpy.ndarray`` view instead of a copy. The view is only
+        guaranteed to hold the requested values during the current bar and
+        has to be copied if it has to be kept
+
+        Requires ``numpy``
+
+      - ``profile`` (default: ``False``)
+
+        Measure the wall time and the number of calls of each component
+        (datas, broker, strategy, notifications, indicators, observers,
+        analyzers and writers) during the run loop. A ``Profile`` analyzer
+        named ``profile`` is added to each strategy to report the results
+
+        The measurements add overhead to each call and are therefore only
+        meaningful relative to each other
+
+      - ``accounts`` (default: ``False``)
+
+        If ``True`` each strategy trades in its own account: a new broker of
+        the class of the broker of cerebro, with its params (cash, slippage,
+        ...) and commissions but nothing of a former run. Cash, positions and
+        orders of a strategy are then isolated from those of the others,
+        whereas the datas are loaded (and with ``indcache`` the indicators
+        calculated) only once for all. The broker of cerebro is not run
+        unless a strategy trades in it or it has order or fund history
+
+        A broker set for a strategy with ``setbroker_byidx`` takes precedence
+
+      - ``checkpoint`` (default: ``None``)
+
+        Name of a file to which a checkpoint (see ``checkpoint``) is written
+        after each bar delivered to the strategies. The run goes bar by bar
+        (no ``runonce``)
+
+      - ``resume`` (default: ``None``)
+
+        Name of a file with a checkpoint to resume a run from: the datas and
+        strategies have to be the same and with the same parameters, and the
+        datas have to deliver (ex: with ``fromdate``) the bars after the last
+        one of the checkpoint. Nothing is resumed if the file doesn't exist.
+        Neither ``preload`` nor ``runonce`` are used
+
+        Using the same file for ``checkpoint`` and ``resume`` allows a live
+        session to be restarted where it stopped
+
+      - ``checkpointbars`` (default: ``0``)
+
+        Values of each line kept in a checkpoint in addition to the longest
+        minimum period of the strategies (ex: for lookbacks in ``next`` of
+        values beyond those needed by the indicators)
+
+        The minimum periods only cover the windows declared by the
+        indicators. The values read further back (ex: ``self.data[-100]`` in
+        the ``next`` of an indicator or strategy with a shorter minimum
+        period) are not in the checkpoint unless ``checkpointbars`` covers
+        them
+
+      - ``checkpointstrict`` (default: ``False``)
+
+        If ``True`` an attribute which cannot be pickled (ex: a file) raises
+        ``pickle.PicklingError`` when writing a checkpoint. Else it is left
+        out and its name (``Class.attribute``) is in the list
+        ``checkpointskipped`` of cerebro
+
     '''
 
     params = (
         ('preload', True),
         ('runonce', True),
         ('maxcpus', None),
+        ('optexecutor', None),
         ('stdstats', True),
         ('oldbuysell', False),
         ('oldtrades', False),
@@ -282,7 +406,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('exactbars', False),
         ('optdatas', True),
         ('optreturn', True),
+        ('optreducer', None),
         ('objcache', False),
+        ('indcache', False),
         ('live', False),
         ('writer', False),
         ('tradehistory', False),
@@ -291,6 +417,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
         ('cheat_on_open', False),
         ('broker_coo', True),
         ('quicknotify', False),
+        ('npbuffers', False),
+        ('profile', False),
+        ('accounts', False),
+        ('checkpoint', None),
+        ('resume', None),
+        ('checkpointbars', 0),
+        ('checkpointstrict', False),
     )
 
     def __init__(self):
@@ -307,6 +440,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self.analyzers = list()
         self.indicators = list()
         self.sizers = dict()
+        self.brokers = dict()
         self.writers = list()
         self.storecbs = list()
         self.datacbs = list()
@@ -316,6 +450,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._signal_accumulate = False
 
         self._dataid = itertools.count(1)
+        self._sharedlines = None  # preloaded lines in shared memory
+        self._profiler = None
 
         self._broker = BackBroker()
         self._broker.cerebro = self
@@ -325,6 +461,8 @@ class Cerebro(with_metaclass(MetaParams, object)):
         self._pretimers = list()
         self._ohistory = list()
         self._fhistory = None
+        self._checkpoints = None  # pending requests during a run
+        self.checkpointskipped = list()  # attributes not in the last one
 
     @staticmethod
     def iterize(iterable):
@@ -852,7 +990,11 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Adds a *callback* to the list of callbacks that will be called with the
         optimizations when each of the strategies has been run
 
-        The signature: cb(strategy)
+        The signature: cb(results)
+
+        The callback receives a list with the results of the strategies of the
+        combination (``Strategy`` instances, ``OptReturn`` instances or what
+        the ``optreducer`` delivers)
         '''
         self.optcbs.append(cb)
 
@@ -928,6 +1070,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
         broker.cerebro = self
         return broker
 
+    def setbroker_byidx(self, idx, broker):
+        '''
+        Sets a specific ``broker`` instance for the strategy referenced by
+        ``idx`` (as returned by ``addstrategy``), which then trades in its own
+        account, isolated from the other strategies
+        '''
+        self.brokers[idx] = broker
+        broker.cerebro = self
+        return broker
+
     def getbroker(self):
         '''
         Returns the broker instance.
@@ -1008,8 +1160,26 @@ class Cerebro(with_metaclass(MetaParams, object)):
         module without complains
         '''
 
+        # class level switches, which may not have been inherited by the worker
+        linebuffer.LineBuffer.usenumpy(self.p.npbuffers)
+        indicator.Indicator.useoncecache(self._getindcache())
+
         predata = self.p.optdatas and self._dopreload and self._dorunonce
-        return self.runstrategies(iterstrat, predata=predata)
+        results = self.runstrategies(iterstrat, predata=predata)
+        if predata and not self.p.optreturn and self.p.optreducer is None:
+            # the returned strategies carry the datas: shared lines are copied
+            from .utils.sharedlines import detach
+            for data in self.datas:
+                detach(data.lines)
+
+        return results
+
+    def _getindcache(self):
+        indcache = self.p.indcache
+        if isinstance(indcache, IndicatorCache):
+            return indcache
+
+        return IndicatorCache.getdefault() if indcache else None
 
     def __getstate__(self):
         '''
@@ -1020,13 +1190,56 @@ class Cerebro(with_metaclass(MetaParams, object)):
         rv = vars(self).copy()
         if 'runstrats' in rv:
             del(rv['runstrats'])
+        rv.pop('_sharedlines', None)  # the workers get the shared lines
         return rv
 
+    def checkpoint(self, filename):
+        '''Writes to ``filename`` the state of the running strategies: the
+        last values of the lines of the datas, indicators and observers and
+        the attributes of the strategies, analyzers and brokers (positions,
+        cash, pending orders, ...), to later resume the run (parameter
+        ``resume``) without loading all the bars again
+
+        If invoked during a run (ex: from a strategy) the checkpoint is
+        written once all strategies have gone through the current bar
+
+        Analyzers and attributes of the strategies holding objects which
+        cannot be pickled (ex: files) are restored only partially (see the
+        parameter ``checkpointstrict``) and the state of filters (ex:
+        resampling) of the datas is not kept
+        '''
+        if self._checkpoints is not None:
+            self._checkpoints.append(filename)
+        else:
+            self._writecheckpoint(filename, self.runningstrats)
+
+    def _writecheckpoint(self, filename, runstrats):
+        self.checkpointskipped = skipped = list()
+        state = checkpoint.getstate(self, runstrats,
+                                    extrabars=self.p.checkpointbars,
+                                    skipped=skipped,
+                                    strict=self.p.checkpointstrict)
+        checkpoint.save(filename, state)
+
+    def _checkpointnext(self, runstrats):
+        filenames, self._checkpoints = self._checkpoints, list()
+        if self.p.checkpoint:
+            filenames.append(self.p.checkpoint)
+
+        for filename in collections.OrderedDict.fromkeys(filenames):
+            self._writecheckpoint(filename, runstrats)
+
     def runstop(self):
         '''If invoked from inside a strategy or anywhere else, including other
         threads the execution will stop as soon as possible.'''
         self._event_stop = True  # signal a stop has been requested
 
+    def runprune(self):
+        '''Like ``runstop`` but only the run of the strategies being run
+        together is stopped. During an optimization the next combinations of
+        parameters are run as usual (see the ``Pruner`` analyzer)'''
+        self._event_prune = True  # reset for each combination
+
     def run(self, **kwargs):
         '''The core method to perform backtesting. Any ``kwargs`` passed to it
         will affect the value of the standard parameters ``Cerebro`` was
@@ -1059,6 +1272,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         linebuffer.LineActions.usecache(self.p.objcache)
         indicator.Indicator.usecache(self.p.objcache)
 
+        # Storage for the lines: array.array/deque or numpy based
+        linebuffer.LineBuffer.usenumpy(self.p.npbuffers)
+
+        # Reuse of the values of indicators calculated in previous runs
+        indicator.Indicator.useoncecache(self._getindcache())
+
         self._dorunonce = self.p.runonce
         self._dopreload = self.p.preload
         self._exactbars = int(self.p.exactbars)
@@ -1078,6 +1297,18 @@ class Cerebro(with_metaclass(MetaParams, object)):
             self._dorunonce = False
             self._dopreload = False
 
+        self._resume = None
+        if self.p.resume and os.path.exists(self.p.resume):
+            if self._dooptimize:
+                raise ValueError('An optimization cannot be resumed')
+
+            self._resume = checkpoint.load(self.p.resume)
+            self._dorunonce = False  # only the bars after the checkpoint
+            self._dopreload = False
+
+        if self.p.checkpoint:
+            self._dorunonce = False  # checkpoints are taken bar by bar
+
         self.runwriters = list()
 
         # Add the system default writer if requested
@@ -1124,8 +1355,12 @@ class Cerebro(with_metaclass(MetaParams, object)):
         if not self.strats:  # Datas are present, add a strategy
             self.addstrategy(Strategy)
 
+        # keep the combinations to be able to know how many there are and
+        # run them again
+        self.strats = [list(x) for x in self.strats]
         iterstrats = itertools.product(*self.strats)
-        if not self._dooptimize or self.p.maxcpus == 1:
+        executor = self.p.optexecutor
+        if not self._dooptimize or (self.p.maxcpus == 1 and executor is None):
             # If no optimmization is wished ... or 1 core is to be used
             # let's skip process "spawning"
             for iterstrat in iterstrats:
@@ -1144,13 +1379,25 @@ class Cerebro(with_metaclass(MetaParams, object)):
                     if self._dopreload:
                         data.preload()
 
-            pool = multiprocessing.Pool(self.p.maxcpus or None)
-            for r in pool.imap(self, iterstrats):
-                self.runstrats.append(r)
-                for cb in self.optcbs:
-                    cb(r)  # callback receives finished strategy
+                if self.p.optdatas == 'shared':
+                    self._shareddatas()
 
-            pool.close()
+            if executor is None:  # single use
+                executor = ProcessExecutor(self.p.maxcpus)
+
+            ncombs = functools.reduce(operator.mul, map(len, self.strats))
+            try:
+                for r in executor.map(self, iterstrats, size=ncombs):
+                    self.runstrats.append(r)
+                    for cb in self.optcbs:
+                        cb(r)  # callback receives finished strategy
+            finally:
+                if executor is not self.p.optexecutor:
+                    executor.close()
+
+                if self._sharedlines is not None:
+                    self._sharedlines.close()
+                    self._sharedlines = None
 
             if self.p.optdatas and self._dopreload and self._dorunonce:
                 for data in self.datas:
@@ -1162,6 +1409,19 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         return self.runstrats
 
+    def _shareddatas(self):
+        '''Places the lines of the preloaded datas in shared memory'''
+        try:
+            from .utils.sharedlines import SharedLines
+        except ImportError:  # no shared_memory: datas go pickled to workers
+            return
+
+        lines = list()
+        for data in self.datas:
+            lines.extend(data.lines[i] for i in range(data.lines.fullsize()))
+
+        self._sharedlines = SharedLines(lines)
+
     def _init_stcount(self):
         self.stcount = itertools.count(0)
 
@@ -1172,16 +1432,39 @@ class Cerebro(with_metaclass(MetaParams, object)):
         '''
         Internal method invoked by ``run``` to run a set of strategies
         '''
+        self._event_prune = False  # a prune only ends this combination
         self._init_stcount()
 
         self.runningstrats = runstrats = list()
+        if self._profiler is not None:  # a run which raised before running
+            self._profiler.unwrap()
+
+        self._profiler = profiler = Profiler() if self.p.profile else None
+
         for store in self.stores:
             store.start()
 
-        if self.p.cheat_on_open and self.p.broker_coo:
-            # try to activate in broker
-            if hasattr(self._broker, 'set_coo'):
-                self._broker.set_coo(True)
+        # one broker per strategy (account) if requested, the main one else
+        self._stratbrokers = dict()
+        for idx in range(len(self.strats)):
+            broker = self.brokers.get(idx)
+            if broker is None and self.p.accounts:
+                broker = self._newaccount()
+
+            if broker is not None:
+                self._stratbrokers[idx] = broker
+
+        # the main broker only if a strategy trades in it or it has history
+        runbrokers = list()
+        if (len(self._stratbrokers) < len(self.strats) or
+                self._fhistory is not None or self._ohistory):
+            runbrokers.append(self._broker)
+
+        for broker in self._stratbrokers.values():
+            if broker not in runbrokers:
+                runbrokers.append(broker)
+
+        self._runbrokers = runbrokers
 
         if self._fhistory is not None:
             self._broker.set_fund_history(self._fhistory)
@@ -1189,7 +1472,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
         for orders, onotify in self._ohistory:
             self._broker.add_order_history(orders, onotify)
 
-        self._broker.start()
+        for broker in runbrokers:
+            if self.p.cheat_on_open and self.p.broker_coo:
+                # try to activate in broker
+                if hasattr(broker, 'set_coo'):
+                    broker.set_coo(True)
+
+            broker.start()
 
         for feed in self.feeds:
             feed.start()
@@ -1207,6 +1496,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
         # self._plotfillers = [list() for d in self.datas]
         # self._plotfillers2 = [list() for d in self.datas]
 
+        if profiler is not None:
+            profiler.wrapdatas(self.datas)
+
         if not predata:
             for data in self.datas:
                 data.reset()
@@ -1261,6 +1553,9 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 for ancls, anargs, ankwargs in self.analyzers:
                     strat._addanalyzer(ancls, *anargs, **ankwargs)
 
+                if profiler is not None:
+                    strat._addanalyzer(bt.analyzers.Profile)
+
                 sizer, sargs, skwargs = self.sizers.get(idx, defaultsizer)
                 if sizer is not None:
                     strat._addsizer(sizer, *sargs, **skwargs)
@@ -1291,21 +1586,33 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 else:
                     self._timers.append(timer)
 
-            if self._dopreload and self._dorunonce:
-                if self.p.oldsync:
-                    self._runonce_old(runstrats)
-                else:
-                    self._runonce(runstrats)
-            else:
-                if self.p.oldsync:
-                    self._runnext_old(runstrats)
+            with self._profiling(runstrats):
+                if self._resume is not None:
+                    checkpoint.setstate(self, runstrats, self._resume)
+
+                self._checkpoints = list()
+                if self._dopreload and self._dorunonce:
+                    if self.p.oldsync:
+                        self._runonce_old(runstrats)
+                    else:
+                        self._runonce(runstrats)
                 else:
-                    self._runnext(runstrats)
+                    if self.p.oldsync:
+                        self._runnext_old(runstrats)
+                    else:
+                        self._runnext(runstrats)
+
+                filenames, self._checkpoints = self._checkpoints, None
+                for filename in filenames:  # not taken bar by bar (runonce)
+                    self._writecheckpoint(filename, runstrats)
 
             for strat in runstrats:
                 strat._stop()
 
-        self._broker.stop()
+        self._profiler = None
+
+        for broker in self._runbrokers:
+            broker.stop()
 
         if not predata:
             for data in self.datas:
@@ -1319,6 +1626,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         self.stop_writers(runstrats)
 
+        if self._dooptimize and self.p.optreducer is not None:
+            # reduce the results to what the caller wants to keep
+            return [self.p.optreducer(strat) for strat in runstrats]
+
         if self._dooptimize and self.p.optreturn:
             # Results can be optimized
             results = list()
@@ -1337,6 +1648,30 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
         return runstrats
 
+    @contextlib.contextmanager
+    def _profiling(self, runstrats):
+        '''Times the run of ``runstrats`` with the profiler (if any). The
+        profiled components are unwrapped afterwards, also if the run
+        raises'''
+        profiler = self._profiler
+        if profiler is None:
+            yield
+            return
+
+        profiler.wrapcerebro(self)
+        for strat in runstrats:
+            profiler.wrapstrategy(strat)
+
+        t0 = profiler.timer()
+        try:
+            yield
+        except BaseException:
+            self._profiler = None
+            raise
+        finally:
+            profiler.total = profiler.timer() - t0
+            profiler.unwrap()
+
     def stop_writers(self, runstrats):
         cerebroinfo = OrderedDict()
         datainfos = OrderedDict()
@@ -1362,17 +1697,33 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Internal method which kicks the broker and delivers any broker
         notification to the strategy
         '''
-        self._broker.next()
-        while True:
-            order = self._broker.get_notification()
-            if order is None:
-                break
+        for broker in self._runbrokers:
+            broker.next()
+            while True:
+                order = broker.get_notification()
+                if order is None:
+                    break
+
+                owner = order.owner
+                if owner is None:
+                    owner = self.runningstrats[0]  # default
+
+                owner._addnotification(order, quicknotify=self.p.quicknotify)
 
-            owner = order.owner
-            if owner is None:
-                owner = self.runningstrats[0]  # default
+    def _newaccount(self):
+        '''Returns a broker for an account: of the class of the main broker
+        and with its params (cash, slippage, ...) and commissions, but none
+        of the orders, positions or notifications of a former run'''
+        broker = self._broker.__class__(**self._broker.p._getkwargs())
+        broker.comminfo = dict(self._broker.comminfo)
+        broker.cerebro = self
+        return broker
 
-            owner._addnotification(order, quicknotify=self.p.quicknotify)
+    def _getstratbroker(self, stid):
+        '''
+        Returns the broker in which the strategy with id ``stid`` trades
+        '''
+        return getattr(self, '_stratbrokers', {}).get(stid, self._broker)
 
     def _runnext_old(self, runstrats):
         '''
@@ -1386,10 +1737,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # Notify anything from the store even before moving datas
             # because datas may not move due to an error reported by the store
             self._storenotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
             self._datanotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             d0ret = data0.next()
@@ -1417,27 +1768,27 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             # Datas may have generated a new notification after next
             self._datanotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             self._brokernotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             if d0ret or lastret:  # bars produced by data or filters
                 for strat in runstrats:
                     strat._next()
-                    if self._event_stop:  # stop if requested
+                    if self._event_stop or self._event_prune:
                         return
 
                     self._next_writers(runstrats)
 
         # Last notification chance before stopping
         self._datanotify()
-        if self._event_stop:  # stop if requested
+        if self._event_stop or self._event_prune:  # stop if requested
             return
         self._storenotify()
-        if self._event_stop:  # stop if requested
+        if self._event_stop or self._event_prune:  # stop if requested
             return
 
     def _runonce_old(self, runstrats):
@@ -1446,9 +1797,16 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Strategies are still invoked on a pseudo-event mode in which ``next``
         is called for each data arrival
         '''
+        indcache = indicator.Indicator._oncecache
+        if indcache is not None:
+            indcache.reset()  # the lines may have been reloaded
+
         for strat in runstrats:
             strat._once()
 
+        if indcache is not None:
+            indcache.reset()  # do not keep the lines alive
+
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
         # were homed before calling once, Hence no "need" to do it
@@ -1461,13 +1819,13 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 data.advance(datamaster=data0)
 
             self._brokernotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             for strat in runstrats:
                 # data0.datetime[0] for compat. w/ new strategy's oncepost
                 strat._oncepost(data0.datetime[0])
-                if self._event_stop:  # stop if requested
+                if self._event_stop or self._event_prune:  # stop if requested
                     return
 
                 self._next_writers(runstrats)
@@ -1531,10 +1889,10 @@ class Cerebro(with_metaclass(MetaParams, object)):
             # Notify anything from the store even before moving datas
             # because datas may not move due to an error reported by the store
             self._storenotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
             self._datanotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             # record starting time and tell feeds to discount the elapsed time
@@ -1574,6 +1932,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
                     # try to get a data by checking with a master
                     d = datas[i]
+                    d.do_qcheck(False, 0)  # a bar is ready: do not wait here
                     d._check(forcedata=dmaster)  # check to force output
                     if d.next(datamaster=dmaster, ticks=False):  # retry
                         dts[i] = d.datetime[0]  # good -> store
@@ -1614,7 +1973,7 @@ class Cerebro(with_metaclass(MetaParams, object)):
 
             # Datas may have generated a new notification after next
             self._datanotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             if d0ret or lastret:  # if any bar, check timers before broker
@@ -1622,28 +1981,31 @@ class Cerebro(with_metaclass(MetaParams, object)):
                 if self.p.cheat_on_open:
                     for strat in runstrats:
                         strat._next_open()
-                        if self._event_stop:  # stop if requested
+                        if self._event_stop or self._event_prune:
                             return
 
             self._brokernotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             if d0ret or lastret:  # bars produced by data or filters
                 self._check_timers(runstrats, dt0, cheat=False)
                 for strat in runstrats:
                     strat._next()
-                    if self._event_stop:  # stop if requested
+                    if self._event_stop or self._event_prune:
                         return
 
                     self._next_writers(runstrats)
 
+                if self._checkpoints or self.p.checkpoint:
+                    self._checkpointnext(runstrats)
+
         # Last notification chance before stopping
         self._datanotify()
-        if self._event_stop:  # stop if requested
+        if self._event_stop or self._event_prune:  # stop if requested
             return
         self._storenotify()
-        if self._event_stop:  # stop if requested
+        if self._event_stop or self._event_prune:  # stop if requested
             return
 
     def _runonce(self, runstrats):
@@ -1653,10 +2015,17 @@ class Cerebro(with_metaclass(MetaParams, object)):
         Strategies are still invoked on a pseudo-event mode in which ``next``
         is called for each data arrival
         '''
+        indcache = indicator.Indicator._oncecache
+        if indcache is not None:
+            indcache.reset()  # the lines may have been reloaded
+
         for strat in runstrats:
             strat._once()
             strat.reset()  # strat called next by next - reset lines
 
+        if indcache is not None:
+            indcache.reset()  # do not keep the lines alive
+
         # The default once for strategies does nothing and therefore
         # has not moved forward all datas/indicators/observers that
         # were homed before calling once, Hence no "need" to do it
@@ -1687,18 +2056,18 @@ class Cerebro(with_metaclass(MetaParams, object)):
             if self.p.cheat_on_open:
                 for strat in runstrats:
                     strat._oncepost_open()
-                    if self._event_stop:  # stop if requested
+                    if self._event_stop or self._event_prune:
                         return
 
             self._brokernotify()
-            if self._event_stop:  # stop if requested
+            if self._event_stop or self._event_prune:  # stop if requested
                 return
 
             self._check_timers(runstrats, dt0, cheat=False)
 
             for strat in runstrats:
                 strat._oncepost(dt0)
-                if self._event_stop:  # stop if requested
+                if self._event_stop or self._event_prune:  # stop if requested
                     return
 
                 self._next_writers(runstrats)
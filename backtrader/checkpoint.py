@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+Checkpoints of a run (see ``Cerebro.checkpoint``) to resume it later in
+another process without going again through the bars already seen
+
+A checkpoint holds:
+
+  - for each line of the datas, strategies, indicators and observers: its
+    length and only the last values, as many as the longest minimum period
+    of the strategies (the longest window any indicator declares) plus
+    ``extrabars``
+
+  - the attributes of the strategies, indicators, observers, analyzers and
+    brokers (positions, cash, pending orders, ...) which can be pickled.
+    Those pointing to objects of the run (datas, lines, indicators, ...) are
+    kept as references to the objects created by the new run. The names of
+    those which cannot be pickled are reported (``skipped``) or raise an
+    error (``strict``)
+
+The new run must be created with the same datas, strategies and parameters
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import io
+import itertools
+import os
+import pickle
+
+from .lineiterator import LineIterator
+from .lineroot import LineRoot
+from .lineseries import LineSeries
+from .order import OrderBase
+from .trade import Trade
+
+
+__all__ = ['getstate', 'setstate', 'save', 'load']
+
+VERSION = 1
+
+# rebuilt with the same values when the objects are created
+SKIPATTRS = ('lines', 'l', 'p', 'params', 'plotinfo', 'plotlines', 'ddatas')
+
+
+def _lineobjects(strategy):
+    '''The strategy, its indicators and observers (and theirs) in the order
+    in which they were created'''
+    objs, seen = list(), set()
+
+    def walk(obj):
+        if id(obj) in seen:
+            return
+
+        seen.add(id(obj))
+        objs.append(obj)
+        lineiterators = getattr(obj, '_lineiterators', None)
+        if lineiterators:
+            for ltype in (LineIterator.IndType, LineIterator.ObsType):
+                for child in lineiterators[ltype]:
+                    walk(child)
+
+    walk(strategy)
+    return objs
+
+
+def _lines(obj):
+    if isinstance(obj, LineSeries):
+        return [obj.lines[i] for i in range(obj.lines.fullsize())]
+
+    return [obj]  # a LineBuffer (ex: LineActions) is its only line
+
+
+class _Objects(object):
+    '''The objects of a run, in a fixed order to reference them from a
+    checkpoint'''
+    def __init__(self, cerebro, strats):
+        self.objects = list()  # all which can be referenced
+        self.lineobjs = list()  # those whose lines are kept
+        self.attrobjs = list()  # those whose attributes are kept
+        self._ids = dict()
+
+        self._add(cerebro)
+        for data in cerebro.datas:
+            self._add(data, lines=True)
+
+        for broker in cerebro._runbrokers:
+            self._add(broker, attrs=True)
+
+        for strat in strats:
+            for obj in _lineobjects(strat):
+                self._add(obj, lines=True, attrs=True)
+
+            for analyzer in strat.analyzers:
+                self._add(analyzer, attrs=True)
+
+            self._add(strat._sizer)
+
+    def _add(self, obj, lines=False, attrs=False):
+        if id(obj) in self._ids:
+            return
+
+        self._ids[id(obj)] = len(self.objects)
+        self.objects.append(obj)
+        if lines:
+            self.lineobjs.append(obj)
+            if isinstance(obj, LineSeries):
+                self._add(obj.lines)
+            for line in _lines(obj):
+                self._add(line)
+
+        if attrs:
+            self.attrobjs.append(obj)
+
+    def structure(self):
+        return [type(x).__name__ for x in self.objects]
+
+    def persistent_id(self, obj):
+        idx = self._ids.get(id(obj))
+        if idx is not None:
+            return ('obj', idx)
+
+        if isinstance(obj, LineRoot):
+            raise pickle.PicklingError('Line object not in the run')
+
+        return None
+
+    def persistent_load(self, pid):
+        return self.objects[pid[1]]
+
+    def pickler(self, f):
+        pickler = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+        pickler.persistent_id = self.persistent_id
+        return pickler
+
+    def unpickler(self, f):
+        unpickler = pickle.Unpickler(f)
+        unpickler.persistent_load = self.persistent_load
+        return unpickler
+
+    def _rebuilt(self, value):
+        '''Objects of the run (or sequences of them) which the new run
+        recreates. Lines not in the run are also recreated (ex: the stubs
+        wrapping the lines given as data to an indicator)'''
+        if isinstance(value, (list, tuple)):
+            return bool(value) and all(self._rebuilt(x) for x in value)
+
+        return id(value) in self._ids or isinstance(value, LineRoot)
+
+    def attributes(self):
+        '''Attributes (index of the object, name, value) which are not
+        recreated by the new run'''
+        return [(i, name, value)
+                for i, obj in enumerate(self.attrobjs)
+                for name, value in vars(obj).items()
+                if name not in SKIPATTRS and not self._rebuilt(value)]
+
+    def attrname(self, attr):
+        return '%s.%s' % (type(self.attrobjs[attr[0]]).__name__, attr[1])
+
+    def dump(self, lines, attrs, skipped=None, strict=False):
+        '''Pickles ``lines`` and then each attribute of ``attrs`` on its own
+        with the same pickler: objects shared by several attributes (ex:
+        orders) are shared again when restored. An attribute which cannot be
+        pickled (ex: files, locks, objects out of the run) is left out and
+        the rest pickled again with a new pickler, whose memo does not know
+        the objects of the failed one'''
+        attrs = list(attrs)
+        while True:
+            f = io.BytesIO()
+            pickler = self.pickler(f)
+            pickler.dump(lines)
+            for i, attr in enumerate(attrs):
+                try:
+                    pickler.dump(attr)
+                except Exception as e:
+                    name = self.attrname(attr)
+                    if strict:
+                        raise pickle.PicklingError(
+                            'Attribute %s cannot be pickled: %s' % (name, e))
+
+                    if skipped is not None:
+                        skipped.append(name)
+
+                    del attrs[i]
+                    break
+            else:
+                pickler.dump(None)  # end of the attributes
+                return f.getvalue()
+
+    def load(self, state):
+        '''Returns the lines and the attributes pickled by ``dump``'''
+        unpickler = self.unpickler(io.BytesIO(state))
+        lines = unpickler.load()
+        return lines, list(iter(unpickler.load, None))
+
+
+def getstate(cerebro, strats, extrabars=0, skipped=None, strict=False):
+    '''Returns the checkpoint of ``strats`` (the strategies being run by
+    ``cerebro``) as ``bytes``. Besides the minimum periods ``extrabars`` more
+    values are kept for each line
+
+    The names (``Class.attribute``) of the attributes which cannot be pickled
+    are appended to the list ``skipped`` (if given) or, with ``strict``, raise
+    ``pickle.PicklingError``'''
+    objs = _Objects(cerebro, strats)
+
+    size = extrabars + max([1] + [max([s._minperiod] + list(s._minperiods))
+                                  for s in strats])
+    lines = [[line.gettail(size) for line in _lines(obj)]
+             for obj in objs.lineobjs]
+    state = objs.dump(lines, objs.attributes(), skipped=skipped,
+                      strict=strict)
+    return pickle.dumps(dict(version=VERSION, structure=objs.structure(),
+                             state=state),
+                        pickle.HIGHEST_PROTOCOL)
+
+
+def setstate(cerebro, strats, checkpoint):
+    '''Restores the checkpoint returned by ``getstate`` in ``strats`` (the
+    strategies about to be run by ``cerebro``) and in the datas and brokers
+    of ``cerebro``'''
+    checkpoint = pickle.loads(checkpoint)
+    if checkpoint['version'] != VERSION:
+        raise ValueError('Unsupported checkpoint version %s' %
+                         checkpoint['version'])
+
+    objs = _Objects(cerebro, strats)
+    if objs.structure() != checkpoint['structure']:
+        raise ValueError('The checkpoint does not match the datas and '
+                         'strategies of the run')
+
+    lines, attrs = objs.load(checkpoint['state'])
+
+    for obj, tails in zip(objs.lineobjs, lines):
+        for line, (length, values, extvalues) in zip(_lines(obj), tails):
+            line.settail(length, values, extvalues)
+
+    for i, name, value in attrs:
+        objs.attrobjs[i].__dict__[name] = value
+
+    # new orders and trades must not reuse the references of restored ones
+    orders = itertools.chain.from_iterable(
+        getattr(broker, 'orders', ()) for broker in cerebro._runbrokers)
+    _skipref(OrderBase, [x.ref for x in orders])
+
+    trades = [trade for strat in strats
+              for tradeids in strat._trades.values()
+              for tlist in tradeids.values() for trade in tlist]
+    _skipref(Trade, [x.ref for x in trades])
+
+    for data in cerebro.datas:
+        data._resume()
+
+
+def _skipref(cls, refs):
+    if refs:
+        cls.refbasis = itertools.count(max(next(cls.refbasis), max(refs) + 1))
+
+
+def save(filename, checkpoint):
+    '''Writes the checkpoint to ``filename`` atomically: a crash while
+    writing leaves the previous one in place'''
+    tmpname = filename + '.tmp'
+    with io.open(tmpname, 'wb') as f:
+        f.write(checkpoint)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmpname, filename)
+
+
+def load(filename):
+    with io.open(filename, 'rb') as f:
+        return f.read()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import multiprocessing
+import multiprocessing.pool
+import pickle
+
+
+__all__ = ['OptExecutor', 'ProcessExecutor', 'ThreadExecutor']
+
+
+class OptExecutor(object):
+    '''
+    Base class of the executors which run the combinations of an optimization
+    (``Cerebro.optstrategy``) in parallel
+
+    The pool of workers is created on the first use and kept alive across
+    ``Cerebro.run`` calls (of the same or different ``Cerebro`` instances)
+    until ``close`` is called. The executor can also be used as a context
+    manager, which closes it at the end
+
+    Params:
+
+      - ``processes`` (default: ``None`` -> all available cores): number of
+        workers in the pool
+
+      - ``chunksize`` (default: ``None``): number of combinations sent to a
+        worker in a single task. If ``None``, it is adapted to the number of
+        combinations, to let each worker receive about ``chunkfactor`` tasks
+
+      - ``ordered`` (default: ``True``): deliver the results in the order of
+        the combinations. If ``False`` they are delivered as soon as they
+        are finished
+
+    Subclasses must override ``_newpool``, which returns an object with the
+    interface of ``multiprocessing.pool.Pool``
+    '''
+    chunkfactor = 4
+
+    def __init__(self, processes=None, chunksize=None, ordered=True):
+        self.processes = processes or multiprocessing.cpu_count()
+        self.chunksize = chunksize
+        self.ordered = ordered
+        self._pool = None
+
+    def __getstate__(self):
+        # the pool stays in the process which created it
+        rv = vars(self).copy()
+        rv['_pool'] = None
+        return rv
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _newpool(self):
+        raise NotImplementedError
+
+    def _getchunksize(self, size):
+        if self.chunksize:
+            return self.chunksize
+
+        if not size:
+            return 1
+
+        chunksize, extra = divmod(size, self.processes * self.chunkfactor)
+        return chunksize + bool(extra)
+
+    def _getfunc(self, func):
+        return func
+
+    def map(self, func, iterable, size=None):
+        '''Returns an iterator over the results of applying ``func`` to the
+        elements of ``iterable``. ``size`` is the number of elements (if
+        known), to adapt the chunks of work'''
+        if self._pool is None:
+            self._pool = self._newpool()
+
+        chunksize = self._getchunksize(size)
+        func = self._getfunc(func)
+        if self.ordered:
+            return self._pool.imap(func, iterable, chunksize)
+
+        return self._pool.imap_unordered(func, iterable, chunksize)
+
+    def close(self):
+        '''Stops the workers of the pool (once the pending work is done)'''
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+
+class ProcessExecutor(OptExecutor):
+    '''
+    Executor using a ``multiprocessing`` pool of processes. The function and
+    the combinations are pickled to the workers
+
+    Note:
+
+      - The worker processes are started when the executor is first used. The
+        classes (strategies, indicators, analyzers ...) used in later runs
+        have to be importable by the workers (or have been defined before
+        that moment, if the processes are forked)
+    '''
+    def _newpool(self):
+        return multiprocessing.Pool(self.processes)
+
+
+class _PickledCall(object):
+    '''Calls a fresh copy of a pickled callable. Used to give each task its
+    own state when running in threads'''
+    def __init__(self, func):
+        self.pfunc = pickle.dumps(func, pickle.HIGHEST_PROTOCOL)
+
+    def __call__(self, *args):
+        return pickle.loads(self.pfunc)(*args)
+
+
+class ThreadExecutor(OptExecutor):
+    '''
+    Executor using a pool of threads. Parallelism is only achieved with a
+    free-threaded interpreter (no GIL), but there is no process start-up and
+    the results do not have to be pickled
+
+    Because a ``Cerebro`` keeps the state of a run, each task works on a copy
+    of the function, unpickled from a single pickled instance. The object
+    cache (``objcache``) of ``Cerebro`` is class level and must not be used
+    '''
+    def _newpool(self):
+        return multiprocessing.pool.ThreadPool(self.processes)
+
+    def _getfunc(self, func):
+        return _PickledCall(func)
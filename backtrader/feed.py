@@ -205,6 +205,11 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         if not self._started:
             self._start_finish()
 
+    def _resume(self):
+        '''Called after the last bars have been restored from a checkpoint
+        (see ``Cerebro.checkpoint``), before new bars are delivered'''
+        pass
+
     def _timeoffset(self):
         return self._tmoffset
 
@@ -442,6 +447,52 @@ class AbstractDataBase(with_metaclass(MetaAbstractDataBase,
         self._last()
         self.home()
 
+    def _canpreloadarrays(self):
+        '''Returns ``True`` if the bars can be preloaded in bulk with
+        ``_preloadarrays``, i.e.: they need not go one by one through filters,
+        input localization or the bar stack'''
+        return not (self._filters or self._tzinput or
+                    self._barstack or self._barstash)
+
+    def _preloadarrays(self, dtarray, colarrays):
+        '''Preloads in bulk the bars held in arrays, applying the same
+        ``fromdate``/``todate`` selection as ``load``
+
+        Keyword Args:
+            dtarray (numpy array): datetime numbers of the bars
+            colarrays (list): (line, numpy array) pairs. Lines not present are
+            filled with NaN like ``forward`` would do
+        '''
+        import numpy as np  # keep the import very local
+
+        # bars before fromdate are skipped and the 1st bar after todate stops
+        # the loading
+        past = np.flatnonzero(dtarray > self.todate)
+        if len(past):
+            dtarray = dtarray[:past[0]]
+
+        if np.all(dtarray[1:] >= dtarray[:-1]):
+            # sorted (usual case): select with a slice, i.e. a view
+            sel = slice(int(np.searchsorted(dtarray, self.fromdate)), None)
+        else:
+            sel = dtarray >= self.fromdate
+
+        self.lines.datetime.forwardvalues(dtarray[sel])
+
+        size = len(dtarray[sel])
+        filled = set([id(self.lines.datetime)])
+        for line, colarray in colarrays:
+            line.forwardvalues(colarray[:len(dtarray)][sel])
+            filled.add(id(line))
+
+        for i in range(self.lines.fullsize()):
+            line = self.lines[i]
+            if id(line) not in filled:
+                line.forwardvalues(np.full(size, float('NaN')))
+
+        self._last()
+        self.home()
+
     def _last(self, datamaster=None):
         # Last chance for filters to deliver something
         ret = 0
@@ -659,6 +710,9 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
 
     The return value of ``_loadline`` (True/False) will be the return value
     of ``_load`` which has been overriden by this base class
+
+    Subclasses may also override ``_loadarrays`` to parse the whole file in a
+    single pass during ``preload``
     '''
 
     f = None
@@ -686,11 +740,18 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
             self.f = None
 
     def preload(self):
-        while self.load():
-            pass
+        arrays = None
+        if self._canpreloadarrays():
+            arrays = self._loadarrays()
 
-        self._last()
-        self.home()
+        if arrays is not None:
+            self._preloadarrays(*arrays)
+        else:
+            while self.load():
+                pass
+
+            self._last()
+            self.home()
 
         # preloaded - no need to keep the object around - breaks multip in 3.x
         self.f.close()
@@ -710,6 +771,16 @@ class CSVDataBase(with_metaclass(MetaCSVDataBase, DataBase)):
         linetokens = line.split(self.separator)
         return self._loadline(linetokens)
 
+    def _loadarrays(self):
+        '''Parses the rest of the file in one go for preloading. To be
+        overriden by subclasses, returning ``None`` (the default) if it cannot
+        be done, to let the bars be loaded line by line
+
+        Returns:
+            a tuple ``(dtarray, colarrays)`` as expected by ``_preloadarrays``
+        '''
+        return None
+
     def _getnextline(self):
         if self.f is None:
             return None
@@ -31,6 +31,9 @@ from .quandl import *
 from .sierrachart import *
 from .mt4csv import *
 from .pandafeed import *
+from .memmap import *
+from .journal import *
+from .livequeue import *
 from .influxfeed import *
 try:
     from .ibdata import *
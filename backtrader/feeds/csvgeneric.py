@@ -25,7 +25,7 @@ from datetime import datetime
 import itertools
 
 from .. import feed, TimeFrame
-from ..utils import date2num
+from ..utils import date2num, dtarray2num
 from ..utils.py3 import integer_types, string_types
 
 
@@ -67,6 +67,11 @@ class GenericCSVData(feed.CSVDataBase):
       - ``tmformat``: Format used to parse the time CSV field if "present"
         (the default for the "time" CSV field is not to be present)
 
+      - ``bulkpreload`` (default: ``True``): when preloading, parse the whole
+        file in a single pass with the C parser of ``pandas`` (if available)
+        and convert the datetimes in bulk, instead of line by line. Not done
+        if ``dtformat`` is a callable, because it works on single values
+
     '''
 
     params = (
@@ -82,6 +87,8 @@ class GenericCSVData(feed.CSVDataBase):
         ('close', 4),
         ('volume', 5),
         ('openinterest', 6),
+
+        ('bulkpreload', True),
     )
 
     def start(self):
@@ -157,6 +164,72 @@ class GenericCSVData(feed.CSVDataBase):
 
         return True
 
+    def _loadarrays(self):
+        if not self.p.bulkpreload or self._tz is not None or \
+           not (self._dtstr or self.p.dtformat in (1, 2)) or \
+           type(self)._loadline is not GenericCSVData._loadline:
+            return None
+
+        try:
+            import pandas as pd  # keep the import very local
+        except ImportError:
+            return None
+
+        import numpy as np  # guaranteed by pandas
+
+        colfields = [(x, getattr(self.params, x))
+                     for x in self.getlinealiases() if x != 'datetime']
+        dtcols = [self.p.datetime]
+        if self._dtstr and self.p.time >= 0:
+            dtcols.append(self.p.time)
+
+        usecols = set(dtcols)
+        usecols.update(x for _, x in colfields if x is not None and x >= 0)
+
+        # the headers have already been skipped by "start". Only empty fields
+        # are missing values, like in _loadline
+        df = pd.read_csv(self.f, sep=self.separator, header=None,
+                         usecols=sorted(usecols),
+                         dtype=dict((x, str) for x in dtcols),
+                         keep_default_na=False, na_values=[''])
+
+        dtfield = df[self.p.datetime]
+        if self._dtstr:
+            dtformat = self.p.dtformat
+            if self.p.time >= 0:
+                # add time value and format if it's in a separate field
+                dtfield = dtfield + 'T' + df[self.p.time]
+                dtformat += 'T' + self.p.tmformat
+
+            dts = pd.to_datetime(dtfield, format=dtformat).values
+        elif self.p.dtformat == 1:
+            dts = dtfield.astype(np.int64).values.astype('datetime64[s]')
+        else:  # timestamp as float, microseconds rounded like utcfromtimestamp
+            musecs = np.round(dtfield.astype(np.float64).values * 1e6)
+            dts = musecs.astype(np.int64).astype('datetime64[us]')
+
+        dtarray = dtarray2num(dts)
+        if self.p.timeframe >= TimeFrame.Days:
+            # move the bars to the expected end of session if larger
+            eos = datetime.combine(datetime.min.date(), self.p.sessionend)
+            eos -= datetime.min
+            dteos = dts.astype('datetime64[D]') + np.timedelta64(eos)
+            dteosnum = dtarray2num(dteos)
+            dtarray = np.where(dteosnum > dtarray, dteosnum, dtarray)
+
+        colarrays = list()
+        for linefield, csvidx in colfields:
+            if csvidx is None or csvidx < 0:
+                # the field will not be present, assign the "nullvalue"
+                colarray = np.full(len(df), float(self.p.nullvalue))
+            else:
+                column = df[csvidx].fillna(self.p.nullvalue)
+                colarray = column.to_numpy(dtype=np.float64)
+
+            colarrays.append((getattr(self.lines, linefield), colarray))
+
+        return dtarray, colarrays
+
 
 class GenericCSV(feed.CSVFeedBase):
     DataCls = GenericCSVData
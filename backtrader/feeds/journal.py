@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+Append-only journal of records made of ``float64`` fields (ex: the bars
+received by a live data), kept in one file per UTC day of the records
+
+Layout of each file (``<prefix>-YYYYMMDD.btj``):
+
+  - 8 bytes: ``MAGIC``
+  - 8 bytes: length of the header (little endian unsigned integer)
+  - header: ``json`` text (padded with spaces to a multiple of 8 bytes) with
+    the keys ``columns`` (names of the fields, in order), ``timeframe``,
+    ``compression`` and ``byteorder`` of the values
+  - blocks of records, each one with 4 bytes for the number of records
+    ``n``, 4 bytes for the ``crc32`` of the values (little endian unsigned
+    integers) and the values: ``n`` values of each column, one column after
+    the other. The ``datetime`` column holds the values delivered by
+    ``date2num`` (UTC)
+
+A block is written and synced to disk at once, as is the header of a new
+file. A block cut short by a crash is ignored when reading and overwritten
+when the journal is opened again. A file whose header was cut short holds
+no records and is written again
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import io
+import json
+import os
+import os.path
+import re
+import struct
+import sys
+import time
+import zlib
+
+from backtrader import feed, TimeFrame
+from backtrader.utils import num2date
+
+
+__all__ = ['Journal', 'JournalData']
+
+MAGIC = b'BTJRNL01'
+SUFFIX = '.btj'
+
+
+def _scan(f):
+    '''Reads the header and the complete blocks of the open file ``f``.
+    Returns the header (with the additional key ``end``, the position after
+    the last complete block) and the blocks as lists of columns. The header
+    is ``None`` if it was cut short (ex: a crash while creating the file)'''
+    magic = f.read(len(MAGIC))
+    if magic != MAGIC:
+        if MAGIC.startswith(magic):  # cut short
+            return None, []
+
+        raise ValueError('%s is not a journal file' % f.name)
+
+    try:
+        hlen, = struct.unpack(str('<Q'), f.read(8))
+        hbytes = f.read(hlen)
+        if len(hbytes) < hlen:
+            return None, []
+
+        header = json.loads(hbytes.decode('utf-8'))
+        ncols = len(header['columns'])
+        swap = header['byteorder'] != sys.byteorder
+    except (struct.error, ValueError, KeyError, TypeError):
+        return None, []
+
+    blocks = list()
+    end = f.tell()
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            break
+
+        n, crc = struct.unpack(str('<II'), head)
+        payload = f.read(n * ncols * 8)
+        if len(payload) < n * ncols * 8 or zlib.crc32(payload) != crc:
+            break  # cut short by a crash
+
+        values = array.array(str('d'), payload)
+        if swap:
+            values.byteswap()
+
+        blocks.append([values[i * n:(i + 1) * n] for i in range(ncols)])
+        end = f.tell()
+
+    header['end'] = end
+    return header, blocks
+
+
+def journalfiles(prefix):
+    '''Returns the names of the files of the journal ``prefix`` in
+    chronological order'''
+    dirname, base = os.path.split(prefix)
+    match = re.compile(re.escape(base) + r'-\d{8}' + re.escape(SUFFIX) + '$')
+    try:
+        names = os.listdir(dirname or '.')
+    except OSError:
+        return []
+
+    return [os.path.join(dirname, x) for x in sorted(names) if match.match(x)]
+
+
+def readjournal(prefix):
+    '''Reads all the files of the journal ``prefix``. Returns the header of
+    the first one and a dictionary with an ``array`` of values per column'''
+    header, columns = None, None
+    for filename in journalfiles(prefix):
+        with io.open(filename, 'rb') as f:
+            fheader, blocks = _scan(f)
+
+        if fheader is None:
+            continue  # no records
+
+        if header is None:
+            header = fheader
+            columns = dict((x, array.array(str('d'))) for x in
+                           header['columns'])
+        elif fheader['columns'] != header['columns']:
+            raise ValueError('The columns of %s are not those of the journal'
+                             % filename)
+
+        for block in blocks:
+            for name, values in zip(fheader['columns'], block):
+                columns[name].extend(values)
+
+    if header is None:
+        raise ValueError('No files found for the journal %s' % prefix)
+
+    return header, columns
+
+
+class Journal(object):
+    '''Appends records to the files of a journal (see the layout above),
+    switching to a new file when the UTC day of the ``datetime`` column
+    changes
+
+    Records are kept in memory and written as one block, followed by a sync
+    to disk, when ``batch`` of them are waiting, when ``delay`` seconds have
+    passed since the last block was written (checked when a record is
+    appended and by ``flushdue``) or when ``flush`` (or ``close``) is
+    called. A crash loses at most the records which were not flushed
+
+    Params:
+
+      - ``prefix``: path and name of the journal. The files are named
+        ``<prefix>-YYYYMMDD.btj``
+      - ``columns``: names of the fields of the records. ``datetime`` is
+        needed
+      - ``batch`` (default: ``256``): records to keep before writing a block
+      - ``delay`` (default: ``None``): seconds to wait at least between
+        blocks before writing the waiting records. ``None``: only ``batch``
+        and ``flush`` write them
+      - ``sync`` (default: ``True``): sync each block to disk with
+        ``os.fsync``
+      - ``timeframe`` and ``compression`` (default: ``None``): stored in the
+        header for ``JournalData``
+
+    Other records (ex: order events) are kept in journals of their own, with
+    their own columns
+    '''
+    def __init__(self, prefix, columns, batch=256, delay=None, sync=True,
+                 timeframe=None, compression=None):
+        self.prefix = prefix
+        self.columns = list(columns)
+        if 'datetime' not in self.columns:
+            raise ValueError('A datetime column is needed')
+
+        self.batch = batch
+        self.delay = delay
+        self.sync = sync
+        self.timeframe = timeframe
+        self.compression = compression
+        self._dtidx = self.columns.index('datetime')
+        self._records = list()
+        self._flushed = float('-inf')  # time of the last block
+        self._day = None
+        self._f = None
+
+    def filename(self, day):
+        '''Name of the file for the ``date2num`` value ``day``'''
+        return '%s-%s%s' % (self.prefix, num2date(day).strftime('%Y%m%d'),
+                            SUFFIX)
+
+    def append(self, record):
+        '''Adds a record: a sequence with a value per column'''
+        day = int(record[self._dtidx])
+        if day != self._day:
+            self.flush()
+            self._close()
+            self._day = day
+
+        self._records.append(record)
+        if len(self._records) >= self.batch:
+            self.flush()
+        else:
+            self.flushdue()
+
+    def flushdue(self):
+        '''Writes the waiting records if ``delay`` seconds have passed since
+        the last block was written'''
+        if self.delay is not None and \
+                time.time() - self._flushed >= self.delay:
+            self.flush()
+
+    def flush(self):
+        '''Writes the waiting records as one block and syncs it to disk'''
+        if not self._records:
+            return
+
+        if self._f is None:
+            self._open()
+
+        records, self._records = self._records, list()
+        values = array.array(str('d'))
+        for i in range(len(self.columns)):
+            values.extend(record[i] for record in records)
+
+        payload = values.tobytes()
+        self._f.write(struct.pack(str('<II'), len(records),
+                                  zlib.crc32(payload) & 0xffffffff))
+        self._f.write(payload)
+        self._f.flush()
+        if self.sync:
+            os.fsync(self._f.fileno())
+
+        self._flushed = time.time()
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def _close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def _open(self):
+        filename = self.filename(self._day)
+        if os.path.exists(filename):
+            self._f = f = io.open(filename, 'r+b')
+            header, _ = _scan(f)
+            if header is None:  # cut short while being created
+                f.seek(0)
+                f.truncate()
+                self._writeheader()
+                return
+
+            if header['columns'] != self.columns:
+                f.close()
+                self._f = None
+                raise ValueError('The columns of %s are not those of the '
+                                 'journal' % filename)
+
+            f.seek(header['end'])
+            f.truncate()  # a block cut short by a crash
+            return
+
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+
+        self._f = io.open(filename, 'wb')
+        self._writeheader()
+
+    def _writeheader(self):
+        header = dict(
+            columns=self.columns,
+            timeframe=self.timeframe,
+            compression=self.compression,
+            byteorder=sys.byteorder,
+        )
+        header = json.dumps(header).encode('utf-8')
+        header += b' ' * (-len(header) % 8)  # keep the values aligned
+
+        f = self._f
+        f.write(MAGIC)
+        f.write(struct.pack(str('<Q'), len(header)))
+        f.write(header)
+        f.flush()
+        if self.sync:  # else a crash may leave a file without records
+            os.fsync(f.fileno())
+
+
+class JournalData(feed.DataBase):
+    '''
+    Replays at backtesting speed the bars recorded in a journal (ex: by a
+    ``LiveQueueData`` with the parameter ``journal``), in the order in which
+    they were received
+
+    Updates in place of the last bar (column ``update``) are collapsed: each
+    bar is delivered with its last values, as the strategy saw it when it
+    was complete
+
+    Params:
+
+      - ``dataname``: the prefix of the journal (see ``Journal``)
+
+      - ``timeframe`` and ``compression`` (default: ``None``): if not given,
+        the values of the journal (if any) are used
+
+    Lines which are not in the journal are filled with ``NaN`` and columns
+    which are not lines are ignored
+    '''
+    params = (
+        ('timeframe', None),
+        ('compression', None),
+    )
+
+    def __init__(self):
+        self._header, self._columns = readjournal(self.p.dataname)
+        if self.p.timeframe is None:
+            self.p.timeframe = self._header['timeframe'] or TimeFrame.Days
+        if self.p.compression is None:
+            self.p.compression = self._header['compression'] or 1
+
+    def start(self):
+        super(JournalData, self).start()
+
+        columns = self._columns
+        update = columns.get('update')
+        if update is not None and any(update):
+            # keep the last version of each bar: rows followed by an update
+            # are superseded by it
+            keep = [not x for x in update[1:]] + [True]
+            columns = dict(
+                (name, array.array(str('d'),
+                                   [x for x, k in zip(values, keep) if k]))
+                for name, values in columns.items())
+
+        self._dtcolumn = columns['datetime']
+        self._size = len(self._dtcolumn)
+        self._colarrays = [(getattr(self.lines, x), columns[x])
+                           for x in self.getlinealiases()
+                           if x != 'datetime' and x in columns]
+        self._idx = -1
+
+    def preload(self):
+        try:
+            import numpy as np  # keep the import very local
+        except ImportError:
+            np = None
+
+        if np is None or not self._canpreloadarrays():
+            super(JournalData, self).preload()
+        else:
+            self._preloadarrays(
+                np.frombuffer(self._dtcolumn),
+                [(line, np.frombuffer(column))
+                 for line, column in self._colarrays])
+
+    def _load(self):
+        self._idx += 1
+        if self._idx >= self._size:
+            return False
+
+        for line, column in self._colarrays:
+            line[0] = column[self._idx]
+
+        self.lines.datetime[0] = self._dtcolumn[self._idx]
+        return True
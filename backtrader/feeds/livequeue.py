@@ -0,0 +1,563 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import datetime
+import threading
+import time
+
+from backtrader import feed
+from backtrader.dataseries import TimeFrame
+from backtrader.feeds.journal import Journal
+from backtrader.utils.py3 import integer_types, queue
+
+
+__all__ = ['LiveQueueData', 'RingQueue', 'RingGroup', 'LiveAggregator']
+
+
+class RingGroup(object):
+    '''Wakes up the reader of a group of ``RingQueue`` instances (ex: the
+    datas of a multi-symbol stream, all of them read by the thread of
+    ``Cerebro``) when an item is put in any of them. While the reader waits
+    on an empty queue of the group, the bar of another data ends the wait at
+    once and ``Cerebro`` moves on to deliver it
+    '''
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queues = list()
+
+    def add(self, q):
+        self._queues.append(q)
+
+    def notify(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _ready(self):
+        return any(q._items for q in self._queues)
+
+    def wait(self, timeout=None):
+        '''Waits until any queue of the group has an item. Returns ``False``
+        if the timeout expired'''
+        with self._cond:
+            return self._cond.wait_for(self._ready, timeout)
+
+
+class RingQueue(object):
+    '''Ring buffer with the interface of ``queue.Queue`` used by
+    ``LiveQueueData``, for a single producer and a single reader
+
+    The items are kept in a ``collections.deque`` whose ``append`` and
+    ``popleft`` are atomic: neither side takes a lock to move an item. If
+    ``maxlen`` items are waiting, the oldest one is dropped to make room.
+    The lock of the ``RingGroup`` is only taken to wake up a waiting reader
+
+    Params:
+
+      - ``maxlen`` (default: ``None``): size of the ring (``None``: no limit)
+      - ``group`` (default: ``None``): ``RingGroup`` shared with other
+        queues. A private one is created if ``None``
+    '''
+    def __init__(self, maxlen=None, group=None):
+        self._items = collections.deque(maxlen=maxlen)
+        self.group = group if group is not None else RingGroup()
+        self.group.add(self)
+
+    def put(self, item):
+        self._items.append(item)
+        self.group.notify()
+
+    def qsize(self):
+        return len(self._items)
+
+    def empty(self):
+        return not self._items
+
+    def get(self, block=True, timeout=None):
+        try:
+            return self._items.popleft()
+        except IndexError:
+            pass
+
+        if block and (timeout is None or timeout > 0.0):
+            self.group.wait(timeout)
+            try:
+                return self._items.popleft()
+            except IndexError:
+                pass
+
+        raise queue.Empty
+
+
+class LiveQueueData(feed.DataBase):
+    '''Base class for live feeds which receive complete bars from a producer
+    running in the background (a thread, a websocket client) through the
+    queue ``qlive``
+
+    ``_load`` blocks on the queue for the time given by ``Cerebro`` with
+    ``do_qcheck`` (at most ``qcheck`` seconds) instead of returning at once,
+    so the run loop sleeps between bars and wakes up as soon as a bar is put
+    in the queue. Notifications and timers are still checked each ``qcheck``
+    seconds
+
+    Subclasses start the producer in ``_startlive`` and stop it in
+    ``_stoplive``. ``qlive`` is a ``queue.Queue`` which subclasses may
+    replace in ``__init__`` (ex: with a ``RingQueue``). The producer puts in
+    ``qlive``:
+
+      - bars: ``dict`` with the key ``datetime`` (a ``datetime`` or the
+        number delivered by ``date2num``) and the names of the lines (ex:
+        ``open``, ``close``). Missing lines are set to ``0.0``. Bars which
+        are not newer than the last one (ex: sent again after a
+        reconnection) are discarded
+
+      - a status (ex: ``CONNBROKEN`` while reconnecting), which is notified
+
+      - ``None`` or ``DISCONNECTED``: the feed is over
+
+    A bar with the key ``update`` set to ``True`` updates the last delivered
+    bar in place instead of adding a new one (the forming bar of a
+    ``replaydata``-like feed): the strategy and its indicators see ``next``
+    again with the same length. Its ``datetime`` may not be older than the
+    one of the last bar. If ``Cerebro`` cannot deliver it yet (it is ahead of
+    other datas) the bar is restored and the update waits in the feed
+
+    Each delivered bar notifies ``LIVE`` if no other bar is waiting in the
+    queue and ``DELAYED`` if the feed is catching up with a backlog
+
+    Params:
+
+      - ``qcheck`` (default: ``0.5``)
+
+        Maximum time in seconds to wait for a bar before giving control back
+        to ``Cerebro``
+
+      - ``staletimeout`` (default: ``None``)
+
+        If no bar has been received for this many seconds while ``LIVE``,
+        notify ``DELAYED``
+
+      - ``journal`` (default: ``None``)
+
+        Prefix of a ``Journal`` in which each received bar (and update) is
+        recorded, to replay the session with ``JournalData``
+
+      - ``journaldelay`` (default: ``1.0``)
+
+        The records of the journal are synced to disk in blocks: at most
+        once every ``journaldelay`` seconds (also while waiting for bars),
+        when ``256`` of them are waiting and when the feed stops. A crash
+        loses at most the records of the last ``journaldelay`` seconds
+    '''
+    params = (
+        ('qcheck', 0.5),
+        ('staletimeout', None),
+        ('journal', None),
+        ('journaldelay', 1.0),
+    )
+
+    def islive(self):
+        '''Returns ``True`` to notify ``Cerebro`` that preloading and runonce
+        should be deactivated'''
+        return True
+
+    def __init__(self):
+        self.qlive = queue.Queue()
+
+    def start(self):
+        super(LiveQueueData, self).start()
+        self._lastdt = float('-inf')
+        self._lastbar = time.time()
+        self._over = False
+        self._pending = None  # (datetime, bar) fetched but not yet delivered
+        self._inplace = None  # (previous values, update) to undo a rewind
+        self._journal = None
+        if self.p.journal is not None:
+            aliases = self.getlinealiases()
+            self._jlines = [getattr(self.lines, x) for x in aliases]
+            self._journal = Journal(self.p.journal,
+                                    columns=aliases + ('update',),
+                                    delay=self.p.journaldelay,
+                                    timeframe=self._timeframe,
+                                    compression=self._compression)
+        self._startlive()
+
+    def stop(self):
+        super(LiveQueueData, self).stop()
+        self._stoplive()
+        if self._journal is not None:
+            self._journal.close()
+
+    def _resume(self):
+        self._lastdt = self.lines.datetime[0]  # discard bars already seen
+
+    def _startlive(self):
+        '''To be overriden by subclasses to start the producer'''
+        pass
+
+    def _stoplive(self):
+        '''To be overriden by subclasses to stop the producer'''
+        pass
+
+    def haslivedata(self):
+        return self._pending is not None or not self.qlive.empty()
+
+    def next(self, datamaster=None, ticks=True):
+        self._inplace = None
+        if len(self) and len(self) >= self.buflen():
+            if self._pending is None:
+                pending = self._getbar()
+                if not pending:  # nothing yet (None) or over (False)
+                    return pending
+
+                self._pending = pending
+
+            dt, bar = self._pending
+            if bar.get('update', False):
+                if datamaster is not None and \
+                        dt > datamaster.lines.datetime[0]:
+                    return False  # too early, keep it for later
+
+                # update the current bar: no forward/backwards of the lines
+                self._pending = None
+                self._inplace = (self._getbarvalues(), (dt, bar))
+                self._setbar(dt, bar)
+                self._delivered()
+                return True
+
+        return super(LiveQueueData, self).next(datamaster=datamaster,
+                                               ticks=ticks)
+
+    def rewind(self, size=1):
+        if self._inplace is not None:  # undo the update, deliver it later
+            values, self._pending = self._inplace
+            self._inplace = None
+            for line, value in zip(self.lines, values):
+                line[0] = value
+            self._lastdt = self.lines.datetime[0]
+            return
+
+        super(LiveQueueData, self).rewind(size)
+
+    def _load(self):
+        if self._pending is None:
+            pending = self._getbar()
+            if not pending:
+                return pending
+
+            self._pending = pending
+
+        (dt, bar), self._pending = self._pending, None
+        self._setbar(dt, bar)
+        self._delivered()
+        return True
+
+    def _getbar(self):
+        '''Waits for the next bar and returns ``(datetime, bar)``, ``None``
+        if no bar has arrived in time or ``False`` if the feed is over'''
+        if self._over:
+            return False
+
+        while True:
+            try:
+                msg = self.qlive.get(timeout=self._qcheck)
+            except queue.Empty:
+                if self._journal is not None:
+                    self._journal.flushdue()  # the last ones of a burst
+
+                if self.p.staletimeout is not None and \
+                        self._laststatus == self.LIVE and \
+                        time.time() - self._lastbar > self.p.staletimeout:
+                    self.put_notification(self.DELAYED)
+
+                return None  # nothing yet, let cerebro check other things
+
+            if msg is None or msg == self.DISCONNECTED:
+                self.put_notification(self.DISCONNECTED)
+                self._over = True
+                return False
+
+            if isinstance(msg, integer_types):
+                self.put_notification(msg)
+                continue
+
+            dt = msg['datetime']
+            if isinstance(dt, datetime.datetime):
+                dt = self.date2num(dt)
+
+            if dt < self._lastdt or \
+                    (dt == self._lastdt and not msg.get('update', False)):
+                continue  # already seen
+
+            return dt, msg
+
+    def _delivered(self):
+        self._lastbar = time.time()
+        if self.qlive.empty():
+            self.put_notification(self.LIVE)
+        else:
+            self.put_notification(self.DELAYED)
+
+    def _getbarvalues(self):
+        return [line[0] for line in self.lines]
+
+    def _setbar(self, dt, bar):
+        self._lastdt = dt
+        self.lines.datetime[0] = dt
+        for alias in self.getlinealiases():
+            if alias != 'datetime':
+                getattr(self.lines, alias)[0] = bar.get(alias, 0.0)
+
+        if self._journal is not None:
+            self._journal.append([line[0] for line in self._jlines] +
+                                 [float(bar.get('update', False))])
+
+
+class _AggregatedData(LiveQueueData):
+    '''Data created by ``LiveAggregator.getdata``'''
+    params = (('source', None),)
+
+    def _startlive(self):
+        if self.p.source is not None:
+            self.p.source.start()
+
+    def _stoplive(self):
+        if self.p.source is not None:
+            self.p.source.stop()
+
+
+class LiveAggregator(object):
+    '''Builds in one pass the bars of several timeframes (ex: 1m, 5m, 15m,
+    1h, 4h) out of a single source of trades or partial bars (ex: the
+    forming 1m kline of an exchange) and delivers each timeframe to its own
+    ``LiveQueueData``, created with ``getdata``. All of them share one
+    ``RingGroup``
+
+    The producer calls:
+
+      - ``trade(dt, price, size)`` for each trade
+
+      - ``update(dt, end, open, high, low, close, volume, closed)`` for each
+        update of a partial bar which starts at ``dt`` and ends at ``end``.
+        The values replace those of the previous update until ``closed`` is
+        ``True`` or an update with another ``dt`` arrives. Bars can only be
+        built for timeframes which are multiples of the partial bar
+
+      - ``flush(dt)`` to close the bars which end at or before ``dt`` when
+        nothing else arrives (ex: from a timer, with trades)
+
+      - ``put(status)`` to notify a status to all datas (``None``: the feed
+        is over)
+
+    A bar is delivered as soon as the source goes past its end or a closed
+    update reaches it. Its datetime is the end of the period, as with
+    ``resampledata``. Datas created with ``partial=True`` also receive the
+    forming bar after each trade or update, as updates in place (see
+    ``LiveQueueData``) carrying the datetime of the trade or of the start of
+    the partial bar
+
+    Datetimes are naive UTC ``datetime`` instances. Periods are aligned to
+    multiples of their length counted from 1970-01-01 (a 4h bar starts at 0,
+    4, 8 ... UTC). Only ``Seconds``, ``Minutes`` and ``Days`` are supported
+
+    Params:
+
+      - ``ringsize`` (default: ``None``): ``maxlen`` of the ``RingQueue`` of
+        each data
+      - ``group`` (default: ``None``): ``RingGroup`` of the datas. A private
+        one is created if ``None``
+      - ``source`` (default: ``None``): object with ``start`` and ``stop``
+        methods (ex: the websocket client feeding the aggregator), called
+        when each data starts and stops
+    '''
+    Spans = {
+        TimeFrame.Seconds: 1,
+        TimeFrame.Minutes: 60,
+        TimeFrame.Days: 86400,
+    }
+
+    _epoch = datetime.datetime(1970, 1, 1)
+    _minstep = 0.001  # seconds, a forming bar is after the end of the last
+
+    class _Frame(object):
+        def __init__(self, span):
+            self.span = span
+            self.queues = list()  # complete bars only
+            self.partials = list()  # complete and forming bars
+            self.start = self.end = None
+            self.bar = None  # [open, high, low, close, volume] committed
+            self.sent = False  # the forming bar has been delivered
+
+    def __init__(self, ringsize=None, group=None, source=None):
+        self.ringsize = ringsize
+        self.group = group if group is not None else RingGroup()
+        self.source = source
+        self._frames = list()
+        self._unit = None  # (start, end, values) of the partial bar
+        self._last = float('-inf')  # start of the last trade/partial bar
+
+    def getdata(self, timeframe=TimeFrame.Minutes, compression=1,
+                partial=False, **kwargs):
+        '''Returns a ``LiveQueueData`` which receives the bars of
+        ``timeframe``/``compression`` (and the forming bar if ``partial``).
+        ``kwargs`` are passed to the data (ex: ``name``)'''
+        if timeframe not in self.Spans:
+            raise ValueError('Only Seconds, Minutes and Days can be '
+                             'aggregated')
+
+        span = self.Spans[timeframe] * compression
+        for frame in self._frames:
+            if frame.span == span:
+                break
+        else:
+            frame = self._Frame(span)
+            self._frames.append(frame)
+            self._frames.sort(key=lambda x: x.span)
+
+        data = _AggregatedData(source=self.source, timeframe=timeframe,
+                               compression=compression, **kwargs)
+        data.qlive = RingQueue(maxlen=self.ringsize, group=self.group)
+        (frame.partials if partial else frame.queues).append(data.qlive)
+        return data
+
+    def _secs(self, dt):
+        return (dt - self._epoch).total_seconds()
+
+    def _datetime(self, secs):
+        return self._epoch + datetime.timedelta(seconds=secs)
+
+    def put(self, status):
+        for frame in self._frames:
+            for q in frame.queues + frame.partials:
+                q.put(status)
+
+    def trade(self, dt, price, size=0.0):
+        t = self._secs(dt)
+        if t >= self._last:
+            self._add(t, (price, price, price, price, size), True)
+
+    def update(self, dt, end, open, high, low, close, volume=0.0,
+               closed=False):
+        t = self._secs(dt)
+        if t < self._last or (t == self._last and self._unit is None):
+            return  # sent again (ex: after a reconnection)
+
+        values = (open, high, low, close, volume)
+        self._add(t, values, closed, self._secs(end))
+
+    def _add(self, t, values, closed, end=None):
+        self._last = t
+        if self._unit is not None and self._unit[0] != t:
+            self._commit(self._unit[2])  # the partial bar is over
+            self._unit = None
+
+        self._close(t)
+
+        if closed:
+            self._commit(values)
+            self._unit = None
+        else:
+            self._unit = (t, end, values)
+
+        for frame in self._frames:
+            if frame.start is None:
+                frame.start = t - t % frame.span
+                frame.end = frame.start + frame.span
+                if closed:
+                    self._commit(values, frames=[frame])
+
+            if frame.partials:
+                self._putpartial(frame, t)
+
+        if closed and end is not None:
+            self._close(end)
+
+    def flush(self, dt):
+        t = self._secs(dt)
+        if self._unit is not None and self._unit[1] <= t:
+            self._commit(self._unit[2])
+            self._unit = None
+
+        self._close(t)
+
+    def _commit(self, values, frames=None):
+        open, high, low, close, volume = values
+        for frame in frames or self._frames:
+            if frame.start is None:
+                continue  # opened with the values already in
+
+            bar = frame.bar
+            if bar is None:
+                frame.bar = list(values)
+                continue
+
+            if high > bar[1]:
+                bar[1] = high
+            if low < bar[2]:
+                bar[2] = low
+            bar[3] = close
+            bar[4] += volume
+
+    def _close(self, t):
+        for frame in self._frames:
+            if frame.end is None or t < frame.end:
+                continue
+
+            if frame.bar is not None:
+                bar = self._makebar(frame, self._datetime(frame.end))
+                for q in frame.queues:
+                    q.put(bar)
+
+                if frame.partials:
+                    bar = dict(bar, update=frame.sent)
+                    for q in frame.partials:
+                        q.put(bar)
+
+            frame.start = frame.end = frame.bar = None
+            frame.sent = False
+
+    def _putpartial(self, frame, t):
+        values = frame.bar
+        if self._unit is not None:
+            unit = self._unit[2]
+            if values is None:
+                values = unit
+            else:
+                values = (values[0], max(values[1], unit[1]),
+                          min(values[2], unit[2]), unit[3],
+                          values[4] + unit[4])
+
+        if values is None:
+            return
+
+        dt = self._datetime(max(t, frame.start + self._minstep))
+        bar = self._makebar(frame, dt, values)
+        bar['update'] = frame.sent
+        frame.sent = True
+        for q in frame.partials:
+            q.put(bar)
+
+    def _makebar(self, frame, dt, values=None):
+        open, high, low, close, volume = values or frame.bar
+        return dict(datetime=dt, open=open, high=high, low=low, close=close,
+                    volume=volume)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+Binary bar store made of one ``float64`` column per line, preceded by a small
+header, which is read by memory mapping the file
+
+Layout of the file:
+
+  - 8 bytes: ``MAGIC``
+  - 8 bytes: length of the header (little endian unsigned integer)
+  - header: ``json`` text (padded with spaces to a multiple of 8 bytes) with
+    the keys ``lines`` (names of the columns, in order), ``size`` (number of
+    bars), ``timeframe``, ``compression``, ``tz`` (name or ``None``) and
+    ``byteorder`` of the values
+  - the columns, one after the other, each with ``size`` values. The
+    ``datetime`` column holds the values delivered by ``date2num`` (UTC)
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+
+from backtrader import feed, TimeFrame
+from backtrader.utils.py3 import string_types
+
+
+__all__ = ['MemMapData']
+
+MAGIC = b'BTMMAP01'
+
+
+# files mapped by this process to unpickle line storages (key: file name)
+_mapped = dict()
+
+
+class _MappedFile(mmap.mmap):
+    '''Read-only mapping of a file'''
+    def __new__(cls, filename, stamp=None):
+        with io.open(filename, 'rb') as f:
+            self = super(_MappedFile, cls).__new__(
+                cls, f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.filename = filename
+        self.stamp = stamp or _stamp(filename)
+        return self
+
+    def view(self, offset, size):
+        '''Returns a read-only ``memoryview`` of ``size`` doubles starting
+        at the double ``offset``'''
+        return memoryview(self).cast('d')[offset:offset + size]
+
+
+def _stamp(filename):
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime
+
+
+def mapview(filename, stamp, offset, size):
+    '''Returns the ``_MappedArray`` of ``size`` doubles starting at the
+    double ``offset`` of ``filename``, which is mapped only once per process
+    (ex: by each optimization worker)'''
+    mfile = _mapped.get(filename)
+    if mfile is None or mfile.stamp != stamp:
+        if _stamp(filename) != tuple(stamp):
+            raise ValueError('%s has changed since it was mapped' % filename)
+
+        mfile = _mapped[filename] = _MappedFile(filename, stamp=tuple(stamp))
+
+    return _MappedArray(mfile, offset, size)
+
+
+class _MappedArray(object):
+    '''
+    Storage of a preloaded line backed by a read-only view of a mapped file.
+    It can be read like the original storage and is pickled as the location
+    of the values in the file, which is mapped again when unpickled
+    '''
+    def __init__(self, mfile, offset, size):
+        self.mfile = mfile
+        self.offset = offset
+        self.size = size
+        self._mview = mfile.view(offset, size)
+
+    def __reduce__(self):
+        return (mapview, (self.mfile.filename, self.mfile.stamp,
+                          self.offset, self.size))
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        return self._mview[key]
+
+    def __iter__(self):
+        return iter(self._mview)
+
+
+def _tzname(tz):
+    if tz is None or isinstance(tz, string_types):
+        return tz
+
+    return getattr(tz, 'zone', None) or str(tz)  # pytz or others
+
+
+def writebars(filename, columns, timeframe=TimeFrame.Days, compression=1,
+              tz=None):
+    '''Writes the bars to ``filename`` in the memory mapped format
+
+    Keyword Args:
+        filename (str): name of the file to write
+        columns (list): (name, values) pairs, one per line. A ``datetime``
+        column with the values delivered by ``date2num`` must be present
+        timeframe (int): ``TimeFrame`` of the bars
+        compression (int): compression of the bars
+        tz: timezone (or its name) to present the datetimes in
+    '''
+    columns = [(name, array.array(str('d'), values))
+               for name, values in columns]
+    if 'datetime' not in [name for name, _ in columns]:
+        raise ValueError('A datetime column is needed')
+
+    sizes = set(len(values) for _, values in columns)
+    if len(sizes) != 1:
+        raise ValueError('All columns must have the same size')
+
+    header = dict(
+        lines=[name for name, _ in columns],
+        size=sizes.pop(),
+        timeframe=timeframe,
+        compression=compression,
+        tz=_tzname(tz),
+        byteorder=sys.byteorder,
+    )
+    header = json.dumps(header).encode('utf-8')
+    header += b' ' * (-len(header) % 8)  # keep the columns aligned
+
+    with io.open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack(str('<Q'), len(header)))
+        f.write(header)
+        for _, values in columns:
+            values.tofile(f)
+
+
+def writedata(filename, data):
+    '''Writes the bars held by the (preloaded or already run) ``data`` to
+    ``filename`` in the memory mapped format'''
+    size = len(data)
+    columns = [(alias, getattr(data.lines, alias).get(ago=0, size=size))
+               for alias in data.getlinealiases()]
+
+    writebars(filename, columns, timeframe=data._timeframe,
+              compression=data._compression, tz=data.p.tz)
+
+
+def readheader(filename):
+    '''Returns the header of ``filename`` as a dictionary, with the
+    additional key ``offset``, the position of the 1st column'''
+    with io.open(filename, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('%s is not a memory mapped bar file' % filename)
+
+        hlen, = struct.unpack(str('<Q'), f.read(8))
+        header = json.loads(f.read(hlen).decode('utf-8'))
+
+    header['offset'] = len(MAGIC) + 8 + hlen
+    return header
+
+
+class MemMapData(feed.DataBase):
+    '''
+    Reads the bars of a file in the memory mapped format (see
+    ``tools/rewrite-data.py`` to convert other formats)
+
+    Params:
+
+      - ``dataname``: the name of the file
+
+      - ``timeframe`` and ``compression`` (default: ``None``): if not given,
+        the values of the file are used
+
+      - ``tz`` (default: ``None``): if not given, the timezone of the file
+        (if any) is used
+
+    When preloading, the lines are backed by read-only views of the mapped
+    columns: the values are not copied and the memory is shared with other
+    processes (ex: optimization workers, which receive the views pickled as
+    their location in the file) through the page cache of the OS. The lines
+    of the data cannot be modified in this case
+
+    The columns are copied in bulk to the lines instead if the bars have to
+    go through filters, if a lookahead is in place or if the values are not
+    in the byte order of the machine. Lines which are not in the file are
+    filled with ``NaN`` and columns which are not lines are ignored
+    '''
+    params = (
+        ('timeframe', None),
+        ('compression', None),
+    )
+
+    def __init__(self):
+        self._header = readheader(self.p.dataname)
+        if self.p.timeframe is None:
+            self.p.timeframe = self._header['timeframe']
+        if self.p.compression is None:
+            self.p.compression = self._header['compression']
+        if self.p.tz is None:
+            self.p.tz = self._header['tz']
+
+        self._mmap = None
+
+    def start(self):
+        super(MemMapData, self).start()
+
+        header = self._header
+        self._size = size = header['size']
+        self._mmap = _MappedFile(self.p.dataname)
+        self._native = header['byteorder'] == sys.byteorder
+
+        self._columns = columns = dict()
+        self._offsets = offsets = dict()  # in doubles
+        offset = header['offset'] // 8
+        for name in header['lines']:
+            column = self._mmap.view(offset, size)
+            if not self._native:
+                column = array.array(str('d'), column.tobytes())
+                column.byteswap()
+
+            columns[name] = column
+            offsets[name] = offset
+            offset += size
+
+        self._colarrays = [(getattr(self.lines, x), columns[x])
+                           for x in self.getlinealiases()
+                           if x != 'datetime' and x in columns]
+        self._idx = -1
+        self._viewed = False  # lines backed by views of the columns
+
+    def stop(self):
+        super(MemMapData, self).stop()
+        self._close()
+
+    def _close(self):
+        if self._mmap is not None:
+            self._columns = self._colarrays = None
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # backing preloaded lines: released with them
+
+            self._mmap = None
+
+    def preload(self):
+        try:
+            import numpy as np  # keep the import very local
+        except ImportError:
+            np = None
+
+        if np is None or not self._canpreloadarrays():
+            super(MemMapData, self).preload()
+        elif not self._preloadviews(np):
+            self._preloadarrays(
+                np.frombuffer(self._columns['datetime']),
+                [(line, np.frombuffer(column))
+                 for line, column in self._colarrays])
+
+        # preloaded - the mapping is only kept by the views backing the lines
+        self._close()
+
+    def _preloadviews(self, np):
+        '''Backs the lines with views of the mapped columns, applying the
+        same ``fromdate``/``todate`` selection as ``load``. Returns ``False``
+        if it cannot be done'''
+        lines = [self.lines[i] for i in range(self.lines.fullsize())]
+        if not self._native or any(x.mode != x.UnBounded or x.extension or
+                                   len(x.array) for x in lines):
+            return False
+
+        dtarray = np.frombuffer(self._columns['datetime'])
+        if not np.all(dtarray[1:] >= dtarray[:-1]):
+            return False  # unsorted: selected with a copy
+
+        start = int(np.searchsorted(dtarray, self.fromdate))
+        end = int(np.searchsorted(dtarray, self.todate, side='right'))
+        size = max(0, end - start)
+
+        aliases = self.getlinealiases()
+        for i, line in enumerate(lines):
+            offset = self._offsets.get(aliases[i] if i < len(aliases) else None)
+            if offset is None:
+                line.forwardvalues(np.full(size, float('NaN')))
+            else:
+                line.array = _MappedArray(self._mmap, offset + start, size)
+                line.idx += size
+                line.lencount += size
+
+        self._viewed = True
+        self._last()
+        self.home()
+        return True
+
+    def load(self):
+        if self._viewed:
+            return False  # all bars preloaded and the lines cannot grow
+
+        return super(MemMapData, self).load()
+
+    def _load(self):
+        if self._mmap is None:
+            return False
+
+        self._idx += 1
+        if self._idx >= self._size:
+            return False
+
+        for line, column in self._colarrays:
+            line[0] = column[self._idx]
+
+        self.lines.datetime[0] = self._columns['datetime'][self._idx]
+        return True
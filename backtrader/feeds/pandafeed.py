@@ -24,9 +24,21 @@ from __future__ import (absolute_import, division, print_function,
 from backtrader.utils.py3 import filter, string_types, integer_types
 
 from backtrader import date2num
+from backtrader.utils import dtarray2num
 import backtrader.feed as feed
 
 
+def _dtnums(dtvalues):
+    '''Converts pandas datetime values (index or column) to the float numbers
+    delivered by ``date2num`` in a single vectorized pass'''
+    values = dtvalues.values  # timezone aware values are delivered as UTC
+    if values.dtype.kind != 'M':  # not datetime64, let the scalar code do it
+        import numpy as np  # guaranteed by pandas
+        return np.array([date2num(x.to_pydatetime()) for x in dtvalues])
+
+    return dtarray2num(values)
+
+
 class PandasDirectData(feed.DataBase):
     '''
     Uses a Pandas DataFrame as the feed source, iterating directly over the
@@ -120,6 +132,11 @@ class PandasData(feed.DataBase):
 
       - The ``dataname`` parameter is a Pandas DataFrame
 
+      - The columns are extracted as ``float64`` arrays and the datetimes
+        converted in one go during ``start``. When preloading (and no filters
+        or ``tzinput`` are in place) the arrays are copied in bulk to the
+        lines, without loading bar by bar
+
       - Values possible for datetime
 
         - None: the index contains the datetime
@@ -231,14 +248,8 @@ class PandasData(feed.DataBase):
 
             self._colmapping[k] = v
 
-    def _load(self):
-        self._idx += 1
-
-        if self._idx >= len(self.p.dataname):
-            # exhausted all rows
-            return False
-
-        # Set the standard datafields
+        # Extract the columns once, to avoid indexing the dataframe per bar
+        self._colarrays = list()
         for datafield in self.getlinealiases():
             if datafield == 'datetime':
                 continue
@@ -248,26 +259,41 @@ class PandasData(feed.DataBase):
                 # datafield signaled as missing in the stream: skip it
                 continue
 
-            # get the line to be set
-            line = getattr(self.lines, datafield)
-
-            # indexing for pandas: 1st is colum, then row
-            line[0] = self.p.dataname.iloc[self._idx, colindex]
+            # indexing for pandas: 1st is row, then column
+            column = self.p.dataname.iloc[:, colindex]
+            self._colarrays.append((getattr(self.lines, datafield),
+                                    column.to_numpy(dtype='float64')))
 
         # datetime conversion
         coldtime = self._colmapping['datetime']
 
         if coldtime is None:
             # standard index in the datetime
-            tstamp = self.p.dataname.index[self._idx]
+            self._dtarray = _dtnums(self.p.dataname.index)
         else:
             # it's in a different column ... use standard column index
-            tstamp = self.p.dataname.iloc[self._idx, coldtime]
+            self._dtarray = _dtnums(self.p.dataname.iloc[:, coldtime])
 
-        # convert to float via datetime and store it
-        dt = tstamp.to_pydatetime()
-        dtnum = date2num(dt)
-        self.lines.datetime[0] = dtnum
+    def preload(self):
+        # subclasses may have their own way of loading a bar
+        if type(self)._load is PandasData._load and self._canpreloadarrays():
+            self._preloadarrays(self._dtarray, self._colarrays)
+            self._idx = len(self._dtarray)  # nothing else to _load
+        else:
+            super(PandasData, self).preload()
+
+    def _load(self):
+        self._idx += 1
+
+        if self._idx >= len(self._dtarray):
+            # exhausted all rows
+            return False
+
+        # Set the standard datafields
+        for line, colarray in self._colarrays:
+            line[0] = colarray[self._idx]
+
+        self.lines.datetime[0] = self._dtarray[self._idx]
 
         # Done ... return
         return True
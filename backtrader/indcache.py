@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import collections
+import hashlib
+import threading
+
+
+__all__ = ['IndicatorCache']
+
+
+class IndicatorCache(object):
+    '''
+    Keeps the values calculated by indicators in ``once`` mode (``preload``
+    and ``runonce`` active) to deliver them again, without calculation, to
+    later runs (for example the other combinations of an optimization running
+    in the same process) which create the same indicator on the same input
+
+    The key of an indicator is made of its class, the values of its params,
+    its minimum period, the length of its clock and a digest of the values of
+    all lines of its inputs. Because the inputs are identified by their
+    values, the datas can be created again for each run (even in different
+    ``Cerebro`` instances) and indicators on top of other indicators (or
+    lines operations) are also recognized
+
+    Indicators whose params cannot be hashed or whose inputs are not held in
+    full (``exactbars``) are always calculated, as are those calculated by
+    going through ``next`` (ex: ``ParabolicSAR``), which may keep a state
+    outside of their lines, unless the class declares ``_cacheonce = True``.
+    Classes depending on more than the values of their inputs declare
+    ``_cacheonce = False``
+
+    The sub-indicators of an indicator delivered from the cache are
+    delivered as well (from the cache if possible), to let them be read
+
+    Params:
+
+      - ``maxsize`` (default: ``256``): maximum number of indicators kept.
+        The least recently used are discarded first
+
+    The object is safe to be used by several threads. Each process (for
+    example the workers of an optimization) has its own cache, which is
+    filled by the first run calculating an indicator
+
+    Attributes:
+
+      - ``hits``: number of indicators delivered from the cache
+      - ``misses``: number of indicators which had to be calculated
+    '''
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        '''Removes all entries and resets the counters'''
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def reset(self):
+        '''Forgets the digests of the lines seen so far. To be called when a
+        run starts and ends, because the lines may be reloaded'''
+        self._local.digests = dict()
+
+    def _digest(self, line):
+        digests = getattr(self._local, 'digests', None)
+        if digests is None:
+            digests = self._local.digests = dict()
+
+        blen = line.buflen()
+        memo = digests.get(id(line))
+        if memo is not None and memo[0] is line and memo[1] == blen:
+            return memo[2]
+
+        if line.mode != line.UnBounded:
+            return None  # older values are gone
+
+        values = line.array
+        values = getattr(values, '_mview', values)  # shared memory
+        if hasattr(values, 'view'):  # numpy based storage
+            values = values.view()
+
+        try:
+            mview = memoryview(values)
+        except TypeError:
+            return None
+
+        digest = hashlib.sha1(mview[:blen].cast('B')).digest()
+        digests[id(line)] = (line, blen, digest)  # keep line: id not reused
+        return digest
+
+    def key(self, ind):
+        '''Returns the key of indicator ``ind`` or ``None`` if it cannot be
+        cached'''
+        try:
+            params = tuple(ind.params._getkwargs().items())
+            hash(params)
+        except TypeError:
+            return None
+
+        digests = list()
+        for data in ind.datas:
+            for line in data.lines:
+                digest = self._digest(line)
+                if digest is None:
+                    return None
+
+                digests.append(digest)
+
+        return (ind.__class__, params, ind._minperiod, ind._clock.buflen(),
+                tuple(digests))
+
+    def get(self, key):
+        '''Returns the values of the lines of the indicator with ``key`` (a
+        list of ``array.array``) or ``None``'''
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+    def put(self, key, ind):
+        '''Stores the values of the lines of indicator ``ind`` under
+        ``key``'''
+        values = list()
+        for line in ind.lines:
+            lvalues = line.array[0:line.buflen()]
+            if not isinstance(lvalues, array.array):  # numpy view
+                lvalues = array.array(str('d'), lvalues.tobytes())
+
+            values.append(lvalues)
+
+        with self._lock:
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # process wide instance used by Cerebro(indcache=True)
+    default = None
+
+    @classmethod
+    def getdefault(cls):
+        if IndicatorCache.default is None:
+            IndicatorCache.default = cls()
+
+        return IndicatorCache.default
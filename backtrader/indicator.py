@@ -86,12 +86,65 @@ class MetaIndicator(IndicatorBase.__class__):
             cls.preonce = cls.preonce_via_prenext
             cls.oncestart = cls.oncestart_via_nextstart
 
+        # Values calculated by going through next may depend on a state
+        # kept in attributes, which a cache hit would not restore: only
+        # cached if the class itself declares it (_cacheonce = True)
+        if '_cacheonce' not in dct:
+            cls._cacheonce = \
+                cls.once != getattr(cls, 'once_via_next', None)
+
 
 class Indicator(with_metaclass(MetaIndicator, IndicatorBase)):
     _ltype = LineIterator.IndType
 
     csv = False
 
+    # cache of the values calculated in "once" mode (IndicatorCache)
+    _oncecache = None
+    # set for each class by the metaclass unless declared: False if the
+    # values are calculated by going through next. Subclasses depending on
+    # more than the values of the datas must declare False
+    _cacheonce = False
+
+    @classmethod
+    def useoncecache(cls, cache):
+        '''Activates (``IndicatorCache`` instance) or deactivates (``None``)
+        the reuse of the values calculated in "once" mode'''
+        Indicator._oncecache = cache
+
+    def _once(self):
+        cache = self._oncecache
+        if cache is None or not self._cacheonce:
+            return super(Indicator, self)._once()
+
+        key = cache.key(self)
+        values = None if key is None else cache.get(key)
+        if values is None:
+            super(Indicator, self)._once()
+            if key is not None:
+                cache.put(key, self)
+            return
+
+        # Same state as after calculating. The (sub)indicators used in the
+        # calculation are delivered as well (from the cache when possible),
+        # because they may be read too (ex: ``macd.signal``)
+        self.forward(size=self._clock.buflen())
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator._once()
+
+        for data in self.datas:
+            data.home()
+
+        for indicator in self._lineiterators[LineIterator.IndType]:
+            indicator.home()
+
+        self.home()
+
+        for line, lvalues in zip(self.lines, values):
+            line.array[0:len(lvalues)] = lvalues
+            line.oncebinding()
+
     def advance(self, size=1):
         # Need intercepting this call to support datas with
         # different lengths (timeframes)
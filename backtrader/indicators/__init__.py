@@ -87,4 +87,5 @@ from .ichimoku import *
 
 from .hurst import *
 from .ols import *
+from .linreg import *
 from .hadelta import *
@@ -21,6 +21,7 @@
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 
+import collections
 import functools
 import math
 import operator
@@ -70,6 +71,158 @@ class OperationN(PeriodN):
             dst[i] = func(src[i - period + 1: i + 1])
 
 
+NAN = float('NaN')
+
+
+class _RunningOperationN(OperationN):
+    '''
+    Base class for ``OperationN`` indicators which keep the result of ``func``
+    up to date in constant (amortized) time, instead of applying ``func`` to
+    the entire period on each bar
+
+    Subclasses provide their own ``once`` kernel and for ``next``:
+
+      - ``_kinit(values)``: seed the state with the ``period - 1`` values
+        preceding the first bar
+
+      - ``_kpush(value)``: add the value of a completed bar to the state
+
+      - ``_kvalue(value)``: result for the state plus the current value
+
+    The value of the current bar only enters the state when the next bar is
+    seen, because it may still be updated (replay, live feeds)
+    '''
+    def nextstart(self):
+        self._klen = len(self)
+        self._kinit(self.data.get(ago=-1, size=self.p.period - 1))
+        self.next()
+
+    def next(self):
+        if len(self) != self._klen:  # new bar, the previous one is complete
+            self._klen = len(self)
+            if self.p.period > 1:
+                self._kpush(self.data[-1])
+
+        self.line[0] = self._kvalue(self.data[0])
+
+
+class _MonotonicN(_RunningOperationN):
+    '''
+    Keeps the extreme of the period with a monotonic deque: values which can
+    no longer be the extreme (``_ktail(tailvalue, newvalue)`` is ``True``) are
+    removed from the tail and the front holds always the result
+
+    ``NaN`` values cannot be ordered and the built-in ``max``/``min`` results
+    depend on their position. If any is in the period, ``func`` is applied to
+    the whole period to deliver exactly the same result
+    '''
+    def _kinit(self, values):
+        self._kbar = 0
+        self._kdeque = collections.deque()  # (barcount, value)
+        self._knans = collections.deque()  # barcount of nan values
+        for value in values:
+            self._kpush(value)
+
+    def _kpush(self, value):
+        self._kbar += 1
+        dq = self._kdeque
+
+        if value != value:
+            self._knans.append(self._kbar)
+        else:
+            tail = self._ktail
+            while dq and tail(dq[-1][1], value):
+                dq.pop()
+
+            dq.append((self._kbar, value))
+
+        limit = self._kbar - self.p.period + 1  # values out of the period
+        if dq and dq[0][0] <= limit:
+            dq.popleft()
+
+        if self._knans and self._knans[0] <= limit:
+            self._knans.popleft()
+
+    def _kvalue(self, value):
+        if self._knans or value != value:
+            return self.func(self.data.get(size=self.p.period))
+
+        if not self._kdeque:
+            return value  # period is 1
+
+        front = self._kdeque[0][1]
+        return value if self._ktail(front, value) else front
+
+    def once(self, start, end):
+        dst = self.line.array
+        src = self.data.array
+        period = self.p.period
+        func = self.func
+        tail = self._ktail
+
+        dq = collections.deque()  # indices, the front holds the extreme
+        lastnan = -period
+        for i in range(start - period + 1, end):
+            value = src[i]
+            if value != value:
+                lastnan = i
+            else:
+                while dq and tail(src[dq[-1]], value):
+                    dq.pop()
+
+                dq.append(i)
+
+            if dq and dq[0] <= i - period:
+                dq.popleft()
+
+            if i < start:
+                continue  # still seeding the 1st period
+
+            if lastnan > i - period:
+                dst[i] = func(src[i - period + 1:i + 1])
+            else:
+                dst[i] = src[dq[0]]
+
+
+class _CountN(_RunningOperationN):
+    '''
+    Counts how many values in the period are hits for ``_kcount`` and
+    delivers ``bool(hits) == _kany``
+    '''
+    def _kinit(self, values):
+        self._kwindow = collections.deque(maxlen=self.p.period - 1)
+        self._khits = 0
+        for value in values:
+            self._kpush(value)
+
+    def _kpush(self, value):
+        window = self._kwindow
+        if len(window) == window.maxlen:
+            self._khits -= window[0]
+
+        hit = self._kcount(value)
+        window.append(hit)
+        self._khits += hit
+
+    def _kvalue(self, value):
+        return bool(self._khits + self._kcount(value)) == self._kany
+
+    def once(self, start, end):
+        dst = self.line.array
+        src = self.data.array
+        period = self.p.period
+        count = self._kcount
+        isany = self._kany
+
+        hits = sum(count(src[i]) for i in range(start - period + 1, start))
+        for i in range(start, end):
+            hits += count(src[i])
+            if i > start:
+                hits -= count(src[i - period])
+
+            dst[i] = bool(hits) == isany
+
+
 class BaseApplyN(OperationN):
     '''
     Base class for ApplyN and others which may take a ``func`` as a parameter
@@ -100,11 +253,12 @@ class ApplyN(BaseApplyN):
     lines = ('apply',)
 
 
-class Highest(OperationN):
+class Highest(_MonotonicN):
     '''
     Calculates the highest value for the data in a given period
 
-    Uses the built-in ``max`` for the calculation
+    Keeps a monotonic deque of candidates to run in linear time. Falls back to
+    the built-in ``max`` if ``NaN`` values are in the period
 
     Formula:
       - highest = max(data, period)
@@ -112,13 +266,15 @@ class Highest(OperationN):
     alias = ('MaxN',)
     lines = ('highest',)
     func = max
+    _ktail = operator.le
 
 
-class Lowest(OperationN):
+class Lowest(_MonotonicN):
     '''
     Calculates the lowest value for the data in a given period
 
-    Uses the built-in ``min`` for the calculation
+    Keeps a monotonic deque of candidates to run in linear time. Falls back to
+    the built-in ``min`` if ``NaN`` values are in the period
 
     Formula:
       - lowest = min(data, period)
@@ -126,6 +282,7 @@ class Lowest(OperationN):
     alias = ('MinN',)
     lines = ('lowest',)
     func = min
+    _ktail = operator.ge
 
 
 class ReduceN(OperationN):
@@ -158,12 +315,13 @@ class ReduceN(OperationN):
         super(ReduceN, self).__init__()
 
 
-class SumN(OperationN):
+class SumN(_RunningOperationN):
     '''
     Calculates the Sum of the data values over a given period
 
-    Uses ``math.fsum`` for the calculation rather than the built-in ``sum`` to
-    avoid precision errors
+    Keeps a running sum, which is recalculated with ``math.fsum`` (rather than
+    the built-in ``sum`` to avoid precision errors) once per ``period`` to
+    keep rounding errors from accumulating
 
     Formula:
       - sumn = sum(data, period)
@@ -171,33 +329,100 @@ class SumN(OperationN):
     lines = ('sumn',)
     func = math.fsum
 
+    # NaN values are counted apart, to let the sum recover once they are no
+    # longer in the period
+
+    def _kinit(self, values):
+        self._kwindow = collections.deque(maxlen=self.p.period - 1)
+        self._ksum = 0.0
+        self._knans = 0
+        self._kpushes = 0
+        for value in values:
+            self._kpush(value)
+
+    def _kpush(self, value):
+        window = self._kwindow
+        if len(window) == window.maxlen:
+            old = window[0]
+            if old != old:
+                self._knans -= 1
+            else:
+                self._ksum -= old
+
+        window.append(value)
+        if value != value:
+            self._knans += 1
+        else:
+            self._ksum += value
+
+        self._kpushes += 1
+        if not self._kpushes % window.maxlen:
+            self._ksum = math.fsum(x for x in window if x == x)
+
+    def _kvalue(self, value):
+        if self._knans or value != value:
+            return NAN
+
+        return self._ksum + value
+
+    def once(self, start, end):
+        dst = self.line.array
+        src = self.data.array
+        period = self.p.period
+        fsum = math.fsum
+
+        for i in range(start, end):
+            if not (i - start) % period:
+                window = src[i - period + 1:i + 1]
+                nans = sum(1 for x in window if x != x)
+                psum = fsum(x for x in window if x == x)
+            else:
+                old, new = src[i - period], src[i]
+                if old != old:
+                    nans -= 1
+                else:
+                    psum -= old
+
+                if new != new:
+                    nans += 1
+                else:
+                    psum += new
+
+            dst[i] = psum if not nans else NAN
+
 
-class AnyN(OperationN):
+class AnyN(_CountN):
     '''
     Has a value of ``True`` (stored as ``1.0`` in the lines) if *any* of the
     values in the ``period`` evaluates to non-zero (ie: ``True``)
 
-    Uses the built-in ``any`` for the calculation
+    Keeps a count of the non-zero values in the period, to deliver the same
+    results as the built-in ``any`` in linear time
 
     Formula:
       - anyn = any(data, period)
     '''
     lines = ('anyn',)
     func = any
+    _kcount = operator.truth
+    _kany = True
 
 
-class AllN(OperationN):
+class AllN(_CountN):
     '''
     Has a value of ``True`` (stored as ``1.0`` in the lines) if *all* of the
     values in the ``period`` evaluates to non-zero (ie: ``True``)
 
-    Uses the built-in ``all`` for the calculation
+    Keeps a count of the zero values in the period, to deliver the same
+    results as the built-in ``all`` in linear time
 
     Formula:
       - alln = all(data, period)
     '''
     lines = ('alln',)
     func = all
+    _kcount = operator.not_
+    _kany = False
 
 
 class FindFirstIndex(OperationN):
@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import collections
+import math
+
+from ..utils.py3 import range
+
+from . import Indicator, PeriodN
+
+
+__all__ = ['RollingLinReg', 'LinReg', 'RollingLinearRegression',
+           'LinRegChannel']
+
+
+NAN = float('NaN')
+
+
+def _linreg(period, sy, sxy, syy):
+    # regression values out of the sums of y, x*y and y*y for x = 0..period-1
+    # (works alike for floats and numpy arrays)
+    sx = period * (period - 1) / 2.0
+    sxx = period * (period - 1) * (2 * period - 1) / 6.0
+    xvar = period * sxx - sx * sx
+    cov = period * sxy - sx * sy
+    yvar = period * syy - sy * sy
+
+    slope = cov / xvar
+    intercept = (sy - slope * sx) / period
+    endpoint = intercept + slope * (period - 1)
+    return slope, intercept, endpoint, cov, xvar, yvar
+
+
+def _r2(cov, xvar, yvar):
+    if yvar <= 0.0:  # constant values (or rounding): nothing to explain
+        return 0.0
+
+    return min(1.0, cov * cov / (xvar * yvar))
+
+
+class RollingLinReg(PeriodN):
+    '''
+    Least squares regression line of the data over the last ``period`` bars
+    (at least 2). ``x`` is ``0`` for the oldest bar in the period and ``period - 1`` for the
+    current one, which delivers the same fit as
+    ``numpy.polyfit(range(period), values, 1)``
+
+    ``next`` keeps running sums of ``y``, ``x * y`` and ``y * y`` and updates
+    them in constant time when the period moves. The sums are recalculated
+    with ``math.fsum`` once per ``period`` to keep rounding errors from
+    accumulating. ``once`` calculates the sums for the whole series at once
+    with ``numpy`` if available
+
+    Formula:
+      - slope = (n * sum(x * y) - sum(x) * sum(y)) / (n * sum(x * x) - sum(x)**2)
+      - intercept = (sum(y) - slope * sum(x)) / n
+      - endpoint = intercept + slope * (n - 1)
+      - r2 = correlation(x, y)**2 (0.0 if the values are constant)
+
+    See also:
+      - https://en.wikipedia.org/wiki/Simple_linear_regression
+    '''
+    alias = ('LinReg', 'RollingLinearRegression',)
+    lines = ('slope', 'intercept', 'endpoint', 'r2',)
+    params = (('period', 20),)
+
+    plotlines = dict(slope=dict(_plotskip=True),
+                     intercept=dict(_plotskip=True),
+                     r2=dict(_plotskip=True))
+
+    def _plotlabel(self):
+        return [self.p.period]
+
+    def __init__(self):
+        if self.p.period < 2:  # no line can be fitted through a single point
+            raise ValueError('RollingLinReg needs a period of at least 2, '
+                             'got %s' % self.p.period)
+
+        super(RollingLinReg, self).__init__()
+
+    # The value of the current bar only enters the sums when the next bar is
+    # seen, because it may still be updated (replay, live feeds). NaN values
+    # are counted apart, to let the sums recover once they leave the period
+
+    def nextstart(self):
+        self._klen = len(self)
+        self._kwindow = collections.deque(maxlen=self.p.period - 1)
+        self._ksums()
+        for value in self.data.get(ago=-1, size=self.p.period - 1):
+            self._kpush(value)
+
+        self.next()
+
+    def _ksums(self):
+        window = self._kwindow
+        self._knans = sum(1 for y in window if y != y)
+        self._ksy = math.fsum(y for y in window if y == y)
+        self._ksxy = math.fsum(x * y for x, y in enumerate(window) if y == y)
+        self._ksyy = math.fsum(y * y for y in window if y == y)
+        self._kpushes = 0
+
+    def _kpush(self, value):
+        window = self._kwindow
+        if len(window) == window.maxlen:
+            # the oldest leaves and all others move one x position back
+            old = window[0]
+            if old != old:
+                self._knans -= 1
+            else:
+                self._ksy -= old
+                self._ksyy -= old * old
+
+            self._ksxy -= self._ksy
+
+        x = min(len(window), window.maxlen - 1)
+        window.append(value)
+        if value != value:
+            self._knans += 1
+        else:
+            self._ksy += value
+            self._ksxy += x * value
+            self._ksyy += value * value
+
+        self._kpushes += 1
+        if self._kpushes >= window.maxlen:
+            self._ksums()
+
+    def next(self):
+        period = self.p.period
+        if len(self) != self._klen:  # new bar, the previous one is complete
+            self._klen = len(self)
+            self._kpush(self.data[-1])
+
+        value = self.data[0]
+        if self._knans or value != value:
+            for line in self.lines:
+                line[0] = NAN
+            return
+
+        slope, intercept, endpoint, cov, xvar, yvar = _linreg(
+            period,
+            self._ksy + value,
+            self._ksxy + (period - 1) * value,
+            self._ksyy + value * value)
+
+        self.lines.slope[0] = slope
+        self.lines.intercept[0] = intercept
+        self.lines.endpoint[0] = endpoint
+        self.lines.r2[0] = _r2(cov, xvar, yvar)
+
+    def once(self, start, end):
+        if end <= start:  # data shorter than the period: nothing to fit
+            return
+
+        try:
+            import numpy as np  # keep the import very local
+        except ImportError:
+            return self._onceloop(start, end)
+
+        period = self.p.period
+        src = np.asarray(self.data.array[start - period + 1:end], dtype='d')
+        if len(src) != end - start + period - 1:
+            return  # not enough values: correlate would swap its inputs
+
+        # sums over each period: correlation with constant/linear weights
+        ones = np.ones(period)
+        sy = np.correlate(src, ones, 'valid')
+        sxy = np.correlate(src, np.arange(period, dtype='d'), 'valid')
+        syy = np.correlate(src * src, ones, 'valid')
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope, intercept, endpoint, cov, xvar, yvar = _linreg(
+                period, sy, sxy, syy)
+            r2 = np.where(yvar > 0.0, cov * cov / (xvar * yvar), 0.0)
+
+        r2 = np.where(np.isnan(sy), NAN, np.minimum(r2, 1.0))
+        for line, values in zip(self.lines, (slope, intercept, endpoint, r2)):
+            line.array[start:end] = array.array(str('d'), values.tobytes())
+
+    def _onceloop(self, start, end):
+        # without numpy: the running sums of next over the array
+        period = self.p.period
+        src = self.data.array
+        dsts = [line.array for line in self.lines]
+
+        for i in range(start, end):
+            if not (i - start) % period:
+                window = src[i - period + 1:i + 1]
+                nans = sum(1 for y in window if y != y)
+                sy = math.fsum(y for y in window if y == y)
+                sxy = math.fsum(x * y for x, y in enumerate(window) if y == y)
+                syy = math.fsum(y * y for y in window if y == y)
+            else:
+                old, new = src[i - period], src[i]
+                if old != old:
+                    nans -= 1
+                else:
+                    sy -= old
+                    syy -= old * old
+
+                sxy -= sy
+                if new != new:
+                    nans += 1
+                else:
+                    sy += new
+                    sxy += (period - 1) * new
+                    syy += new * new
+
+            if nans:
+                values = (NAN, NAN, NAN, NAN)
+            else:
+                values = _linreg(period, sy, sxy, syy)
+                values = values[:3] + (_r2(*values[3:]),)
+
+            for dst, value in zip(dsts, values):
+                dst[i] = value
+
+
+class LinRegChannel(Indicator):
+    '''
+    Channel made of the endpoints of the regression lines (see
+    ``RollingLinReg``) of the ``high`` and ``low`` prices over the last
+    ``period`` bars
+
+    Formula:
+      - top = RollingLinReg(high, period).endpoint
+      - bot = RollingLinReg(low, period).endpoint
+      - topslope, botslope: the slopes of both regression lines
+    '''
+    lines = ('top', 'bot', 'topslope', 'botslope',)
+    params = (('period', 20),)
+
+    plotinfo = dict(subplot=False)
+    plotlines = dict(topslope=dict(_plotskip=True),
+                     botslope=dict(_plotskip=True))
+
+    def _plotlabel(self):
+        return [self.p.period]
+
+    def __init__(self):
+        high = RollingLinReg(self.data.high, period=self.p.period)
+        low = RollingLinReg(self.data.low, period=self.p.period)
+        self.l.top = high.endpoint
+        self.l.bot = low.endpoint
+        self.l.topslope = high.slope
+        self.l.botslope = low.slope
@@ -41,12 +41,28 @@ from .utils.py3 import range, with_metaclass, string_types
 
 from .lineroot import LineRoot, LineSingle, LineMultiple
 from . import metabase
-from .utils import num2date, time2num
+from .utils import num2date, num2dates, time2num
 
 
 NAN = float('NaN')
 
 
+def _darray(values):
+    '''Returns ``values`` as an ``array.array`` of doubles, copying the memory
+    directly if a contiguous buffer of doubles is exposed (numpy arrays)'''
+    try:
+        mview = memoryview(values)
+    except TypeError:
+        return array.array(str('d'), values)
+
+    if mview.format != 'd' or not mview.c_contiguous:
+        return array.array(str('d'), values)
+
+    darray = array.array(str('d'))
+    darray.frombytes(mview.cast('B'))
+    return darray
+
+
 class LineBuffer(LineSingle):
     '''
     LineBuffer defines an interface to an "array.array" (or list) in which
@@ -72,6 +88,16 @@ class LineBuffer(LineSingle):
 
     UnBounded, QBuffer = (0, 1)
 
+    _npbuffers = False
+    _dtcachesize = 256  # decoded datetimes kept by "datetime"
+
+    @classmethod
+    def usenumpy(cls, onoff):
+        '''Switches the storage of the buffers (created or reset from now on)
+        to ``numpy`` arrays. In that mode ``get``, ``getzero`` and
+        ``plotrange`` return read-only ``ndarray`` views and not copies'''
+        LineBuffer._npbuffers = onoff
+
     def __init__(self):
         self.lines = [self]
         self.mode = self.UnBounded
@@ -108,8 +134,18 @@ class LineBuffer(LineSingle):
             # bar The previous forward would have discarded the bar "period"
             # times ago and it will not come back. Having + 1 in the size
             # allows the forward without removing that bar
-            self.array = collections.deque(maxlen=self.maxlen + self.extrasize)
-            self.useislice = True
+            maxlen = self.maxlen + self.extrasize
+            if self._npbuffers:
+                from .utils.npbuffer import NumPyRingBuffer
+                self.array = NumPyRingBuffer(maxlen=maxlen)
+                self.useislice = False  # contiguous, it can be sliced
+            else:
+                self.array = collections.deque(maxlen=maxlen)
+                self.useislice = True
+        elif self._npbuffers:
+            from .utils.npbuffer import NumPyBuffer
+            self.array = NumPyBuffer()
+            self.useislice = False
         else:
             self.array = array.array(str('d'))
             self.useislice = False
@@ -117,6 +153,7 @@ class LineBuffer(LineSingle):
         self.lencount = 0
         self.idx = -1
         self.extension = 0
+        self._dtcache = dict()
 
     def qbuffer(self, savemem=0, extrasize=0):
         self.mode = self.QBuffer
@@ -174,7 +211,9 @@ class LineBuffer(LineSingle):
         versa if size is negative
 
         Returns:
-            A slice of the underlying buffer
+            A slice of the underlying buffer. With ``numpy`` buffers (see
+            ``usenumpy``) this is a read-only view which is only guaranteed to
+            hold the requested values during the current bar
         '''
         if self.useislice:
             start = self.idx + ago - size + 1
@@ -204,7 +243,8 @@ class LineBuffer(LineSingle):
             size(int): size of the slice to return
 
         Returns:
-            A slice of the underlying buffer
+            A slice of the underlying buffer (a read-only view with ``numpy``
+            buffers)
         '''
         if self.useislice:
             return list(islice(self.array, idx, idx + size))
@@ -257,6 +297,36 @@ class LineBuffer(LineSingle):
         for i in range(size):
             self.array.append(value)
 
+    def forwardvalues(self, values):
+        ''' Moves the logical index forward as many positions as values are
+        given, storing the values in them. Equivalent to calling ``forward``
+        and setting the value for each of them, but done in bulk
+
+        Bindings are not executed (meant for data feeds preloading)
+
+        Keyword Args:
+            values (iterable): values to put in the new positions. A
+            contiguous buffer of doubles (ex: a numpy float64 array) is copied
+            directly
+        '''
+        if self.mode == self.QBuffer:
+            for value in values:
+                self.forward()
+                self.array[self.idx] = value
+            return
+
+        if isinstance(self.array, array.array):
+            values = _darray(values)
+
+        # keep the "extend" (lookahead) positions at the end of the buffer
+        extvalues = [self.array.pop() for i in range(self.extension)]
+        self.array.extend(values)
+        self.array.extend(extvalues[::-1])
+
+        size = len(values)
+        self.idx += size
+        self.lencount += size
+
     def backwards(self, size=1, force=False):
         ''' Moves the logical index backwards and reduces the buffer as much as needed
 
@@ -274,6 +344,40 @@ class LineBuffer(LineSingle):
         self.idx -= size
         self.lencount -= size
 
+    def gettail(self, size):
+        ''' Returns the state needed to resume working with the buffer (see
+        ``settail``)
+
+        Keyword Args:
+            size (int): How many values (up to the current one) to keep
+
+        Returns:
+            A tuple with the length, the last ``size`` values (at most the
+            length) and the values of the lookahead positions
+        '''
+        size = min(size, len(self))
+        values = list(self.get(size=size)) if size else []
+        extvalues = []
+        if self.extension:
+            extvalues = list(self.get(ago=self.extension,
+                                      size=self.extension))
+
+        return len(self), values, extvalues
+
+    def settail(self, length, values, extvalues=()):
+        ''' Resets the buffer to the state returned by ``gettail``: the
+        buffer holds only the given values but its length is ``length``
+
+        Values older than those kept cannot be reached
+        '''
+        self.reset()
+        self.forwardvalues(values)
+        self.extend(size=len(extvalues))
+        for i, value in enumerate(extvalues, 1):
+            self.array[self.idx + i] = value
+
+        self.lencount = length
+
     def advance(self, size=1):
         ''' Advances the logical index without touching the underlying buffer
 
@@ -384,16 +488,43 @@ class LineBuffer(LineSingle):
         self._tz = tz
 
     def datetime(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive)
+        # The same bar is usually decoded several times (strategy, analyzers,
+        # observers, writer ...). datetime instances are immutable and can be
+        # memoized, keyed by the number and the decoding arguments
+        key = (self.array[self.idx + ago], tz or self._tz, naive)
+        try:
+            return self._dtcache[key]
+        except KeyError:
+            pass
+
+        if len(self._dtcache) >= self._dtcachesize:
+            self._dtcache.clear()
+
+        dt = self._dtcache[key] = num2date(key[0], tz=key[1], naive=naive)
+        return dt
 
     def date(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive).date()
+        return self.datetime(ago, tz=tz, naive=naive).date()
 
     def time(self, ago=0, tz=None, naive=True):
-        return num2date(self.array[self.idx + ago],
-                        tz=tz or self._tz, naive=naive).time()
+        return self.datetime(ago, tz=tz, naive=naive).time()
+
+    def datetimes(self, ago=0, size=None, tz=None, naive=True):
+        ''' Returns a list with the values decoded to datetime instances in a
+        single (vectorized) pass
+
+        Keyword Args:
+            ago (int): Point of data from which to start the retrieval
+            size (int): number of values to decode. ``None`` (default)
+            decodes all values from the start of the buffer up to ``ago``
+            tz: timezone for the conversion (default: that of the line)
+            naive (bool): remove the timezone from the datetime instances
+        '''
+        if size is None:
+            size = self.idx + ago + 1
+
+        return num2dates(self.get(ago=ago, size=size),
+                         tz=tz or self._tz, naive=naive)
 
     def dt(self, ago=0):
         '''
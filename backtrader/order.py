@@ -269,6 +269,9 @@ class OrderBase(with_metaclass(MetaParams, object)):
 
     def __getattr__(self, name):
         # Return attr from params if not found in order
+        if name == 'params':  # not yet set (ex: unpickling)
+            raise AttributeError(name)
+
         return getattr(self.params, name)
 
     def __setattribute__(self, name, value):
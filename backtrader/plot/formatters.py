@@ -24,7 +24,7 @@ from __future__ import (absolute_import, division, print_function,
 import matplotlib.dates as mdates
 import matplotlib.ticker as mplticker
 
-from ..utils import num2date
+from ..utils import num2date, num2dates
 
 
 class MyVolFormatter(mplticker.Formatter):
@@ -55,6 +55,7 @@ class MyDateFormatter(mplticker.Formatter):
         self.dates = dates
         self.lendates = len(dates)
         self.fmt = fmt
+        self._dts = None  # decoded in one go when the 1st label is needed
 
     def __call__(self, x, pos=0):
         '''Return the label for time x at position pos'''
@@ -65,7 +66,10 @@ class MyDateFormatter(mplticker.Formatter):
         if ind < 0:
             ind = 0
 
-        return num2date(self.dates[ind]).strftime(self.fmt)
+        if self._dts is None:
+            self._dts = num2dates(self.dates)
+
+        return self._dts[ind].strftime(self.fmt)
 
 
 def patch_locator(locator, xdates):
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: profiler
+
+Charges the wall time and the number of calls of the run loops of ``Cerebro``
+to the components (datas, indicators, strategies, broker, observers,
+analyzers, writers) which consume them. Activated with
+``cerebro.run(profile=True)`` and reported by the ``Profile`` analyzer
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import collections
+import itertools
+import time
+
+from .lineiterator import LineIterator
+
+
+__all__ = ['Profiler']
+
+
+class _Stat(object):
+    '''Counters of a component: calls, own time (without the time of the
+    profiled components it calls) and cumulative time'''
+    __slots__ = ('calls', 'tottime', 'cumtime', 'active')
+
+    def __init__(self):
+        self.calls = 0
+        self.tottime = self.cumtime = 0.0
+        self.active = False
+
+
+class Profiler(object):
+    '''
+    Replaces the hot methods of the components with timing wrappers (as
+    instance attributes, the classes are untouched) until ``unwrap`` is
+    called
+
+    The statistics are kept in ``stats`` under the key ``(owner, category,
+    name)``, where ``owner`` is the ``id`` of the strategy the component
+    belongs to (``None`` for datas, broker and writers)
+    '''
+    Categories = ('preload', 'datas', 'broker', 'strategy', 'notifications',
+                  'indicators', 'observers', 'analyzers', 'writers')
+
+    DataMethods = ('next', 'advance')
+    BrokerMethods = ('next',)
+    StrategyMethods = ('prenext', 'nextstart', 'next')
+    NotifyMethods = ('_notify',)
+    IndMethods = ('_next', '_once')
+    ObsMethods = ('_next', '_once', 'prenext', 'nextstart', 'next')
+    AnalyzerMethods = ('_prenext', '_nextstart', '_next', '_notify_order',
+                       '_notify_trade', '_notify_cashvalue', '_notify_fund')
+
+    timer = time.perf_counter
+
+    def __init__(self):
+        self.stats = collections.OrderedDict()
+        self.total = 0.0
+        self._wrapped = list()
+        self._childtime = [0.0]  # time of profiled callees, one per level
+
+    def _timed(self, func, stat):
+        timer = self.timer
+        childtime = self._childtime
+
+        def wrapper(*args, **kwargs):
+            if stat.active:  # reentered (ex: _next -> next) already counted
+                return func(*args, **kwargs)
+
+            stat.active = True
+            childtime.append(0.0)
+            t0 = timer()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = timer() - t0
+                stat.active = False
+                stat.calls += 1
+                stat.cumtime += elapsed
+                stat.tottime += elapsed - childtime.pop()
+                childtime[-1] += elapsed
+
+        return wrapper
+
+    def wrap(self, obj, methods, category, name, owner=None):
+        '''Charges the calls to ``methods`` of ``obj`` to the component
+        ``name`` of ``category``'''
+        key = (owner, category, name)
+        stat = self.stats.get(key)
+        if stat is None:
+            stat = self.stats[key] = _Stat()
+
+        for method in methods:
+            func = getattr(obj, method, None)
+            if func is None:
+                continue
+
+            # keep any instance level override to restore it later
+            self._wrapped.append((obj, method, vars(obj).get(method)))
+            setattr(obj, method, self._timed(func, stat))
+
+    def unwrap(self):
+        '''Restores the original methods of the profiled components'''
+        for obj, method, orig in reversed(self._wrapped):
+            if orig is None:
+                delattr(obj, method)
+            else:
+                setattr(obj, method, orig)
+
+        self._wrapped = list()
+
+    def wrapdatas(self, datas):
+        for i, data in enumerate(datas):
+            name = data._name or 'Data%d' % i
+            self.wrap(data, ('preload',), 'preload', name)
+            self.wrap(data, self.DataMethods, 'datas', name)
+
+    def wrapcerebro(self, cerebro):
+        # with accounts each strategy may have its own broker
+        for broker, name in self._names(cerebro._runbrokers):
+            self.wrap(broker, self.BrokerMethods, 'broker', name)
+        if cerebro.runwriters:
+            self.wrap(cerebro, ('_next_writers',), 'writers', 'writers')
+
+    def _names(self, objs, prefix=''):
+        # name by class, numbering repeated classes in the same level
+        counts = collections.Counter(x.__class__.__name__ for x in objs)
+        seen = collections.Counter()
+        for obj in objs:
+            name = obj.__class__.__name__
+            if counts[name] > 1:
+                seen[name] += 1
+                name = '%s#%d' % (name, seen[name])
+
+            yield obj, prefix + name
+
+    def _wrapinds(self, owner, obj, prefix=''):
+        lineiterators = getattr(obj, '_lineiterators', None)
+        if not lineiterators:  # LineActions own no indicators
+            return
+
+        inds = lineiterators[LineIterator.IndType]
+        for ind, name in self._names(inds, prefix):
+            self.wrap(ind, self.IndMethods, 'indicators', name, owner)
+            self._wrapinds(owner, ind, prefix=name + '.')
+
+    def _wrapanalyzers(self, owner, analyzers, prefix=''):
+        for analyzer, name in self._names(analyzers, prefix):
+            if getattr(analyzer, '_noprofile', False):
+                continue
+
+            self.wrap(analyzer, self.AnalyzerMethods, 'analyzers', name,
+                      owner)
+            self._wrapanalyzers(owner, analyzer._children, name + '.')
+
+    def wrapstrategy(self, strat):
+        owner = id(strat)
+        name = strat.__class__.__name__
+        self.wrap(strat, self.StrategyMethods, 'strategy', name, owner)
+        self.wrap(strat, self.NotifyMethods, 'notifications', name, owner)
+
+        self._wrapinds(owner, strat)
+
+        observers = strat._lineiterators[LineIterator.ObsType]
+        for obs, oname in self._names(observers):
+            self.wrap(obs, self.ObsMethods, 'observers', oname, owner)
+            self._wrapinds(owner, obs, prefix=oname + '.')
+            self._wrapanalyzers(owner, obs._analyzers, oname + '.')
+
+        self._wrapanalyzers(
+            owner, list(itertools.chain(strat.analyzers,
+                                        strat._slave_analyzers)))
+
+    def getstats(self, strat=None):
+        '''Returns ``(category, name, stat)`` for the components shared by
+        all strategies and those of ``strat``'''
+        owners = (None, id(strat))
+        return [(category, name, stat)
+                for (owner, category, name), stat in self.stats.items()
+                if owner in owners]
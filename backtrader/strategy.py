@@ -77,7 +77,7 @@ class MetaStrategy(StrategyBase.__class__):
     def dopreinit(cls, _obj, *args, **kwargs):
         _obj, args, kwargs = \
             super(MetaStrategy, cls).dopreinit(_obj, *args, **kwargs)
-        _obj.broker = _obj.env.broker
+        _obj.broker = _obj.env._getstratbroker(_obj._id)
         _obj._sizer = bt.sizers.FixedSize()
         _obj._orders = list()
         _obj._orderspending = list()
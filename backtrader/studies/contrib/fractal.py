@@ -53,7 +53,8 @@ class Fractal(bt.ind.PeriodN):
         # A bearish turning point occurs when there is a pattern with the
         # highest high in the middle and two lower highs on each side. [Ref 1]
 
-        last_five_highs = self.data.high.get(size=self.p.period)
+        # list: the buffer slice may not support "index" (numpy buffers)
+        last_five_highs = list(self.data.high.get(size=self.p.period))
         max_val = max(last_five_highs)
         max_idx = last_five_highs.index(max_val)
 
@@ -62,7 +63,7 @@ class Fractal(bt.ind.PeriodN):
 
         # A bullish turning point occurs when there is a pattern with the
         # lowest low in the middle and two higher lowers on each side. [Ref 1]
-        last_five_lows = self.data.low.get(size=self.p.period)
+        last_five_lows = list(self.data.low.get(size=self.p.period))
         min_val = min(last_five_lows)
         min_idx = last_five_lows.index(min_val)
 
@@ -227,6 +227,73 @@ def date2num(dt, tz=None):
     return base
 
 
+def dtarray2num(dtarray):
+    """
+    Vectorized ``date2num`` for a ``numpy.datetime64`` array (naive values
+    are taken as UTC, like numpy does). Return value is a ``float64`` array
+
+    The day fractions are added in the same order, which delivers exactly the
+    same floats as the ``math.fsum`` based ``date2num``
+    """
+    import numpy as np  # keep the import very local
+
+    musecs = np.asarray(dtarray).astype('datetime64[us]').astype(np.int64)
+    days, musecs = np.divmod(musecs, 86400000000)
+    secs, musecs = np.divmod(musecs, 1000000)
+    hours, secs = np.divmod(secs, 3600)
+    mins, secs = np.divmod(secs, 60)
+
+    # 719163 is the ordinal of 1970-01-01 (the epoch of datetime64)
+    return (days + 719163.0) + (((hours / HOURS_PER_DAY +
+                                  mins / MINUTES_PER_DAY) +
+                                 secs / SECONDS_PER_DAY) +
+                                musecs / MUSECONDS_PER_DAY)
+
+
+def num2dtarray(nums):
+    """
+    Vectorized ``num2date`` delivering a ``numpy.datetime64[us]`` array of
+    naive UTC values, with the same rounding compensations as ``num2date``
+    """
+    import numpy as np  # keep the import very local
+
+    nums = np.asarray(nums, dtype=np.float64)
+    days = np.floor(nums)
+    hours, remainder = np.divmod(HOURS_PER_DAY * (nums - days), 1)
+    mins, remainder = np.divmod(MINUTES_PER_HOUR * remainder, 1)
+    secs, remainder = np.divmod(SECONDS_PER_MINUTE * remainder, 1)
+    musecs = np.trunc(MUSECONDS_PER_SECOND * remainder)
+    musecs[musecs < 10] = 0  # compensate for rounding errors
+    up = musecs > 999990  # compensate for rounding errors
+    musecs[up] = MUSECONDS_PER_SECOND
+
+    secs = ((days - 719163) * 24 + hours) * 3600 + mins * 60 + secs
+    musecs = secs.astype(np.int64) * 1000000 + musecs.astype(np.int64)
+    return musecs.astype('datetime64[us]')
+
+
+def num2dates(nums, tz=None, naive=True):
+    """
+    Converts a sequence of float numbers to a list of :mod:`datetime`
+    instances like ``num2date`` does for each of them, vectorizing the
+    conversion if ``numpy`` is available
+    """
+    try:
+        import numpy  # keep the import very local
+    except ImportError:
+        return [num2date(x, tz=tz, naive=naive) for x in nums]
+
+    dts = num2dtarray(nums).astype(object).tolist()
+    if tz is None:
+        return dts
+
+    dts = [dt.replace(tzinfo=UTC).astimezone(tz) for dt in dts]
+    if naive:
+        dts = [dt.replace(tzinfo=None) for dt in dts]
+
+    return dts
+
+
 def time2num(tm):
     """
     Converts the hour/minute/second/microsecond part of tm (datetime.datetime
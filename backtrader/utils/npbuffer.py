@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: npbuffer
+
+NumPy backed storage for ``LineBuffer``. The classes mimic the subset of the
+``array.array`` / ``collections.deque`` interface used by ``LineBuffer`` but
+return read-only ``ndarray`` views (and not copies) when sliced
+
+Not imported by default, because ``numpy`` is not a hard dependency
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import numpy as np
+
+
+__all__ = ['NumPyBuffer', 'NumPyRingBuffer']
+
+
+class NumPyBuffer(object):
+    '''
+    Unbounded storage holding the values in a preallocated ``float64`` array
+    whose capacity is doubled each time it is exhausted
+
+    Slicing returns a read-only view on the underlying array. Growing the
+    array allocates a new one, so views handed out earlier keep on pointing to
+    the values they were created for
+    '''
+    maxlen = None
+    capacity = 1024
+
+    def __init__(self, capacity=None):
+        self._start = self._end = 0
+        self._setbuf(np.empty(max(1, capacity or self.capacity)))
+
+    def _setbuf(self, buf):
+        self._buf = buf
+        self._ro = buf.view()  # slices of it are read-only views
+        self._ro.flags.writeable = False
+
+    def _grow(self):
+        buf = np.empty(2 * len(self._buf))
+        buf[:self._end] = self._buf[:self._end]
+        self._setbuf(buf)
+
+    def _index(self, idx):
+        blen = self._end - self._start
+        if idx < 0:
+            idx += blen
+
+        if not 0 <= idx < blen:
+            raise IndexError('buffer index out of range')
+
+        return self._start + idx
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._ro[self._start:self._end][key]
+
+        return self._buf.item(self._index(key))
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            self._buf[self._start:self._end][key] = value
+        else:
+            self._buf[self._index(key)] = value
+
+    def __iter__(self):
+        return iter(self._buf[self._start:self._end].tolist())
+
+    def __array__(self, dtype=None, copy=None):
+        arr = self._ro[self._start:self._end]
+        if dtype is not None:
+            arr = arr.astype(dtype)
+
+        return arr
+
+    def __repr__(self):
+        return '%s(%r)' % (self.__class__.__name__, self.tolist())
+
+    def __getstate__(self):
+        # only the real values are pickled and not the spare capacity
+        return dict(maxlen=self.maxlen, values=self.view().copy())
+
+    def __setstate__(self, state):
+        self.maxlen = state['maxlen']
+        values = state['values']
+        self._start, self._end = 0, len(values)
+        self._setbuf(np.empty(max(1, 2 * len(values))))
+        self._buf[:self._end] = values
+
+    def view(self):
+        '''Returns a read-only view of all values held in the buffer'''
+        return self._ro[self._start:self._end]
+
+    def tolist(self):
+        return self._buf[self._start:self._end].tolist()
+
+    def append(self, value):
+        if self._end == len(self._buf):
+            self._grow()
+
+        self._buf[self._end] = value
+        self._end += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if self.maxlen is not None and len(values) > self.maxlen:
+            values = values[-self.maxlen:]  # older ones would be discarded
+
+        size = len(values)
+        while self._end + size > len(self._buf):
+            self._grow()
+
+        self._buf[self._end:self._end + size] = values
+        self._end += size
+        if self.maxlen is not None:
+            self._start = max(self._start, self._end - self.maxlen)
+
+    def pop(self):
+        if self._end == self._start:
+            raise IndexError('pop from empty buffer')
+
+        self._end -= 1
+        return self._buf.item(self._end)
+
+
+class NumPyRingBuffer(NumPyBuffer):
+    '''
+    Bounded storage which keeps at most ``maxlen`` values, discarding the
+    oldest ones like a ``collections.deque`` with ``maxlen`` would do
+
+    The values are always kept contiguous in the underlying array, to be able
+    to return windows as views. When the end of the array is reached, the last
+    ``maxlen`` values are moved to the beginning of a new array, which keeps
+    the cost amortized and leaves the previously returned views untouched
+    '''
+    def __init__(self, maxlen, capacity=None):
+        self.maxlen = maxlen
+        capacity = capacity or max(64, 4 * maxlen)
+        super(NumPyRingBuffer, self).__init__(capacity=capacity)
+
+    def _grow(self):
+        blen = self._end - self._start
+        buf = np.empty(len(self._buf))
+        buf[:blen] = self._buf[self._start:self._end]
+        self._setbuf(buf)
+        self._start, self._end = 0, blen
+
+    def __setstate__(self, state):
+        super(NumPyRingBuffer, self).__setstate__(state)
+        buf = np.empty(max(64, 4 * self.maxlen, self._end))
+        buf[:self._end] = self._buf[:self._end]
+        self._setbuf(buf)
+
+    def append(self, value):
+        if self._end == len(self._buf):
+            self._grow()
+
+        self._buf[self._end] = value
+        self._end += 1
+        if self._end - self._start > self.maxlen:
+            self._start += 1  # discard the oldest value
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+'''
+
+.. module:: sharedlines
+
+Places the values of preloaded lines in a single shared memory block, to let
+optimization worker processes use them without copying. Pickling a line whose
+storage has been shared transports only the name of the block and the
+location of the values, and unpickling it delivers a read-only ``memoryview``
+of doubles on the block
+
+Requires ``multiprocessing.shared_memory`` (Python >= 3.8)
+
+'''
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+from multiprocessing import shared_memory
+
+
+__all__ = ['SharedLines', 'SharedArray', 'attach', 'detach']
+
+# blocks attached by this process (key: name of the block)
+_attached = dict()
+
+
+def attach(name, offset, size):
+    '''Returns a read-only ``memoryview`` of ``size`` doubles starting at
+    ``offset`` in the shared memory block ``name``. The block is attached
+    only once per process'''
+    shm = _attached.get(name)
+    if shm is None:
+        # Blocks of previous runs are released if no view is held on them
+        for oname, oshm in list(_attached.items()):
+            try:
+                oshm.close()
+            except BufferError:
+                continue  # still in use
+
+            del _attached[oname]
+
+        # the processes of the pool share the resource tracker of the owner,
+        # which unlinks the block at the end. Registering it again is harmless
+        shm = _attached[name] = shared_memory.SharedMemory(name=name)
+
+    return shm.buf.cast('d')[offset:offset + size].toreadonly()
+
+
+def detach(lines):
+    '''Gives the lines which use an attached (shared) storage a local copy of
+    the values, to be able to pickle them (for example to return them as
+    results of an optimization)'''
+    for line in lines:
+        if isinstance(line.array, memoryview):
+            line.array = array.array(str('d'), line.array)
+
+
+class SharedArray(object):
+    '''
+    Placeholder of the storage of a line in the process owning the shared
+    memory block. It can be read like the original storage and is pickled as
+    the location of the values in the block
+    '''
+    def __init__(self, shm, offset, size):
+        self.shm = shm
+        self.offset = offset
+        self.size = size
+        self._mview = shm.buf.cast('d')[offset:offset + size].toreadonly()
+
+    def __reduce__(self):
+        return (attach, (self.shm.name, self.offset, self.size))
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        return self._mview[key]
+
+    def __iter__(self):
+        return iter(self._mview)
+
+    def release(self):
+        self._mview.release()
+
+
+class SharedLines(object):
+    '''
+    Copies the values of the given lines (``LineBuffer`` instances in
+    unbounded mode) to a single shared memory block and replaces their
+    storage with ``SharedArray`` placeholders, until ``close`` is called,
+    which restores the original storage and releases the block
+
+    Lines in bounded mode (``QBuffer``) and lines already backed by a view
+    (ex: of a memory mapped file, see ``MemMapData``) are left untouched
+    '''
+    def __init__(self, lines):
+        self.lines = [x for x in lines if x.mode == x.UnBounded and
+                      not isinstance(x.array, memoryview) and
+                      not hasattr(x.array, '_mview')]
+        self.arrays = [x.array for x in self.lines]
+
+        sizes = [len(x) for x in self.arrays]
+        self.shm = shared_memory.SharedMemory(create=True,
+                                              size=max(1, sum(sizes)) * 8)
+
+        dbuf = self.shm.buf.cast('d')
+        offset = 0
+        for line, values, size in zip(self.lines, self.arrays, sizes):
+            if hasattr(values, 'view'):  # numpy based storage
+                values = values.view()
+
+            dbuf[offset:offset + size] = memoryview(values)
+
+            line.array = SharedArray(self.shm, offset, size)
+            offset += size
+
+        dbuf.release()
+
+    def close(self):
+        for line, values in zip(self.lines, self.arrays):
+            line.array.release()
+            line.array = values
+
+        self.lines, self.arrays = [], []
+        self.shm.close()
+        self.shm.unlink()
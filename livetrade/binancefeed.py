@@ -0,0 +1,175 @@
+import asyncio
+import datetime
+import json
+import threading
+import sys
+sys.path.append("..")
+
+import websockets
+
+import backtrader as bt
+
+# Binance 現貨 WebSocket：combined stream，一條連線訂閱多個 <symbol>@kline_<interval>
+STREAM_BASE_URL = "wss://stream.binance.com:9443"
+MAX_STREAMS = 1024  # 每條連線最多的 stream 數
+
+# K 線週期 -> backtrader 的 (timeframe, compression)
+INTERVALS = {
+    '1m': (bt.TimeFrame.Minutes, 1), '3m': (bt.TimeFrame.Minutes, 3), '5m': (bt.TimeFrame.Minutes, 5),
+    '15m': (bt.TimeFrame.Minutes, 15), '30m': (bt.TimeFrame.Minutes, 30), '1h': (bt.TimeFrame.Minutes, 60),
+    '2h': (bt.TimeFrame.Minutes, 120), '4h': (bt.TimeFrame.Minutes, 240), '6h': (bt.TimeFrame.Minutes, 360),
+    '8h': (bt.TimeFrame.Minutes, 480), '12h': (bt.TimeFrame.Minutes, 720), '1d': (bt.TimeFrame.Days, 1),
+    '3d': (bt.TimeFrame.Days, 3), '1w': (bt.TimeFrame.Weeks, 1), '1M': (bt.TimeFrame.Months, 1),
+}
+
+
+# 毫秒 timestamp -> backtrader 內部用的不帶時區 UTC datetime
+def kline_time(ms):
+    return datetime.datetime.fromtimestamp(ms / 1000, datetime.timezone.utc).replace(tzinfo=None)
+
+
+# 收盤的 K 線轉成 bar，未收盤的回傳 None
+def parse_kline(message):
+    k = message['k']
+    if not k['x']:
+        return None
+
+    return {
+        'datetime': kline_time(k['t']),
+        'open': float(k['o']),
+        'high': float(k['h']),
+        'low': float(k['l']),
+        'close': float(k['c']),
+        'volume': float(k['v']),
+    }
+
+
+def stream_name(symbol, interval):
+    return f"{symbol.lower()}@kline_{interval}"
+
+
+# === 共用的接收服務：一個 asyncio thread，每 MAX_STREAMS 個 stream 一條連線 ===
+# 每則訊息只 json.loads 一次，再依 stream 名稱放進各 data 的 ring buffer
+# aggregate() 的 LiveAggregator 則收到每一筆（含未收盤的）K 線更新，一次建出多個週期
+class BinanceKlineStream:
+    def __init__(self, base_url=STREAM_BASE_URL, ringsize=1024, reconnections=-1, reconntimeout=5.0):
+        self.base_url = base_url
+        self.ringsize = ringsize
+        self.reconnections = reconnections  # 斷線重連次數，-1 = 無限
+        self.reconntimeout = reconntimeout  # 重連前等待秒數
+        self.group = bt.feeds.RingGroup()  # 任一 symbol 有新 bar 就喚醒 Cerebro
+        self.subscribers = {}  # stream 名稱 -> [RingQueue]
+        self.aggregators = {}  # stream 名稱 -> [LiveAggregator]
+        self._users = 0
+        self._thread = None
+
+    def subscribe(self, symbol, interval):
+        q = bt.feeds.RingQueue(maxlen=self.ringsize, group=self.group)
+        self.subscribers.setdefault(stream_name(symbol, interval), []).append(q)
+        return q
+
+    def getdata(self, symbol, interval='1m', **kwargs):
+        return BinanceLiveKlineFeed(stream=self, symbol=symbol, interval=interval, **kwargs)
+
+    # 用 symbol 的 interval K 線（含未收盤的更新）建出較長的週期：
+    #   agg = stream.aggregate('btcusdt', '1m')
+    #   cerebro.adddata(agg.getdata(*INTERVALS['5m'], partial=True))  # partial：收到形成中的 bar
+    def aggregate(self, symbol, interval='1m'):
+        agg = bt.feeds.LiveAggregator(ringsize=self.ringsize, group=self.group, source=self)
+        self.aggregators.setdefault(stream_name(symbol, interval), []).append(agg)
+        return agg
+
+    # 第一個 data 開始時啟動、最後一個結束時停止
+    def start(self):
+        self._users += 1
+        if self._thread is None:
+            self._stopevent = threading.Event()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._users -= 1
+        if self._users <= 0 and self._thread is not None:
+            self._stopevent.set()
+            self._thread = None
+
+    def _broadcast(self, names, item):
+        for name in names:
+            for q in self.subscribers.get(name, ()):
+                q.put(item)
+            for agg in self.aggregators.get(name, ()):
+                agg.put(item)
+
+    def _run(self):
+        asyncio.run(self._listen_all())
+
+    async def _listen_all(self):
+        names = sorted(set(self.subscribers) | set(self.aggregators))
+        chunks = [names[i:i + MAX_STREAMS] for i in range(0, len(names), MAX_STREAMS)]
+        await asyncio.gather(*[self._listen(chunk) for chunk in chunks])
+
+    async def _listen(self, names):
+        url = f"{self.base_url}/stream?streams={'/'.join(names)}"
+        reconns = self.reconnections
+        while not self._stopevent.is_set():
+            try:
+                async with websockets.connect(url, max_queue=None) as websocket:
+                    self._broadcast(names, bt.feeds.DataBase.CONNECTED)
+                    reconns = self.reconnections
+                    while not self._stopevent.is_set():
+                        try:
+                            message = await asyncio.wait_for(websocket.recv(), timeout=1.0)
+                        except asyncio.TimeoutError:
+                            continue  # 定期檢查是否要停止
+
+                        message = json.loads(message)
+                        aggs = self.aggregators.get(message['stream'])
+                        if aggs:  # 每筆更新都送進 aggregator
+                            k = message['data']['k']
+                            start, end = kline_time(k['t']), kline_time(k['T'] + 1)
+                            values = [float(k[x]) for x in 'ohlcv']
+                            for agg in aggs:
+                                agg.update(start, end, *values, closed=k['x'])
+
+                        bar = parse_kline(message['data'])
+                        if bar is not None:  # 收盤時才推入
+                            for q in self.subscribers.get(message['stream'], ()):
+                                q.put(bar)
+
+            except (OSError, websockets.WebSocketException) as e:
+                if self._stopevent.is_set():
+                    break
+
+                print(f"Error: {e}")
+                self._broadcast(names, bt.feeds.DataBase.CONNBROKEN)
+                if reconns == 0:
+                    break
+
+                reconns -= 1
+                await asyncio.sleep(self.reconntimeout)
+
+        self._broadcast(names, None)  # 結束：通知 DISCONNECTED
+
+
+# 自定資料來源：從 stream 的 ring buffer 讀取收盤的 K 線
+# LiveQueueData 在 buffer 上等待（最多 qcheck 秒），不會空轉
+class BinanceLiveKlineFeed(bt.feeds.LiveQueueData):
+    params = (
+        ('stream', None),  # BinanceKlineStream；None 時自己建立一個（單一 symbol）
+        ('symbol', 'btcusdt'),
+        ('interval', '1m'),
+    )
+
+    def __init__(self):
+        self.p.timeframe, self.p.compression = INTERVALS[self.p.interval]
+        if not self.p.name:
+            self._name = f"{self.p.symbol.upper()} {self.p.interval}"
+        if self.p.stream is None:
+            self.p.stream = BinanceKlineStream()
+        self.qlive = self.p.stream.subscribe(self.p.symbol, self.p.interval)
+
+    def _startlive(self):
+        self.p.stream.start()
+
+    def _stoplive(self):
+        self.p.stream.stop()
@@ -1,56 +1,31 @@
-import asyncio
-import websockets
-import json
-import datetime
-import threading
-import nest_asyncio
-import time
+import argparse
 import queue
 import sys
 sys.path.append("..")
 
-nest_asyncio.apply()
+from binancefeed import STREAM_BASE_URL, BinanceKlineStream
 
-kline_queue = queue.Queue()
-
-KLINE_STREAM_URL = "wss://stream.binance.com:9443/ws/btcusdt@kline_1m"
+# 不經過 backtrader，直接印出各 symbol 收盤的 K 線
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base-url', default=STREAM_BASE_URL)
+    parser.add_argument('--symbols', nargs='+', default=['btcusdt'])
+    parser.add_argument('--interval', default='1m')
+    args = parser.parse_args()
 
-async def listen_kline():
-    async with websockets.connect(KLINE_STREAM_URL) as websocket:
-        print("Connected to Binance SPOT 1m Kline stream...")
+    stream = BinanceKlineStream(base_url=args.base_url)
+    queues = {symbol: stream.subscribe(symbol, args.interval) for symbol in args.symbols}
+    stream.start()
+    print(f"Connected to Binance SPOT {args.interval} Kline streams: {', '.join(args.symbols)}")
+    try:
         while True:
-            try:
-                message = await websocket.recv()
-                data = json.loads(message)
-                k = data['k']
-                is_closed = k['x']
-                kline_data = {
-                        'datetime': datetime.datetime.fromtimestamp(k['t'] / 1000),
-                        'open': float(k['o']),
-                        'high': float(k['h']),
-                        'low': float(k['l']),
-                        'close': float(k['c']),
-                        'volume': float(k['v']),
-                    }
-                if is_closed:
-                    kline_queue.put(kline_data)
-
-            except Exception as e:
-                print(f"Error: {e}")
-                await asyncio.sleep(5)
-
-def start_ws_thread():
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(listen_kline())
-
-if __name__ == '__main__':
-    threading.Thread(target=start_ws_thread, daemon=True).start()
-    while True:
-        try:
-            kline_data = kline_queue.get(timeout=1)
-            print(f"Received Kline data: {kline_data}")
-        except queue.Empty:
-            continue
-        except KeyboardInterrupt:
-            break
\ No newline at end of file
+            stream.group.wait(timeout=1)  # 任一 symbol 有資料就醒來
+            for symbol, q in queues.items():
+                try:
+                    while True:
+                        kline_data = q.get(block=False)
+                        print(f"{symbol} Received Kline data: {kline_data}")
+                except queue.Empty:
+                    continue
+    except KeyboardInterrupt:
+        stream.stop()
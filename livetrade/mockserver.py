@@ -0,0 +1,82 @@
+'''
+本機的 Binance K 線 WebSocket 替身：把 CSV 的 K 線依序以 Binance combined
+stream 的 kline 訊息格式送出，用來測試 BinanceKlineStream/BinanceLiveKlineFeed，
+不需要連到交易所
+
+  python mockserver.py --data ../datas/BTCUSDT_futures_4h_from_20210101.csv --lapse 0.5
+  python test.py --base-url ws://localhost:8765 --symbols btcusdt ethusdt
+  python test.py --base-url ws://localhost:8765 --interval 4h --aggregate 4h 8h 1d --partial
+
+連線網址中訂閱的每個 stream（/stream?streams=btcusdt@kline_1m/...）都送同一份
+CSV 的 K 線。每根 K 線先送一筆未收盤 (x = false) 的更新，再送收盤的那筆。``--drop-after N``
+在每送出 N 根後斷線，重連時先重送上一根（測試重連與重複 bar 的處理）
+'''
+
+import argparse
+import asyncio
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import websockets
+
+
+def kline_message(stream, dt, row, closed, span):
+    symbol, interval = stream.split('@kline_')
+    t = int(dt.timestamp() * 1000)
+    return json.dumps({'stream': stream, 'data': {
+        'e': 'kline', 'E': t, 's': symbol.upper(),
+        'k': {
+            't': t, 'T': t + span - 1, 's': symbol.upper(), 'i': interval,
+            'o': str(row['open']), 'h': str(row['high']), 'l': str(row['low']),
+            'c': str(row['close']), 'v': str(row['volume']),
+            'x': closed,
+        },
+    }})
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', required=True, help='K 線資料 CSV')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--lapse', type=float, default=1.0, help='每根 K 線間隔秒數')
+    parser.add_argument('--limit', type=int, default=None, help='最多送出幾根')
+    parser.add_argument('--drop-after', type=int, default=None, help='每送出幾根就斷線一次')
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    if args.limit:
+        df = df.iloc[:args.limit]
+    rows = list(df.iterrows())
+    span = int((df.index[1] - df.index[0]).total_seconds() * 1000)  # K 線長度（毫秒）
+    state = {'pos': 0}  # 下一根要送的 K 線（跨連線保留）
+
+    async def handler(websocket, *path):
+        path = path[0] if path else websocket.request.path
+        streams = parse_qs(urlparse(path).query).get('streams', [''])[0].split('/')
+        print(f'Connection with {len(streams)} streams')
+
+        start = max(state['pos'] - 1, 0)  # 重連時重送上一根
+        sent = 0
+        for i in range(start, len(rows)):
+            dt, row = rows[i]
+            for closed in (False, True):
+                for stream in streams:
+                    await websocket.send(kline_message(stream, dt, row, closed, span))
+                await asyncio.sleep(args.lapse / 2)
+            state['pos'] = max(state['pos'], i + 1)
+            sent += 1
+            if args.drop_after and sent >= args.drop_after and i + 1 < len(rows):
+                print(f'Dropping connection after {dt}')
+                return  # 關閉連線
+
+        print('All klines sent')
+        await websocket.wait_closed()
+
+    async with websockets.serve(handler, 'localhost', args.port):
+        print(f'Serving {len(rows)} klines on ws://localhost:{args.port}')
+        await asyncio.Future()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,26 @@
+'''
+以回測速度重播 test.py --journal 記錄的 bar：順序與即時收到（策略看到）的相同
+
+  python replay.py --journal journal --names BTCUSDT_1m ETHUSDT_1m
+'''
+
+import argparse
+import os
+import sys
+sys.path.append("..")
+import backtrader as bt
+
+from test import PrintStrategy
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--journal', required=True, help='test.py --journal 的目錄')
+    parser.add_argument('--names', nargs='+', required=True, help='記錄的名稱，例：BTCUSDT_1m')
+    args = parser.parse_args()
+
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(PrintStrategy)
+    for name in args.names:
+        cerebro.adddata(bt.feeds.JournalData(dataname=os.path.join(args.journal, name), name=name))
+    cerebro.run()
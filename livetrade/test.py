@@ -1,84 +1,55 @@
-import asyncio
-import websockets
-import json
-import datetime
-import queue
-import threading
-import nest_asyncio
-import time
+import argparse
+import os
 import sys
 sys.path.append("..")
 import backtrader as bt
 
-nest_asyncio.apply()
+from binancefeed import INTERVALS, STREAM_BASE_URL, BinanceKlineStream
 
-# 全域 Queue 給 backtrader 使用
-kline_queue = queue.Queue()
-
-# Binance 現貨 WebSocket (1 分鐘 K 線)
-KLINE_STREAM_URL = "wss://stream.binance.com:9443/ws/btcusdt@kline_1m"
-
-# WebSocket 接收函數
-async def listen_kline():
-    async with websockets.connect(KLINE_STREAM_URL) as websocket:
-        print("Connected to Binance 1m Kline stream...")
-        while True:
-            try:
-                message = await websocket.recv()
-                data = json.loads(message)
-                print(f"Received message: {message}")
-                k = data['k']
-                if k['x']:  # 收盤時才推入
-                    kline_data = {
-                        'datetime': datetime.datetime.fromtimestamp(k['t'] / 1000),
-                        'open': float(k['o']),
-                        'high': float(k['h']),
-                        'low': float(k['l']),
-                        'close': float(k['c']),
-                        'volume': float(k['v']),
-                    }
-                    kline_queue.put(kline_data)
-            except Exception as e:
-                print(f"Error: {e}")
-                await asyncio.sleep(5)
-
-# 開一個 thread 給 WebSocket
-def start_ws_thread():
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(listen_kline())
-
-# 自定資料來源：從 queue 餵給 backtrader
-class BinanceLiveKlineFeed(bt.feeds.DataBase):
-    lines = ('open', 'high', 'low', 'close', 'volume')
-
-    def _load(self):
-        try:
-            data = kline_queue.get_nowait()
-            self.lines.datetime[0] = bt.date2num(data['datetime'])
-            self.lines.open[0] = data['open']
-            self.lines.high[0] = data['high']
-            self.lines.low[0] = data['low']
-            self.lines.close[0] = data['close']
-            self.lines.volume[0] = data['volume']
-            return True
-        except queue.Empty:
-            return None  # 馬上交還控制權給 Backtrader
 
 # 簡單策略：每根收盤輸出一次價格
 class PrintStrategy(bt.Strategy):
+    def notify_data(self, data, status, *args, **kwargs):
+        print(f"{data._name} status: {data._getstatusname(status)}")
+
     def next(self):
-        dt = self.data.datetime.datetime(0)
-        close = self.data.close[0]
-        print(f"[{dt}] 🔔 Close: {close}")
+        for data in self.datas:
+            if len(data) and data.datetime[0] == self.datetime[0]:  # 這根有更新的 symbol
+                dt = data.datetime.datetime(0)
+                print(f"[{dt}] 🔔 {data._name} Close: {data.close[0]}")
+
 
 # 主程式
 if __name__ == '__main__':
-    threading.Thread(target=start_ws_thread, daemon=True).start()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base-url', default=STREAM_BASE_URL, help='Binance WebSocket（本機測試：ws://localhost:8765，見 mockserver.py）')
+    parser.add_argument('--symbols', nargs='+', default=['btcusdt'], help='訂閱的 symbol，全部共用一條連線')
+    parser.add_argument('--interval', default='1m', help='K 線週期')
+    parser.add_argument('--aggregate', nargs='+', default=None,
+                        help='用 --interval 的 K 線一次建出這些週期（例：5m 15m 1h 4h）')
+    parser.add_argument('--partial', action='store_true', help='--aggregate 的週期也收到形成中的 bar')
+    parser.add_argument('--journal', default=None, help='收到的 bar 記錄到這個目錄（每天一個檔，可用 replay.py 重播）')
+    parser.add_argument('--checkpoint', default=None, help='每根 bar 後把策略狀態寫到這個檔，重啟時從這裡接續')
+    parser.add_argument('--reconnections', type=int, default=-1, help='斷線重連次數，-1 = 無限')
+    args = parser.parse_args()
+
+    stream = BinanceKlineStream(base_url=args.base_url, reconnections=args.reconnections)
 
     cerebro = bt.Cerebro()
     cerebro.addstrategy(PrintStrategy)
-    cerebro.adddata(BinanceLiveKlineFeed())
+    # 記錄檔名稱：<目錄>/<SYMBOL>_<週期>-YYYYMMDD.btj
+    def journal(symbol, interval):
+        return os.path.join(args.journal, f"{symbol.upper()}_{interval}") if args.journal else None
+
+    for symbol in args.symbols:
+        if args.aggregate:
+            agg = stream.aggregate(symbol, args.interval)
+            for interval in args.aggregate:
+                cerebro.adddata(agg.getdata(*INTERVALS[interval], partial=args.partial,
+                                            name=f"{symbol.upper()} {interval}",
+                                            journal=journal(symbol, interval)))
+        else:
+            cerebro.adddata(stream.getdata(symbol, args.interval, journal=journal(symbol, args.interval)))
     print("Starting Backtrader...")
-    cerebro.run()
-
+    # 同一個檔：啟動時接續（檔案不存在就從頭開始），之後每根 bar 更新
+    cerebro.run(checkpoint=args.checkpoint, resume=args.checkpoint)
@@ -81,16 +81,14 @@ strategy_params = [
     dict(limbars=25, limbars2=25, spread=0.0025, name='S5'),
 ]
 
-# === 回測所有策略，使用獨立 Cerebro（獨立資金池） ===
-results = []
-for i, params in enumerate(strategy_params):
-    cerebro = bt.Cerebro(stdstats=False)
-    data = bt.feeds.PandasData(dataname=dataframe.copy(), timeframe=bt.TimeFrame.Minutes, compression=5)
-    cerebro.adddata(data)
+# === 回測所有策略：同一個 Cerebro 只走一次資料，每個策略有自己的 broker（獨立資金池） ===
+cerebro = bt.Cerebro(stdstats=False, accounts=True, indcache=True)  # 相同的指標只算一次
+data = bt.feeds.PandasData(dataname=dataframe, timeframe=bt.TimeFrame.Minutes, compression=5)
+cerebro.adddata(data)
+for params in strategy_params:
     cerebro.addstrategy(MA60Strategy, **params)
-    cerebro.broker.setcash(1000000)
-    result = cerebro.run()
-    results.append(result[0])
+cerebro.broker.setcash(1000000)  # 每個帳戶的起始資金
+results = cerebro.run()
 
 # === 收集所有交易紀錄 ===
 all_trades = pd.concat([
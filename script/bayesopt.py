@@ -0,0 +1,130 @@
+import multiprocessing
+
+import numpy as np
+from skopt import Optimizer
+
+BATCHINGS = ['cl_min', 'cl_mean', 'cl_max', 'qei']
+
+
+# === GP 後驗的聯合抽樣（加上 jitter 讓 cholesky 穩定） ===
+def sample_posterior(model, Xt, n_samples, rng):
+    mean, cov = model.predict(Xt, return_cov=True)
+    scale = max(float(np.max(np.diag(cov))), 1e-12)
+    for jitter in (1e-10, 1e-8, 1e-6, 1e-4):
+        try:
+            chol = np.linalg.cholesky(cov + np.eye(len(cov)) * jitter * scale)
+            break
+        except np.linalg.LinAlgError:
+            continue
+    else:
+        # 退回只用各點的邊際分佈
+        chol = np.diag(np.sqrt(np.clip(np.diag(cov), 0, None)))
+
+    return mean[:, None] + chol @ rng.standard_normal((len(mean), n_samples))
+
+
+# === q-EI: 以 GP 後驗的聯合抽樣（Monte Carlo）貪婪挑選一批點 ===
+def ask_qei(opt, n_points, n_candidates=500, n_samples=256):
+    if not opt.models:
+        # 還在初始隨機取樣階段，沒有模型可用
+        return opt.ask(n_points=n_points)
+
+    evaluated = set(tuple(x) for x in opt.Xi)
+    candidates = []
+    for x in opt.space.rvs(n_samples=n_candidates, random_state=opt.rng):
+        if tuple(x) not in evaluated:
+            evaluated.add(tuple(x))  # 也去掉重複的候選點
+            candidates.append(x)
+
+    if not candidates:
+        return []
+
+    samples = sample_posterior(opt.models[-1], opt.space.transform(candidates),
+                               n_samples, opt.rng)  # (候選點, 抽樣)
+
+    best = np.min(opt.yi)
+    current = np.full(n_samples, best)  # 每次抽樣下已選點的最小值
+    gains = np.empty(len(candidates))
+    chosen = []
+    for _ in range(min(n_points, len(candidates))):
+        # q-EI(已選 + 候選) = E[max(0, best - min(已選, 候選))]
+        gains[:] = (best - np.minimum(current, samples)).mean(axis=1)
+        gains[chosen] = -np.inf
+        idx = int(np.argmax(gains))
+        chosen.append(idx)
+        current = np.minimum(current, samples[idx])
+
+    return [candidates[i] for i in chosen]
+
+
+def ask_batch(opt, n_points, batching='cl_min'):
+    if batching == 'qei':
+        return ask_qei(opt, n_points)
+
+    return opt.ask(n_points=n_points, strategy=batching)
+
+
+# === ask/tell 迴圈：每輪提出一批點，在 process pool 中同時回測 ===
+def batch_minimize(func, dimensions, n_calls=30, batch_size=None,
+                   batching='cl_min', n_initial_points=10, random_state=None,
+                   processes=None, initializer=None, initargs=(),
+                   callback=None, x0=None, y0=None):
+    '''
+    與 skopt.gp_minimize 相同的最小化，但每輪以 ask/tell 提出 ``batch_size``
+    個點並平行評估
+
+    - ``func``: 接收一個點（參數 list）回傳要最小化的值。必須可 pickle
+      （定義在模組層級），在 worker process 中執行
+    - ``batching``: ``cl_min``/``cl_mean``/``cl_max`` (constant liar) 或
+      ``qei`` (Monte Carlo q-EI)
+    - ``processes``: pool 大小，預設為 ``batch_size``。``0`` 表示不開 pool，
+      在目前的 process 中依序評估（此時 ``func`` 不必可 pickle）
+    - ``initializer``/``initargs``: 每個 worker 啟動時執行一次，例如載入
+      in-sample 資料，讓每次回測不必重新傳送或讀取
+    - ``callback``: 每輪結束後以 ``(xs, ys)`` 呼叫
+    - ``x0``/``y0``: 已經評估過的點與值（例如上次中斷前存下的），先告訴
+      最佳化器做暖啟動，並計入 ``n_calls``；不在 ``dimensions`` 內的點略過
+
+    回傳 ``skopt`` 的 ``OptimizeResult``（``x``, ``fun``, ``x_iters``,
+    ``func_vals``）
+    '''
+    if batching not in BATCHINGS:
+        raise ValueError(f'batching must be one of {BATCHINGS}')
+
+    batch_size = batch_size or multiprocessing.cpu_count()
+    opt = Optimizer(dimensions, base_estimator='GP', acq_func='EI',
+                    n_initial_points=n_initial_points,
+                    random_state=random_state)
+
+    if x0:
+        known = [(x, y) for x, y in zip(x0, y0) if x in opt.space]
+        if known:
+            opt.tell([x for x, _ in known], [y for _, y in known])
+
+    if processes == 0:
+        # 在目前的 process 中依序評估（例如本身已在 worker 中）
+        if initializer is not None:
+            initializer(*initargs)
+        return ask_tell(opt, lambda xs: [func(x) for x in xs], n_calls,
+                        batch_size, batching, callback)
+
+    with multiprocessing.Pool(processes or batch_size,
+                              initializer, initargs) as pool:
+        return ask_tell(opt, lambda xs: pool.map(func, xs, chunksize=1),
+                        n_calls, batch_size, batching, callback)
+
+
+def ask_tell(opt, evaluate, n_calls, batch_size, batching, callback):
+    result = opt.get_result() if opt.Xi else None
+    while len(opt.Xi) < n_calls:
+        n_points = min(batch_size, n_calls - len(opt.Xi))
+        xs = ask_batch(opt, n_points, batching)
+        if not xs:
+            break  # 空間內的點都評估過了
+
+        ys = evaluate(xs)
+        result = opt.tell(xs, ys)
+        if callback is not None:
+            callback(xs, ys)
+
+    return result
@@ -2,88 +2,168 @@ import pygad
 import numpy as np
 
 import pandas as pd
+import argparse
 import importlib
 import datetime
+import json
+import multiprocessing
 import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import backtrader as bt
 
-# === 載入資料 ===
-dataframe = pd.read_csv('/Users/coconut/Auto_trade/datas/BTCUSDT_futures_4h_from_20210101.csv', index_col=0, parse_dates=True)
+# === 資料與固定參數 ===
+data_path = '/Users/coconut/Auto_trade/datas/BTCUSDT_futures_4h_from_20210101.csv'
 split_date = '2024-01-01'
-df_in = dataframe[dataframe.index < split_date]
+initial_cash = 5000000
+record_dir = 'record/RuleGA_Strategy'
+cache_path = f'{record_dir}/ga_fitness_cache.jsonl'
+
+fixed_params = dict(
+    limbars=36,
+    limbars2=36,
+    spread=0.001,
+    trailing_stop_pct=0.03,
+    lookback=20,
+)
 
 # === 導入策略類別 ===
 from strategy.RuleGA_Strategy import RuleGA_Strategy
+from trialstore import data_fingerprint
+
 
 # === 回測函數 ===
-def run_backtest(mask):
-    cerebro = bt.Cerebro(stdstats=False)
+def run_backtest(mask, df_in):
+    cerebro = bt.Cerebro(stdstats=False, indcache=True)  # 指標跨回測重用
     data = bt.feeds.PandasData(dataname=df_in, timeframe=bt.TimeFrame.Minutes, compression=5)
     cerebro.adddata(data)
-    cerebro.addstrategy(RuleGA_Strategy,
-                        condition_mask=mask,
-                        limbars=36,
-                        limbars2=36,
-                        spread=0.001,
-                        trailing_stop_pct=0.03,
-                        lookback=20)
-    cerebro.broker.setcash(5000000)
+    cerebro.addstrategy(RuleGA_Strategy, condition_mask=mask, **fixed_params)
+    cerebro.broker.setcash(initial_cash)
     result = cerebro.run()
     strat = result[0]
 
-    nav_df = pd.DataFrame(strat.nav_records)
-    nav_df['datetime'] = pd.to_datetime(nav_df['datetime'])
-    nav_df = nav_df.set_index('datetime').sort_index()
-    nav_df['returns'] = nav_df['nav'].pct_change().fillna(0)
-    final_nav = nav_df['nav'].iloc[-1]
-    total_pnl = final_nav - 5000000
+    # 適應度只需要最後的資產，不必逐根記錄
+    total_pnl = strat.broker.getvalue() - initial_cash
     return total_pnl
 
-# === 適應度函數（符合 PyGAD 2.20.0 規格） ===
-def fitness_func(ga_instance, solution, solution_idx):
-    mask = [int(round(bit)) for bit in solution]
+
+# === Worker：每個 process 啟動時收到一次 df_in ===
+_worker = {}
+
+
+def init_worker(df_in):
+    _worker['df_in'] = df_in
+
+
+def evaluate(mask):
     if sum(mask) == 0:
         return -1e6  # 無條件時略過
-    pnl = run_backtest(mask)
-    return pnl
-
-# === GA 設定 ===
-gene_space = [0, 1]  # 每個基因是布林值（是否使用某條件）
-num_generations = 20
-num_parents_mating = 4
-sol_per_pop = 10
-num_genes = 5
-
-# === 初始化 GA ===
-ga_instance = pygad.GA(
-    gene_space=gene_space,
-    num_generations=num_generations,
-    num_parents_mating=num_parents_mating,
-    fitness_func=fitness_func,
-    sol_per_pop=sol_per_pop,
-    num_genes=num_genes,
-    parent_selection_type="sss",
-    keep_parents=2,
-    crossover_type="single_point",
-    mutation_type="random",
-    mutation_percent_genes=20
-)
 
-# === 執行 GA ===
-ga_instance.run()
-ga_instance.plot_fitness()
+    return run_backtest(list(mask), _worker['df_in'])
+
+
+# === 適應度快取：key = 基因 (0/1) + 資料指紋 + 固定參數，存在 record/RuleGA_Strategy/ ===
+def canonical(solution):
+    return tuple(int(round(bit)) for bit in solution)
+
+
+class FitnessCache:
+    def __init__(self, path, fingerprint, params):
+        self.path = path
+        self.context = dict(data=fingerprint, params=params)
+        self.fitness = {}
+        self.hits = self.misses = 0
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 中斷時寫了一半的最後一行
+                    if entry['data'] == fingerprint and entry['params'] == params:
+                        self.fitness[tuple(entry['mask'])] = entry['fitness']
+
+    def missing(self, masks):
+        todo = []
+        for mask in masks:
+            if mask in self.fitness:
+                self.hits += 1
+            elif mask not in todo:
+                self.misses += 1
+                todo.append(mask)
+        return todo
+
+    def add(self, masks, values):
+        # append + flush：中斷後已評估的結果仍保留
+        with open(self.path, 'a') as f:
+            for mask, value in zip(masks, values):
+                self.fitness[mask] = value
+                f.write(json.dumps({**self.context, 'mask': list(mask), 'fitness': value}) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', default=data_path, help='K 線資料 CSV')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(), help='平行回測的 process 數')
+    args = parser.parse_args()
+
+    # === 載入資料 ===
+    dataframe = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    df_in = dataframe[dataframe.index < split_date]
+
+    os.makedirs(record_dir, exist_ok=True)
+    cache = FitnessCache(cache_path, data_fingerprint(df_in), fixed_params)
+
+    # === GA 設定 ===
+    gene_space = [0, 1]  # 每個基因是布林值（是否使用某條件）
+    num_generations = 20
+    num_parents_mating = 4
+    sol_per_pop = 10
+    num_genes = 5
+
+    with multiprocessing.Pool(args.processes, init_worker, (df_in,)) as pool:
+
+        # === 適應度函數：整個族群一批，只有快取沒有的基因才平行回測 ===
+        def fitness_func(ga_instance, solutions, solutions_idx):
+            masks = [canonical(solution) for solution in solutions]
+            todo = cache.missing(masks)
+            if todo:
+                cache.add(todo, pool.map(evaluate, todo, chunksize=1))
+            return [cache.fitness[mask] for mask in masks]
+
+        # === 初始化 GA ===
+        ga_instance = pygad.GA(
+            gene_space=gene_space,
+            num_generations=num_generations,
+            num_parents_mating=num_parents_mating,
+            fitness_func=fitness_func,
+            fitness_batch_size=sol_per_pop,
+            sol_per_pop=sol_per_pop,
+            num_genes=num_genes,
+            parent_selection_type="sss",
+            keep_parents=2,
+            crossover_type="single_point",
+            mutation_type="random",
+            mutation_percent_genes=20
+        )
+
+        # === 執行 GA ===
+        ga_instance.run()
+
+    print(f"Fitness cache: {cache.hits} hits, {cache.misses} backtests")
+    ga_instance.plot_fitness()
+
+    # === 最佳解 ===
+    best_solution, best_solution_fitness, _ = ga_instance.best_solution(ga_instance.last_generation_fitness)
+    best_mask = [int(round(x)) for x in best_solution]
+    print(f"Best mask: {best_mask}, Fitness: {best_solution_fitness:.2f}")
 
-# === 最佳解 ===
-best_solution, best_solution_fitness, _ = ga_instance.best_solution()
-best_mask = [int(round(x)) for x in best_solution]
-print(f"Best mask: {best_mask}, Fitness: {best_solution_fitness:.2f}")
+    # === 儲存最佳結果 ===
+    with open(f'{record_dir}/ga_best_mask.txt', 'w') as f:
+        f.write(f"Best mask: {best_mask}\n")
+        f.write(f"Fitness: {best_solution_fitness:.2f}\n")
 
-# === 儲存最佳結果 ===
-os.makedirs('record/RuleGA_Strategy', exist_ok=True)
-with open('record/RuleGA_Strategy/ga_best_mask.txt', 'w') as f:
-    f.write(f"Best mask: {best_mask}\n")
-    f.write(f"Fitness: {best_solution_fitness:.2f}\n")
 
+if __name__ == '__main__':
+    main()
@@ -6,43 +6,49 @@ import importlib
 import backtrader as bt
 import pandas as pd
 import matplotlib.pyplot as plt
-from skopt import gp_minimize
+import multiprocessing
 import datetime
+import time
 
-# === Argument Parser ===
-parser = argparse.ArgumentParser()
-parser.add_argument('--strategy', required=True, help='策略類別名稱（需對應 strategy 資料夾下的 Python 檔）')
-args = parser.parse_args()
-
-strategy_name = args.strategy
-strategy_path = f"strategy.{strategy_name}"
-StrategyClass = getattr(importlib.import_module(strategy_path), strategy_name)
+from bayesopt import BATCHINGS, batch_minimize
+from prescreen import screen
+from trialstore import TrialStore, data_fingerprint
 
 # === Constants ===
 split_date = '2024-01-01'
-os.makedirs(f"record/{strategy_name}", exist_ok=True)
 initial_cash = 5000000
 contract_multiplier = 1000
+data_path = '/Users/coconut/Auto_trade/datas/BTCUSDT_futures_4h_from_20210101.csv'
+
+
+def load_strategy(strategy_name):
+    strategy_path = f"strategy.{strategy_name}"
+    return getattr(importlib.import_module(strategy_path), strategy_name)
 
-# === Load Data ===
-dataframe = pd.read_csv('/Users/coconut/Auto_trade/datas/BTCUSDT_futures_4h_from_20210101.csv', index_col=0, parse_dates=True)
-df_in = dataframe[dataframe.index < split_date]
-df_out = dataframe[dataframe.index >= split_date]
 
 # === Run Backtest ===
-def run_backtest(params, df, cash=None, plot_path=None):
-    cerebro = bt.Cerebro(stdstats=False)
-    data = bt.feeds.PandasData(dataname=df, timeframe=bt.TimeFrame.Minutes, compression=240)
+def backtest(StrategyClass, params, df, cash=None, pruner=None):
+    cerebro = bt.Cerebro(stdstats=False, indcache=True)  # 指標跨回測重用
+    if isinstance(df, bt.AbstractDataBase):
+        data = df  # 已建立好的 feed（例如 walkforward 的 MemMapData 區段）
+    else:
+        data = bt.feeds.PandasData(dataname=df, timeframe=bt.TimeFrame.Minutes, compression=240)
     cerebro.adddata(data)
     cerebro.addstrategy(StrategyClass, **params)
+    cerebro.addanalyzer(bt.analyzers.EquityCurve, _name='equity')  # 每根 bar 的資產，存在 numpy array
+    if pruner is not None:
+        # 明顯輸掉的參數提早停止，PnL 為停止當下的部分分數
+        cerebro.addanalyzer(bt.analyzers.Pruner, _name='pruner', **pruner)
     cerebro.broker.setcash(initial_cash if cash is None else cash)
 
     result = cerebro.run()
-    strat = result[0]
+    return result[0]
+
+
+def run_backtest(StrategyClass, params, df, cash=None, plot_path=None, pruner=None):
+    strat = backtest(StrategyClass, params, df, cash=cash, pruner=pruner)
 
-    nav_df = pd.DataFrame(strat.nav_records)
-    nav_df['datetime'] = pd.to_datetime(nav_df['datetime'])
-    nav_df = nav_df.set_index('datetime').sort_index()
+    nav_df = strat.analyzers.equity.get_dataframe().rename(columns={'value': 'nav'})
     nav_df['returns'] = nav_df['nav'].pct_change().fillna(0)
 
     realized_df = pd.DataFrame(getattr(strat, 'trade_records', []))
@@ -58,84 +64,201 @@ def run_backtest(params, df, cash=None, plot_path=None):
     total_pnl = final_nav - (initial_cash if cash is None else cash)
     return nav_df.reset_index(), realized_df.reset_index(), total_pnl, final_nav
 
-# === Auto Optimization ===
-param_names = StrategyClass.param_names()
-opt_space = StrategyClass.get_opt_space()
-history = []
+# === Worker：每個 process 啟動時載入一次策略與 in-sample 資料 ===
+_worker = {}
+
+
+def init_worker(strategy_name, df, pruner=None, store=None):
+    _worker['strategy'] = load_strategy(strategy_name)
+    _worker['df'] = df
+    _worker['pruner'] = pruner
+    _worker['store'] = store
+
 
 def objective(x):
-    params = {k: v for k, v in zip(param_names, x)}
-    nav_df, realized_df, score, _ = run_backtest(params, df_in)
-    history.append({**params, 'final_value': score})
+    StrategyClass = _worker['strategy']
+    params = {k: v for k, v in zip(StrategyClass.param_names(), x)}
+    store = _worker['store']
+    if store is not None:
+        score = store.get(params)
+        if score is not None:
+            return -score  # 相同參數已經回測過
+
+    start = time.perf_counter()
+    strat = backtest(StrategyClass, params, _worker['df'], pruner=_worker['pruner'])
+    score = strat.broker.getvalue() - initial_cash
+
+    if store is not None:
+        # 每個回測完成就寫入，中斷後重跑不會遺失
+        metrics = dict(strat.analyzers.equity.get_analysis(), trades=len(getattr(strat, 'trade_records', [])))
+        pruned = _worker['pruner'] is not None and strat.analyzers.pruner.get_analysis().pruned
+        store.add(params, score, metrics, pruned=pruned, elapsed=time.perf_counter() - start)
+
     return -score
 
-res = gp_minimize(
-    func=objective,
-    dimensions=opt_space,
-    n_calls=30,
-    random_state=42
-)
 
-best_params = {k: v for k, v in zip(param_names, res.x)}
-pd.DataFrame(history).to_csv(f'record/{strategy_name}/gp_optimize_results.csv', index=False)
+# === 向量化預篩：整個參數網格先以 NumPy 粗估，只有前 top_k 組跑完整回測 ===
+def prescreen_optimize(StrategyClass, strategy_name, df_in, top_k, processes=None, pruner=None, store=None):
+    grid, ranked = screen(StrategyClass, df_in)
+    top = list(ranked.index[:top_k])
+    param_names = StrategyClass.param_names()
+    xs = [[grid[i][name] for name in param_names] for i in top]
+
+    with multiprocessing.Pool(processes or multiprocessing.cpu_count(),
+                              init_worker, (strategy_name, df_in, pruner, store)) as pool:
+        ys = pool.map(objective, xs, chunksize=1)
+
+    ranked.loc[top, 'final_value'] = [-y for y in ys]
+    ranked.to_csv(f'record/{strategy_name}/prescreen_results.csv', index=False)
+    print(f"Prescreen: {len(grid)} combinations, {len(top)} full backtests")
+    return grid[top[ys.index(min(ys))]]
+
+
+def main():
+    # === Argument Parser ===
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--strategy', required=True, help='策略類別名稱（需對應 strategy 資料夾下的 Python 檔）')
+    parser.add_argument('--data', default=data_path, help='K 線資料 CSV')
+    parser.add_argument('--n-calls', type=int, default=30, help='總共回測的參數組數')
+    parser.add_argument('--batch-size', type=int, default=multiprocessing.cpu_count(), help='每輪同時回測的參數組數')
+    parser.add_argument('--batching', choices=BATCHINGS, default='cl_min', help='每輪選點方式：constant liar (cl_*) 或 q-EI (qei)')
+    parser.add_argument('--processes', type=int, default=None, help='process pool 大小（預設 = batch size）')
+    parser.add_argument('--prescreen', type=int, default=None, metavar='TOP_K', help='以向量化預篩取代貝氏最佳化：粗估整個參數網格，只完整回測前 TOP_K 組')
+    parser.add_argument('--prune', choices=bt.analyzers.PruneHistory.Rules, default=None, help='在檢查點（20%%/40%%/60%%/80%% 的 bar）落後已完成回測的中位數 (median) 或目前最佳 (best) 就提早停止')
+    parser.add_argument('--prune-drawdown', type=float, default=None, help='回撤超過此比例（例如 0.3）就提早停止')
+    parser.add_argument('--no-store', action='store_true', help='不使用 record/<strategy>/trials.sqlite（不暖啟動、不略過已回測的參數）')
+    args = parser.parse_args()
+
+    strategy_name = args.strategy
+    StrategyClass = load_strategy(strategy_name)
+    os.makedirs(f"record/{strategy_name}", exist_ok=True)
+
+    # === Load Data ===
+    dataframe = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    df_in = dataframe[dataframe.index < split_date]
+    df_out = dataframe[dataframe.index >= split_date]
+
+    # === 提早停止：各 worker 透過 manager 共用已完成回測的檢查點 ===
+    pruner = None
+    if args.prune or args.prune_drawdown is not None:
+        pruner = dict(maxdrawdown=args.prune_drawdown)
+        if args.prune:
+            trials = bt.analyzers.PruneHistory(multiprocessing.Manager().list())
+            pruner.update(history=trials, rule=args.prune)
+
+    # === Trial 紀錄：每個回測完成即寫入，重跑時暖啟動並略過相同參數 ===
+    store = None
+    if not args.no_store:
+        context = dict(strategy=strategy_name, split_date=split_date, initial_cash=initial_cash)
+        store = TrialStore(f'record/{strategy_name}/trials.sqlite', data_fingerprint(df_in), context,
+                           reuse_pruned=pruner is not None)
+
+    if args.prescreen:
+        best_params = prescreen_optimize(StrategyClass, strategy_name, df_in, args.prescreen, args.processes, pruner, store)
+        evaluate(StrategyClass, strategy_name, best_params, dataframe, df_in, df_out)
+        return
+
+    # === Auto Optimization ===
+    param_names = StrategyClass.param_names()
+    opt_space = StrategyClass.get_opt_space()
+    history = []
+    x0, values = store.points(param_names) if store is not None else ([], [])
+    if x0:
+        print(f"Warm start: {len(x0)} trials from {store.path}")
+
+    def record(xs, ys):
+        for x, y in zip(xs, ys):
+            history.append({**dict(zip(param_names, x)), 'final_value': -y})
+
+    res = batch_minimize(
+        func=objective,
+        dimensions=opt_space,
+        n_calls=args.n_calls,
+        batch_size=args.batch_size,
+        batching=args.batching,
+        random_state=42,
+        processes=args.processes,
+        initializer=init_worker,
+        initargs=(strategy_name, df_in, pruner, store),
+        callback=record,
+        x0=x0,
+        y0=[-value for value in values],
+    )
+
+    best_params = {k: v for k, v in zip(param_names, res.x)}
+    if store is not None:
+        # 包含之前執行存下的 trial
+        history = store.to_dataframe().rename(columns={'value': 'final_value'})
+        history = history[param_names + [c for c in history.columns if c not in param_names]]
+    pd.DataFrame(history).to_csv(f'record/{strategy_name}/gp_optimize_results.csv', index=False)
+    if args.prune:
+        n_pruned = sum(final is None for _, final in trials.store)
+        print(f"Pruned: {n_pruned} / {len(trials)} backtests stopped early")
+
+    evaluate(StrategyClass, strategy_name, best_params, dataframe, df_in, df_out)
+
 
 # === Final Evaluation ===
-nav_in, realized_in, pnl_in, final_in_value = run_backtest(best_params, df_in)
-nav_out, realized_out, pnl_out, _ = run_backtest(best_params, df_out, cash=final_in_value, plot_path=f"record/{strategy_name}/op_result.png")
-
-nav_all = pd.concat([nav_in.assign(in_sample=True), nav_out.assign(in_sample=False)]).set_index('datetime').sort_index()
-nav_all['cumpnl'] = nav_all['nav'] - initial_cash
-
-realized_all = pd.concat([realized_in.assign(in_sample=True), realized_out.assign(in_sample=False)])
-realized_all = realized_all.sort_values('datetime')
-
-# === Step 1: 加總每一筆交易的報酬 ===
-total_return = realized_all['return'].sum()
-
-# === Step 2: 取得總交易期間的天數 ===
-start_date = realized_all['datetime'].min()
-end_date = realized_all['datetime'].max()
-total_days = (end_date - start_date).days
-total_trade = len(realized_all)
-avg_trade_per_days = total_trade / total_days if total_days > 0 else 0
-
-# 如果時間跨度為0天，避免除以0
-if total_days == 0:
-    avg_daily_return = 0
-    annualized_return = 0
-else:
-    # === Step 3: 日報酬 = 總報酬 / 總交易天數 ===
-    avg_daily_return = total_return / total_days
-
-    # === Step 4: 年化報酬 = (1 + 日報酬)^(365) - 1 ===
-    annualized_return = (1 + avg_daily_return) ** 365 - 1
-
-nav_all.to_csv(f"record/{strategy_name}/nav_records.csv")
-realized_all.to_csv(f"record/{strategy_name}/realized_records.csv", index=False)
-
-returns = nav_all['returns']
-sharpe_ratio = (returns.mean() / returns.std()) * (365 * 24 * 12)**0.5 if returns.std() > 0 else 0
-max_drawdown = ((nav_all['nav'] - nav_all['nav'].cummax()) / nav_all['nav'].cummax()).min()
-
-with open(f"record/{strategy_name}/summary.txt", "w") as f:
-    f.write(f"最佳參數: {best_params}\n")
-    f.write(f"In-sample PnL: {pnl_in:.2f}\n")
-    f.write(f"Out-of-sample PnL: {pnl_out:.2f}\n")
-    f.write(f"Sharpe Ratio: {sharpe_ratio:.4f}\n")
-    f.write(f"Max Drawdown: {max_drawdown:.2%}\n")
-    f.write(f"Annualized Return: {annualized_return:.2%}\n")
-    f.write(f"Average Trade Per Days: {avg_trade_per_days:.2f}\n")
-
-fig, axs = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
-axs[0].plot(nav_all.index, nav_all['nav'] - initial_cash, label='Net Asset Value')
-axs[0].axvline(pd.to_datetime(split_date), color='red', linestyle='--', label='Split Date')
-axs[0].legend(); axs[0].grid(); axs[0].set_title(strategy_name)
-
-axs[1].plot(dataframe.index, dataframe['close'], label='Price', color='black')
-axs[1].axvline(pd.to_datetime(split_date), color='red', linestyle='--', label='Split Date')
-axs[1].legend(); axs[1].grid(); axs[1].set_title('Price Movement')
-
-plt.tight_layout()
-plt.savefig(f"record/{strategy_name}/net_value_split.png")
-plt.close()
+def evaluate(StrategyClass, strategy_name, best_params, dataframe, df_in, df_out):
+    nav_in, realized_in, pnl_in, final_in_value = run_backtest(StrategyClass, best_params, df_in)
+    nav_out, realized_out, pnl_out, _ = run_backtest(StrategyClass, best_params, df_out, cash=final_in_value, plot_path=f"record/{strategy_name}/op_result.png")
+
+    nav_all = pd.concat([nav_in.assign(in_sample=True), nav_out.assign(in_sample=False)]).set_index('datetime').sort_index()
+    nav_all['cumpnl'] = nav_all['nav'] - initial_cash
+
+    realized_all = pd.concat([realized_in.assign(in_sample=True), realized_out.assign(in_sample=False)])
+    realized_all = realized_all.sort_values('datetime')
+
+    # === Step 1: 加總每一筆交易的報酬 ===
+    total_return = realized_all['return'].sum()
+
+    # === Step 2: 取得總交易期間的天數 ===
+    start_date = realized_all['datetime'].min()
+    end_date = realized_all['datetime'].max()
+    total_days = (end_date - start_date).days
+    total_trade = len(realized_all)
+    avg_trade_per_days = total_trade / total_days if total_days > 0 else 0
+
+    # 如果時間跨度為0天，避免除以0
+    if total_days == 0:
+        avg_daily_return = 0
+        annualized_return = 0
+    else:
+        # === Step 3: 日報酬 = 總報酬 / 總交易天數 ===
+        avg_daily_return = total_return / total_days
+
+        # === Step 4: 年化報酬 = (1 + 日報酬)^(365) - 1 ===
+        annualized_return = (1 + avg_daily_return) ** 365 - 1
+
+    nav_all.to_csv(f"record/{strategy_name}/nav_records.csv")
+    realized_all.to_csv(f"record/{strategy_name}/realized_records.csv", index=False)
+
+    returns = nav_all['returns']
+    sharpe_ratio = (returns.mean() / returns.std()) * (365 * 24 * 12)**0.5 if returns.std() > 0 else 0
+    max_drawdown = ((nav_all['nav'] - nav_all['nav'].cummax()) / nav_all['nav'].cummax()).min()
+
+    with open(f"record/{strategy_name}/summary.txt", "w") as f:
+        f.write(f"最佳參數: {best_params}\n")
+        f.write(f"In-sample PnL: {pnl_in:.2f}\n")
+        f.write(f"Out-of-sample PnL: {pnl_out:.2f}\n")
+        f.write(f"Sharpe Ratio: {sharpe_ratio:.4f}\n")
+        f.write(f"Max Drawdown: {max_drawdown:.2%}\n")
+        f.write(f"Annualized Return: {annualized_return:.2%}\n")
+        f.write(f"Average Trade Per Days: {avg_trade_per_days:.2f}\n")
+
+    fig, axs = plt.subplots(2, 1, figsize=(14, 8), sharex=True)
+    axs[0].plot(nav_all.index, nav_all['nav'] - initial_cash, label='Net Asset Value')
+    axs[0].axvline(pd.to_datetime(split_date), color='red', linestyle='--', label='Split Date')
+    axs[0].legend(); axs[0].grid(); axs[0].set_title(strategy_name)
+
+    axs[1].plot(dataframe.index, dataframe['close'], label='Price', color='black')
+    axs[1].axvline(pd.to_datetime(split_date), color='red', linestyle='--', label='Split Date')
+    axs[1].legend(); axs[1].grid(); axs[1].set_title('Price Movement')
+
+    plt.tight_layout()
+    plt.savefig(f"record/{strategy_name}/net_value_split.png")
+    plt.close()
+
 
+if __name__ == '__main__':
+    main()
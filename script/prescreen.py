@@ -0,0 +1,163 @@
+'''
+向量化預篩：在完整的事件驅動回測（Cerebro.run）之前，先以 NumPy 粗估整個參數
+網格的 PnL，只把最好的前幾組送去完整回測
+
+策略要宣告：
+
+  - classmethod ``signals(cls, data, **params)``：``data`` 為 open/high/low/
+    close/volume 的 NumPy array dict，回傳 (long_signal, short_signal) 兩個
+    bool array（與 ``next`` 中的進場訊號相同，指標暖身期間為 False）
+  - ``stop_params``：(多單移動停損, 空單移動停損, 多單停損, 空單停損) 的參數
+    名稱，其餘參數視為訊號參數
+
+粗估模擬與策略的 ``next`` 相同的規則（收盤下單、下一根開盤成交、每次 1 單位、
+移動停損/停損/反手），但不經過 broker，所有參數組合在同一個 bar 迴圈中以陣列
+運算一起處理
+'''
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+# === 向量化指標（與 backtrader 的指標相同的定義） ===
+def sma(x, period):
+    return pd.Series(x).rolling(period).mean().values
+
+
+def smma(x, period):
+    # Wilder 平滑：以前 period 根的 SMA 為起點，alpha = 1 / period
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        seeded = np.array(x[period - 1:], dtype=float)
+        seeded[0] = np.mean(x[:period])
+        out[period - 1:] = pd.Series(seeded).ewm(alpha=1.0 / period, adjust=False).mean().values
+    return out
+
+
+def linreg_end(x, period):
+    # 最近 period 根的最小平方回歸線在最後一根的值
+    x = np.asarray(x, dtype=float)
+    out = np.full(len(x), np.nan)
+    if len(x) < period:
+        return out
+
+    k = np.arange(len(x), dtype=float)
+    c1 = np.concatenate([[0.0], np.cumsum(x)])
+    c2 = np.concatenate([[0.0], np.cumsum(k * x)])
+    end = np.arange(period, len(x) + 1)  # 窗口 [end - period, end)
+    start = end - period
+    sum_y = c1[end] - c1[start]
+    sum_xy = (c2[end] - c2[start]) - start * sum_y  # x = 0 .. period - 1
+
+    sum_x = period * (period - 1) / 2.0
+    sum_xx = (period - 1) * period * (2 * period - 1) / 6.0
+    slope = (period * sum_xy - sum_x * sum_y) / (period * sum_xx - sum_x ** 2)
+    intercept = (sum_y - slope * sum_x) / period
+    out[period - 1:] = intercept + slope * (period - 1)
+    return out
+
+
+# === 參數網格 ===
+def supports(StrategyClass):
+    return hasattr(StrategyClass, 'signals') and hasattr(StrategyClass, 'stop_params')
+
+
+def param_grid(StrategyClass):
+    names = StrategyClass.param_names()
+    values = []
+    for name, dim in zip(names, StrategyClass.get_opt_space()):
+        categories = getattr(dim, 'categories', None)
+        if categories is None:
+            raise ValueError(f'{name}: only Categorical dimensions can be enumerated')
+        values.append(categories)
+
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def to_arrays(df):
+    return {name: df[name].values.astype(float) for name in ['open', 'high', 'low', 'close', 'volume']}
+
+
+# === 訊號：只依賴訊號參數，相同的訊號參數只算一次 ===
+def grid_signals(StrategyClass, data, grid):
+    stop_names = set(StrategyClass.stop_params)
+    keys, longs, shorts = {}, [], []
+    cols = np.empty(len(grid), dtype=int)
+    for j, params in enumerate(grid):
+        key = tuple((k, v) for k, v in params.items() if k not in stop_names)
+        if key not in keys:
+            long_signal, short_signal = StrategyClass.signals(data, **dict(key))
+            keys[key] = len(longs)
+            longs.append(np.asarray(long_signal, dtype=bool))
+            shorts.append(np.asarray(short_signal, dtype=bool))
+        cols[j] = keys[key]
+
+    return np.column_stack(longs), np.column_stack(shorts), cols
+
+
+# === 粗估回測：bar 迴圈，每一步同時處理所有參數組合 ===
+def simulate(data, longs, shorts, cols, stops):
+    opens, closes = data['open'], data['close']
+    long_trail, short_trail, long_stop, short_stop = stops
+    m = len(cols)
+
+    pos = np.zeros(m)
+    target = np.zeros(m)
+    cash = np.zeros(m)
+    entry = np.full(m, np.nan)
+    extreme = np.full(m, np.nan)  # 多單的最高價 / 空單的最低價
+    trades = np.zeros(m, dtype=int)
+
+    for t in range(len(closes)):
+        # 上一根收盤下的單在這根開盤成交
+        moved = target != pos
+        if moved.any():
+            cash -= (target - pos) * opens[t]
+            entry[moved & (target != 0)] = opens[t]
+            # 反手時舊倉的 notify_trade 會清掉 entry_price 與最高/最低價
+            reversed_ = moved & (pos != 0) & (target != 0)
+            entry[reversed_] = np.nan
+            extreme[reversed_] = np.nan
+            trades += moved & (pos != 0)
+            pos = target.copy()
+
+        close = closes[t]
+        long_signal = longs[t, cols]
+        short_signal = shorts[t, cols]
+        is_long, is_short, flat = pos > 0, pos < 0, pos == 0
+
+        extreme = np.where(is_long, np.fmax(extreme, close),
+                           np.where(is_short, np.fmin(extreme, close), extreme))
+        exit_long = is_long & ((close < extreme * (1 - long_trail)) | (close < entry * (1 - long_stop)))
+        exit_short = is_short & ((close > extreme * (1 + short_trail)) | (close > entry * (1 + short_stop)))
+        go_long = (is_short & ~exit_short & long_signal) | (flat & long_signal)
+        go_short = (is_long & ~exit_long & short_signal) | (flat & short_signal & ~long_signal)
+
+        target = pos.copy()
+        target[exit_long | exit_short] = 0
+        target[go_long] = 1
+        target[go_short] = -1
+        extreme[go_long | go_short] = close
+
+    return cash + pos * closes[-1], trades
+
+
+def screen(StrategyClass, df):
+    '''
+    粗估 ``StrategyClass`` 整個參數網格在 ``df`` 上的 PnL，回傳參數網格（list
+    of dict）與依 ``rough_pnl`` 由大到小排序的 DataFrame（index 對應網格）
+    '''
+    if not supports(StrategyClass):
+        raise ValueError(f'{StrategyClass.__name__} does not declare signals/stop_params')
+
+    grid = param_grid(StrategyClass)
+    data = to_arrays(df)
+    longs, shorts, cols = grid_signals(StrategyClass, data, grid)
+    stops = [np.array([params[name] for params in grid], dtype=float)
+             for name in StrategyClass.stop_params]
+
+    rough_pnl, trades = simulate(data, longs, shorts, cols, stops)
+    ranked = pd.DataFrame(grid).assign(rough_pnl=rough_pnl, rough_trades=trades)
+    return grid, ranked.sort_values('rough_pnl', ascending=False, kind='stable')
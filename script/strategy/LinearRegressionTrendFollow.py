@@ -1,6 +1,5 @@
 import backtrader as bt
 import datetime
-import numpy as np
 from skopt.space import Categorical
 
 class LinearRegressionTrendFollow(bt.Strategy):
@@ -22,9 +21,20 @@ class LinearRegressionTrendFollow(bt.Strategy):
     def param_names(cls):
         return ['lookback', 'trailing_stop_pct', 'stop_loss_pct']
 
+    # === 向量化預篩（prescreen.py）：與 next 相同的進場訊號，多空共用停損參數 ===
+    stop_params = ('trailing_stop_pct', 'trailing_stop_pct',
+                   'stop_loss_pct', 'stop_loss_pct')
+
+    @classmethod
+    def signals(cls, data, lookback=20):
+        from prescreen import linreg_end
+        close = data['close']
+        return close > linreg_end(data['high'], lookback), close < linreg_end(data['low'], lookback)
+
     def __init__(self):
+        # 最高價與最低價的回歸線（每根 bar 以 running sums 更新，不再 polyfit）
+        self.channel = bt.indicators.LinRegChannel(self.data, period=self.p.lookback)
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.lowest_price = None
         self.entry_price = None
@@ -48,29 +58,10 @@ class LinearRegressionTrendFollow(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        dt = self.data.datetime.datetime(0)
-
-        # === 資產紀錄 ===
-        position_value = self.position.size * close
-        nav = self.broker.get_cash() + position_value
-        self.nav_records.append({
-            'datetime': dt.isoformat(),
-            'nav': nav
-        })
-
-        if len(self) < self.p.lookback:
-            return
 
         # === 回歸線：最高價與最低價 ===
-        high_prices = np.array([self.data.high[-i] for i in range(self.p.lookback)][::-1])
-        low_prices = np.array([self.data.low[-i] for i in range(self.p.lookback)][::-1])
-        x = np.arange(self.p.lookback)
-
-        high_slope, high_intercept = np.polyfit(x, high_prices, 1)
-        low_slope, low_intercept = np.polyfit(x, low_prices, 1)
-
-        high_line = high_slope * (self.p.lookback - 1) + high_intercept
-        low_line = low_slope * (self.p.lookback - 1) + low_intercept
+        high_line = self.channel.top[0]
+        low_line = self.channel.bot[0]
 
         # === 開倉訊號 ===
         long_signal = close > high_line
@@ -1,6 +1,5 @@
 import backtrader as bt
 import datetime
-import numpy as np
 from skopt.space import Categorical
 
 class LinearRegressionTrendFollowLongOnly(bt.Strategy):
@@ -23,8 +22,8 @@ class LinearRegressionTrendFollowLongOnly(bt.Strategy):
         return ['lookback', 'trailing_stop_pct', 'stop_loss_pct']
 
     def __init__(self):
+        self.high_reg = bt.indicators.RollingLinReg(self.data.high, period=self.p.lookback)
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.entry_price = None
 
@@ -46,19 +45,8 @@ class LinearRegressionTrendFollowLongOnly(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        dt = self.data.datetime.datetime(0)
 
-        position_value = self.position.size * close
-        nav = self.broker.get_cash() + position_value
-        self.nav_records.append({'datetime': dt.isoformat(), 'nav': nav})
-
-        if len(self) < self.p.lookback:
-            return
-
-        high_prices = np.array([self.data.high[-i] for i in range(self.p.lookback)][::-1])
-        x = np.arange(self.p.lookback)
-        slope, intercept = np.polyfit(x, high_prices, 1)
-        high_line = slope * (self.p.lookback - 1) + intercept
+        high_line = self.high_reg.endpoint[0]
         long_signal = close > high_line
 
         if self.position:
@@ -1,6 +1,5 @@
 import backtrader as bt
 import datetime
-import numpy as np
 from skopt.space import Categorical
 
 class LinearRegressionTrendFollowShortOnly(bt.Strategy):
@@ -23,8 +22,8 @@ class LinearRegressionTrendFollowShortOnly(bt.Strategy):
         return ['lookback', 'trailing_stop_pct', 'stop_loss_pct']
 
     def __init__(self):
+        self.low_reg = bt.indicators.RollingLinReg(self.data.low, period=self.p.lookback)
         self.trade_records = []
-        self.nav_records = []
         self.lowest_price = None
         self.entry_price = None
 
@@ -46,19 +45,8 @@ class LinearRegressionTrendFollowShortOnly(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        dt = self.data.datetime.datetime(0)
 
-        position_value = self.position.size * close
-        nav = self.broker.get_cash() + position_value
-        self.nav_records.append({'datetime': dt.isoformat(), 'nav': nav})
-
-        if len(self) < self.p.lookback:
-            return
-
-        low_prices = np.array([self.data.low[-i] for i in range(self.p.lookback)][::-1])
-        x = np.arange(self.p.lookback)
-        slope, intercept = np.polyfit(x, low_prices, 1)
-        low_line = slope * (self.p.lookback - 1) + intercept
+        low_line = self.low_reg.endpoint[0]
         short_signal = close < low_line
 
         if self.position:
@@ -1,5 +1,6 @@
 import backtrader as bt
 import datetime
+import numpy as np
 from skopt.space import Categorical
 
 class MA60change(bt.Strategy):
@@ -28,10 +29,21 @@ class MA60change(bt.Strategy):
             'short_stop_loss_pct'
         ]
 
+    # === 向量化預篩（prescreen.py）：與 next 相同的進場訊號 ===
+    stop_params = ('long_trailing_stop_pct', 'short_trailing_stop_pct',
+                   'long_stop_loss_pct', 'short_stop_loss_pct')
+
+    @classmethod
+    def signals(cls, data, **params):
+        from prescreen import sma
+        diff = np.diff(sma(data['close'], 30), prepend=np.nan)
+        prev = np.roll(diff, 1)
+        prev[0] = np.nan
+        return (diff > 0) & (prev < 0), (diff < 0) & (prev > 0)
+
     def __init__(self):
         self.sma60 = bt.indicators.SMA(self.data.close, period=30)
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.lowest_price = None
         self.entry_price = None
@@ -58,15 +70,6 @@ class MA60change(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        nav = self.broker.getvalue()
-        position_value = self.position.size * close
-        self.nav_records.append({
-            'datetime': self.data.datetime.datetime(0).isoformat(),
-            'nav': nav,
-            'cash': self.broker.get_cash(),
-            'position_value': position_value,
-            'position_size': self.position.size if self.position else 0,
-        })
 
         long_signal = self.sma60[0] - self.sma60[-1] > 0 and self.sma60[-1] - self.sma60[-2] < 0
         short_signal = self.sma60[0] - self.sma60[-1] < 0 and self.sma60[-1] - self.sma60[-2] > 0
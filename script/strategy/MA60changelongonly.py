@@ -25,7 +25,6 @@ class MA60changelongonly(bt.Strategy):
     def __init__(self):
         self.sma60 = bt.indicators.SMA(self.data.close, period=60)
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.entry_price = None
 
@@ -45,15 +44,6 @@ class MA60changelongonly(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        nav = self.broker.getvalue()
-        position_value = self.position.size * close
-        self.nav_records.append({
-            'datetime': self.data.datetime.datetime(0).isoformat(),
-            'nav': nav,
-            'cash': self.broker.get_cash(),
-            'position_value': position_value,
-            'position_size': self.position.size if self.position else 0,
-        })
 
         long_signal = self.sma60[0] - self.sma60[-1] > 0 and self.sma60[-1] - self.sma60[-2] < 0
 
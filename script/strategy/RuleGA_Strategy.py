@@ -1,6 +1,5 @@
 import backtrader as bt
 import datetime
-import numpy as np
 
 class RuleGA_Strategy(bt.Strategy):
     params = dict(
@@ -15,9 +14,9 @@ class RuleGA_Strategy(bt.Strategy):
     def __init__(self):
         self.sma60 = bt.indicators.SMA(self.data.close, period=60)
         self.rsi = bt.indicators.RSI(self.data.close, period=14)
+        self.reg = bt.indicators.RollingLinReg(self.data.close, period=self.p.lookback)
         self.orefs = []
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.lowest_price = None
 
@@ -42,21 +41,9 @@ class RuleGA_Strategy(bt.Strategy):
 
         close = self.data.close[0]
         open_ = self.data.open[0]
-        dt = self.data.datetime.datetime(0)
 
-        # 計算回歸線
-        y = np.array([self.data.close[-i] for i in range(self.p.lookback)][::-1])
-        x = np.arange(self.p.lookback)
-        slope, intercept = np.polyfit(x, y, 1)
-        reg_value = slope * (self.p.lookback - 1) + intercept
-
-        # === NAV 紀錄 ===
-        position_value = self.position.size * close
-        nav = self.broker.get_cash() + position_value
-        self.nav_records.append({
-            'datetime': dt.isoformat(),
-            'nav': nav
-        })
+        # 回歸線在目前這根的值
+        reg_value = self.reg.endpoint[0]
 
         # === 持倉中移動止損 ===
         if self.position:
@@ -1,5 +1,6 @@
 import backtrader as bt
 import datetime
+import numpy as np
 from skopt.space import Categorical
 
 class SSMAchange(bt.Strategy):
@@ -31,10 +32,21 @@ class SSMAchange(bt.Strategy):
             'ssma_period'
         ]
 
+    # === 向量化預篩（prescreen.py）：與 next 相同的進場訊號 ===
+    stop_params = ('long_trailing_stop_pct', 'short_trailing_stop_pct',
+                   'long_stop_loss_pct', 'short_stop_loss_pct')
+
+    @classmethod
+    def signals(cls, data, ssma_period=30):
+        from prescreen import smma
+        diff = np.diff(smma(data['close'], ssma_period), prepend=np.nan)
+        prev = np.roll(diff, 1)
+        prev[0] = np.nan
+        return (diff > 0) & (prev < 0), (diff < 0) & (prev > 0)
+
     def __init__(self):
         self.ssma = bt.ind.SmoothedMovingAverage(self.data.close, period=self.p.ssma_period)
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.lowest_price = None
         self.entry_price = None
@@ -60,16 +72,6 @@ class SSMAchange(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        nav = self.broker.getvalue()
-        position_value = self.position.size * close
-
-        self.nav_records.append({
-            'datetime': self.data.datetime.datetime(0).isoformat(),
-            'nav': nav,
-            'cash': self.broker.get_cash(),
-            'position_value': position_value,
-            'position_size': self.position.size if self.position else 0,
-        })
 
         # 訊號邏輯：使用 SSMA 斜率轉折判斷
         long_signal = self.ssma[0] - self.ssma[-1] > 0 and self.ssma[-1] - self.ssma[-2] < 0
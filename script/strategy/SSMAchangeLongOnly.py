@@ -23,7 +23,6 @@ class SSMAchangeLongOnly(bt.Strategy):
     def __init__(self):
         self.ssma = bt.ind.SmoothedMovingAverage(self.data.close, period=self.p.ssma_period)
         self.trade_records = []
-        self.nav_records = []
         self.highest_price = None
         self.entry_price = None
 
@@ -46,13 +45,6 @@ class SSMAchangeLongOnly(bt.Strategy):
 
     def next(self):
         close = self.data.close[0]
-        self.nav_records.append({
-            'datetime': self.data.datetime.datetime(0).isoformat(),
-            'nav': self.broker.getvalue(),
-            'cash': self.broker.get_cash(),
-            'position_value': self.position.size * close,
-            'position_size': self.position.size
-        })
 
         if len(self) < self.p.ssma_period + 2:
             return
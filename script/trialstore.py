@@ -0,0 +1,134 @@
+'''
+最佳化的 trial 紀錄：SQLite 檔（只新增），每個回測完成就 commit 一筆
+
+每筆 trial 記錄參數、資料指紋、固定設定（context）、分數、指標、耗時與完成
+時間。中斷後重新執行時：
+
+  - 以已存的 trial 暖啟動最佳化器（``points``）
+  - 相同的參數（同資料、同設定）直接取回分數，不再回測（``get``）
+
+同一組參數重新回測時新增一筆，不覆蓋舊的：``get`` 與 ``points`` 取完整跑完
+的、其中最新的一筆，``trials`` 與 ``to_dataframe`` 保留全部的歷史
+
+SQLite 以 WAL 模式寫入，多個 worker process 可以同時 commit；程式中斷最多
+只會少掉正在執行的 trial
+'''
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS trials (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL,
+    context TEXT NOT NULL,
+    params TEXT NOT NULL,
+    value REAL NOT NULL,
+    metrics TEXT,
+    pruned INTEGER NOT NULL DEFAULT 0,
+    elapsed REAL,
+    finished TEXT
+);
+CREATE INDEX IF NOT EXISTS trials_key ON trials (data, context, params);
+'''
+
+# 每組參數取一筆：完整跑完的優先，其次最新的
+LATEST = 'ORDER BY pruned, id DESC'
+
+
+def data_fingerprint(df):
+    hashed = pd.util.hash_pandas_object(df, index=True).values
+    return hashlib.sha1(hashed.tobytes()).hexdigest()
+
+
+def to_json(obj):
+    # numpy 的數值（skopt 給的參數）轉成 python 的數值；key 排序讓相同參數得到相同字串
+    return json.dumps(obj, sort_keys=True, default=lambda x: x.item())
+
+
+class TrialStore:
+    '''
+    ``path`` 的 SQLite 中，資料指紋為 ``fingerprint`` 且固定設定為 ``context``
+    的 trial。``reuse_pruned=False`` 時提早停止（部分分數）的 trial 不拿來暖
+    啟動也不當成已完成，會重新回測（新增一筆）
+
+    可以 pickle 給 worker：連線在每個 process 中第一次使用時才建立
+    '''
+
+    def __init__(self, path, fingerprint, context=None, reuse_pruned=False):
+        self.path = path
+        self.data = fingerprint
+        self.context = to_json(context or {})
+        self.reuse_pruned = reuse_pruned
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = state['_pid'] = None
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def _where(self):
+        where = 'data = ? AND context = ?'
+        if not self.reuse_pruned:
+            where += ' AND pruned = 0'
+        return where, [self.data, self.context]
+
+    def get(self, params):
+        where, args = self._where()
+        row = self.conn.execute(f'SELECT value FROM trials WHERE {where} AND params = ? {LATEST} LIMIT 1',
+                                args + [to_json(params)]).fetchone()
+        return None if row is None else row[0]
+
+    def add(self, params, value, metrics=None, pruned=False, elapsed=None):
+        # 每筆一個 transaction：commit 後就算程式中斷也保留
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO trials (data, context, params, value, metrics, pruned, elapsed, finished) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self.data, self.context, to_json(params), float(value), to_json(metrics or {}),
+                 int(bool(pruned)), elapsed, datetime.datetime.now().isoformat(timespec='seconds')))
+
+    def trials(self):
+        where, args = self._where()
+        rows = self.conn.execute(f'SELECT params, value, metrics, pruned, elapsed, finished FROM trials '
+                                 f'WHERE {where} ORDER BY id', args)
+        return [dict(params=json.loads(params), value=value, metrics=json.loads(metrics or '{}'),
+                     pruned=bool(pruned), elapsed=elapsed, finished=finished)
+                for params, value, metrics, pruned, elapsed, finished in rows]
+
+    def points(self, param_names):
+        # 暖啟動用：參數名稱相同的 trial 轉成 (點, 分數)，相同的參數只取一筆（同 get）
+        where, args = self._where()
+        rows = self.conn.execute(f'SELECT params, value FROM trials WHERE {where} {LATEST}', args)
+        points = {}
+        for params, value in rows:
+            points.setdefault(params, (json.loads(params), value))
+
+        xs, values = [], []
+        for params, value in points.values():
+            if sorted(params) == sorted(param_names):
+                xs.append([params[name] for name in param_names])
+                values.append(value)
+        return xs, values
+
+    def to_dataframe(self):
+        rows = [{**t['params'], 'value': t['value'], **t['metrics'],
+                 'pruned': t['pruned'], 'elapsed': t['elapsed'], 'finished': t['finished']}
+                for t in self.trials()]
+        return pd.DataFrame(rows)
@@ -0,0 +1,144 @@
+'''
+Walk-forward 最佳化：每個窗口先在 in-sample 區段最佳化參數，再以最佳參數回測
+緊接著的 out-of-sample 區段（長度 = step），所有 OOS 區段接起來成為一條資產曲線
+
+  - rolling：in-sample 固定長度 window，每次往後移 step
+  - anchored：in-sample 都從資料起點開始，每次延長 step
+
+資料只讀一次並寫成 memory mapped 的 bar 檔，各窗口以 fromdate/todate 取
+MemMapData 的區段（mmap 的切片，不另建 DataFrame），各窗口在 process pool
+中平行執行
+'''
+
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import argparse
+import datetime
+import multiprocessing
+import tempfile
+import backtrader as bt
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from backtrader.feeds.memmap import writebars
+from backtrader.utils.date import dtarray2num
+
+from bayesopt import BATCHINGS, batch_minimize
+from optimize import data_path, initial_cash, load_strategy, run_backtest
+
+
+# === 切出窗口 ===
+def make_windows(start, end, window, step, anchored=False):
+    windows = []
+    train_start, train_end = start, start + window
+    while train_end < end:
+        test_end = min(train_end + step, end)
+        windows.append((train_start, train_end, train_end, test_end))
+        train_end += step
+        if not anchored:
+            train_start += step
+    return windows
+
+
+# === 共用的資料：一個 memory mapped 檔 ===
+def write_store(df, path):
+    columns = [('datetime', dtarray2num(df.index.values))]
+    columns += [(name, df[name].values) for name in ['open', 'high', 'low', 'close', 'volume']]
+    writebars(path, columns, timeframe=bt.TimeFrame.Minutes, compression=240)
+
+
+def window_data(store, start, end):
+    # todate 包含在內：往前退一秒讓 end 那根 bar 屬於下一個窗口
+    return bt.feeds.MemMapData(dataname=store, fromdate=start,
+                               todate=end - datetime.timedelta(seconds=1))
+
+
+# === 一個窗口：in-sample 最佳化 + out-of-sample 回測（在 worker 中執行） ===
+def run_window(task):
+    strategy_name, store, n_calls, batching, (train_start, train_end, test_start, test_end) = task
+    StrategyClass = load_strategy(strategy_name)
+    param_names = StrategyClass.param_names()
+
+    def objective(x):
+        params = dict(zip(param_names, x))
+        _, _, score, _ = run_backtest(StrategyClass, params, window_data(store, train_start, train_end))
+        return -score
+
+    # 窗口之間已經平行，窗口內的參數在同一個 process 中依序評估
+    res = batch_minimize(objective, StrategyClass.get_opt_space(), n_calls=n_calls,
+                         batch_size=1, batching=batching, random_state=42, processes=0)
+    best_params = dict(zip(param_names, res.x))
+
+    nav_out, _, pnl_out, _ = run_backtest(StrategyClass, best_params, window_data(store, test_start, test_end))
+    summary = dict(train_start=train_start, train_end=train_end,
+                   test_start=test_start, test_end=test_end,
+                   **best_params, in_sample_pnl=-res.fun, out_of_sample_pnl=pnl_out)
+    return summary, nav_out[['datetime', 'nav']]
+
+
+# === 把各 OOS 區段的報酬接成一條資產曲線 ===
+def stitch(navs):
+    parts = []
+    for nav in navs:
+        returns = nav['nav'] / nav['nav'].shift(1).fillna(initial_cash) - 1
+        parts.append(pd.DataFrame({'datetime': nav['datetime'], 'returns': returns}))
+
+    stitched = pd.concat(parts).set_index('datetime').sort_index()
+    stitched['nav'] = initial_cash * (1 + stitched['returns']).cumprod()
+    return stitched
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--strategy', required=True, help='策略類別名稱（需對應 strategy 資料夾下的 Python 檔）')
+    parser.add_argument('--data', default=data_path, help='K 線資料 CSV')
+    parser.add_argument('--window', type=int, default=365, help='in-sample 長度（天）')
+    parser.add_argument('--step', type=int, default=90, help='每次前進的天數 = out-of-sample 長度')
+    parser.add_argument('--anchored', action='store_true', help='in-sample 固定從資料起點開始')
+    parser.add_argument('--n-calls', type=int, default=30, help='每個窗口回測的參數組數')
+    parser.add_argument('--batching', choices=BATCHINGS, default='cl_min')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(), help='同時執行的窗口數')
+    args = parser.parse_args()
+
+    strategy_name = args.strategy
+    record_dir = f"record/{strategy_name}"
+    os.makedirs(record_dir, exist_ok=True)
+
+    # === Load Data（只讀一次） ===
+    dataframe = pd.read_csv(args.data, index_col=0, parse_dates=True)
+    windows = make_windows(dataframe.index[0].to_pydatetime(),
+                           dataframe.index[-1].to_pydatetime() + datetime.timedelta(seconds=1),
+                           datetime.timedelta(days=args.window),
+                           datetime.timedelta(days=args.step), anchored=args.anchored)
+    if not windows:
+        parser.error('the data is shorter than the window')
+
+    fd, store = tempfile.mkstemp(suffix='.btmmap')
+    os.close(fd)
+    try:
+        write_store(dataframe, store)
+        tasks = [(strategy_name, store, args.n_calls, args.batching, w) for w in windows]
+        with multiprocessing.Pool(min(args.processes, len(tasks))) as pool:
+            results = pool.map(run_window, tasks, chunksize=1)
+    finally:
+        os.remove(store)
+
+    summaries = pd.DataFrame([summary for summary, _ in results])
+    stitched = stitch([nav for _, nav in results])
+
+    summaries.to_csv(f"{record_dir}/walkforward_windows.csv", index=False)
+    stitched.to_csv(f"{record_dir}/walkforward_nav.csv")
+
+    fig, ax = plt.subplots(figsize=(14, 5))
+    ax.plot(stitched.index, stitched['nav'] - initial_cash, label='Walk-forward OOS')
+    for test_start in summaries['test_start']:
+        ax.axvline(test_start, color='grey', linestyle=':', linewidth=0.8)
+    ax.legend(); ax.grid(); ax.set_title(f"{strategy_name} walk-forward ({'anchored' if args.anchored else 'rolling'})")
+    plt.tight_layout()
+    plt.savefig(f"{record_dir}/walkforward_nav.png")
+    plt.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+chkcash = 100000.0
+
+
+class AccountStrategy(bt.Strategy):
+    params = (('period', 15), ('stake', 10))
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, self.sma)
+        self.executed = list()
+
+    def notify_order(self, order):
+        if order.status == order.Completed:
+            self.executed.append((len(self), order.executed.price,
+                                  order.executed.size))
+
+    def next(self):
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy(size=self.p.stake)
+
+        elif self.cross < 0.0:
+            self.close()
+
+
+def result(strat):
+    return (strat.broker.getvalue(), strat.broker.getcash(),
+            strat.position.size, strat.executed,
+            strat.analyzers.trades.get_analysis().total.total)
+
+
+def runstrats(allparams, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    for i in range(chkdatas):
+        cerebro.adddata(testcommon.getdata(i))
+
+    for params in allparams:
+        cerebro.addstrategy(AccountStrategy, **params)
+
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    cerebro.broker.setcash(chkcash)
+    return cerebro, cerebro.run()
+
+
+allparams = [dict(period=10, stake=10), dict(period=15, stake=20),
+             dict(period=30, stake=5)]
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        # one cerebro per strategy
+        single = [result(runstrats([params], runonce=runonce)[1][0])
+                  for params in allparams]
+
+        cerebro, strats = runstrats(allparams, runonce=runonce,
+                                    accounts=True)
+        multi = [result(strat) for strat in strats]
+        assert multi == single
+
+        # each strategy in its own broker, the one of cerebro untouched
+        brokers = [strat.broker for strat in strats]
+        assert len(set(map(id, brokers + [cerebro.broker]))) == 4
+        assert cerebro.broker.getvalue() == chkcash
+        assert cerebro.broker not in cerebro._runbrokers  # not run
+
+        # the broker of cerebro traded in a former run: nothing of it goes
+        # to the accounts but the params and commissions
+        cerebro, strats = runstrats(allparams, runonce=runonce)
+        assert cerebro.broker.orders
+        orders = set(map(id, cerebro.broker.orders))
+        strats = cerebro.run(accounts=True)
+        assert [result(strat) for strat in strats] == single
+        for strat in strats:
+            assert not orders & set(map(id, strat.broker.orders))
+            assert strat.broker.comminfo == cerebro.broker.comminfo
+
+        if main:
+            for params, res in zip(allparams, multi):
+                print(params, res[0], res[4])
+
+    # a specific broker for one strategy, the others share cerebro's
+    cerebro = bt.Cerebro()
+    cerebro.adddata(testcommon.getdata(0))
+    idx = cerebro.addstrategy(AccountStrategy, **allparams[0])
+    cerebro.addstrategy(AccountStrategy, **allparams[1])
+    broker = cerebro.setbroker_byidx(idx, bt.brokers.BackBroker(cash=chkcash))
+    strat0, strat1 = cerebro.run()
+    assert strat0.broker is broker
+    assert strat1.broker is cerebro.broker
+    assert strat0.executed == single[0][3]
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+
+
+class EquityStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        self.cross = btind.CrossOver(self.data.close,
+                                     btind.SMA(self.data, period=self.p.period))
+        self.records = list()
+
+    def prenext(self):
+        self.next()
+
+    def next(self):
+        self.records.append((self.data.datetime[0], self.broker.getcash(),
+                             self.broker.getvalue(), self.position.size))
+
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy()
+
+        elif self.cross < 0.0:
+            self.close()
+
+
+def check(strat, main=False):
+    import numpy as np
+
+    equity = strat.analyzers.equity
+    rows = equity.get_arrays()
+    assert rows.tolist() == [list(x) for x in strat.records]
+
+    df = equity.get_dataframe()
+    assert list(df.columns) == ['cash', 'value', 'position']
+    assert np.shares_memory(df.values, rows)  # no copy
+    assert df.index[0] == bt.num2date(rows[0, 0])
+
+    # the figures calculated one by one out of the recorded values
+    values = [x[2] for x in strat.records]
+    returns = [b / a - 1.0 for a, b in zip(values, values[1:])]
+    days = strat.records[-1][0] - strat.records[0][0]
+    factor = (len(values) - 1) * 365.0 / days
+
+    mean = math.fsum(returns) / len(returns)
+    stddev = math.sqrt(math.fsum((r - mean) ** 2 for r in returns) /
+                       (len(returns) - 1))
+    downside = math.sqrt(math.fsum(min(r, 0.0) ** 2 for r in returns) /
+                         len(returns))
+
+    peak, maxdd = values[0], 0.0
+    for value in values:
+        peak = max(peak, value)
+        maxdd = max(maxdd, 1.0 - value / peak)
+
+    annual = (values[-1] / values[0]) ** (365.0 / days) - 1.0
+
+    rets = equity.get_analysis()
+    if main:
+        print(dict(rets))
+
+    assert rets.len == len(values)
+    assert math.isclose(rets.factor, factor)
+    assert math.isclose(rets.totalreturn, values[-1] / values[0] - 1.0)
+    assert math.isclose(rets.annualreturn, annual)
+    assert math.isclose(rets.sharpe, mean / stddev * math.sqrt(factor))
+    assert math.isclose(rets.sortino, mean / downside * math.sqrt(factor))
+    assert math.isclose(rets.maxdrawdown, maxdd)
+    assert math.isclose(rets.calmar, annual / maxdd)
+
+
+def test_run(main=False):
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    cerebros = testcommon.runtest(datas, EquityStrategy,
+                                  analyzer=(bt.analyzers.EquityCurve,
+                                            dict(_name='equity')))
+    for cerebro in cerebros:
+        check(cerebro.runstrats[0][0], main=main)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
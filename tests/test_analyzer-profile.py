@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+class ProfileStrategy(bt.Strategy):
+    def __init__(self):
+        self.macd = btind.MACD()
+        self.cross = btind.CrossOver(self.data.close, btind.SMA(period=15))
+
+    def next(self):
+        if self.cross > 0.0:
+            self.buy()
+        elif self.cross < 0.0:
+            self.close()
+
+
+class FailStrategy(ProfileStrategy):
+    def next(self):
+        if len(self) > 50:
+            raise RuntimeError('failed run')
+
+
+def runprofile(main=False, **kwargs):
+    cerebro = bt.Cerebro(**kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(ProfileStrategy)
+    cerebro.addanalyzer(bt.analyzers.SQN)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    for runonce in [True, False]:
+        strat = runprofile(runonce=runonce)
+        strat2 = runprofile(runonce=runonce, profile=True)
+
+        # profiling must not change the results
+        assert strat.broker.getvalue() == strat2.broker.getvalue()
+        assert not hasattr(strat.analyzers, 'profile')
+
+        # and the wrappers are gone after the run
+        for obj in [strat2, strat2.macd, strat2.broker, strat2.data]:
+            assert 'next' not in vars(obj) and '_next' not in vars(obj)
+
+        rets = strat2.analyzers.profile.get_analysis()
+        if main:
+            strat2.analyzers.profile.print()
+
+        nbars = len(strat2.data)
+        assert rets.total > 0.0
+        assert rets.other >= 0.0
+        assert rets.preload['2006-day-001'].calls == 1
+        assert rets.broker.BackBroker.calls == nbars
+        assert rets.strategy.ProfileStrategy.calls == nbars
+        assert rets.notifications.ProfileStrategy.calls == nbars
+        for name in ['Broker', 'BuySell', 'Trades']:
+            assert rets.observers[name].calls == nbars
+
+        assert rets.analyzers.SQN.calls > 0
+        assert 'Profile' not in rets.analyzers
+
+        inds = rets.indicators
+        calls = 1 if runonce else nbars
+        assert inds.MACD.calls == calls
+        assert inds['MACD.ExponentialMovingAverage#1'].calls == calls
+        assert inds.CrossOver.cumtime >= inds.CrossOver.tottime
+        assert inds.CrossOver.cumtime >= inds['CrossOver.CrossUp'].cumtime
+
+
+def test_raise(main=False):
+    data = testcommon.getdata(0)
+    cerebro = bt.Cerebro(runonce=False, profile=True)
+    cerebro.adddata(data)
+    cerebro.addstrategy(FailStrategy)
+    try:
+        cerebro.run()
+    except RuntimeError:
+        pass
+    else:
+        assert False
+
+    # the wrappers are gone even if the run did not end
+    assert 'next' not in vars(data) and 'preload' not in vars(data)
+    assert 'next' not in vars(cerebro.broker)
+    assert cerebro._profiler is None
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_raise(main=True)
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+chkperiods = list(range(5, 45, 5))
+
+
+class PruneStrategy(bt.Strategy):
+    params = (('period', 15), ('stake', 1))
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy(size=self.p.stake)
+
+        elif self.cross < 0.0:
+            self.close()
+
+
+def test_bounds(main=False):
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    cerebros = testcommon.runtest(datas, PruneStrategy,
+                                  analyzer=(bt.analyzers.Pruner,
+                                            dict(_name='pruner',
+                                                 maxdrawdown=0.002)))
+    for cerebro in cerebros:
+        strat = cerebro.runstrats[0][0]
+        rets = strat.analyzers.pruner.get_analysis()
+        if main:
+            print(dict(rets))
+
+        assert rets.pruned and rets.reason == 'maxdrawdown'
+        assert rets.bars == len(strat)
+        assert rets.progress < 1.0 if cerebro._dopreload else \
+            rets.progress is None
+        assert rets.value == strat.broker.getvalue()
+        assert strat.analyzers.pruner.drawdown > 0.002
+
+    # a bound of the trial itself
+    cerebro = bt.Cerebro()
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.addstrategy(PruneStrategy)
+    cerebro.addanalyzer(bt.analyzers.Pruner, _name='pruner',
+                        bounds=[lambda p: p.progress >= 0.5 and 'halfway'])
+    strat = cerebro.run()[0]
+    rets = strat.analyzers.pruner.get_analysis()
+    assert rets.reason == 'halfway'
+    assert rets.bars == len(strat) == 128  # 1st bar past the half of 255
+    assert len(rets.checkpoints) == 2
+
+
+def runopt(history=None, **kwargs):
+    cerebro = bt.Cerebro(maxcpus=1, **kwargs)
+    cerebro.adddata(testcommon.getdata(0))
+    cerebro.optstrategy(PruneStrategy, period=chkperiods)
+    cerebro.addanalyzer(bt.analyzers.Pruner, _name='pruner',
+                        history=history, mintrials=2)
+    return [r[0].analyzers.pruner.get_analysis() for r in cerebro.run()]
+
+
+def test_median(main=False):
+    for runonce in [True, False]:
+        # the checkpoints of all trials run to the end
+        full = runopt(runonce=runonce)
+        assert not any(rets.pruned for rets in full)
+
+        # which ones the median rule stops, trial after trial
+        history = bt.analyzers.PruneHistory()
+        expected = list()
+        for rets in full:
+            refs = history.references('median', 4, mintrials=2)
+            values = rets.checkpoints
+            for i, (value, ref) in enumerate(zip(values, refs)):
+                if ref is not None and value < ref:
+                    values = values[:i + 1]
+                    break
+
+            final = value = rets.value if values == rets.checkpoints else None
+            history.add(values, final and final / 10000.0)
+            expected.append(values)
+
+        pruned = runopt(runonce=runonce, history=bt.analyzers.PruneHistory())
+        if main:
+            for period, rets in zip(chkperiods, pruned):
+                print(period, rets.reason, rets.progress, rets.checkpoints)
+
+        assert [rets.checkpoints for rets in pruned] == expected
+        assert any(rets.pruned for rets in pruned)
+        for rets, values, full_rets in zip(pruned, expected, full):
+            assert rets.pruned == (values != full_rets.checkpoints)
+            assert rets.reason == ('median' if rets.pruned else None)
+            if not rets.pruned:  # a stop does not leak to the next trial
+                assert rets.bars == full_rets.bars
+
+
+class StopStrategy(PruneStrategy):
+    def next(self):
+        if self.p.period == chkperiods[0] and len(self) == 50:
+            self.env.runstop()
+
+
+def test_runstop(main=False):
+    # runstop (unlike a prune) ends the whole optimization
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(maxcpus=1, runonce=runonce, optreturn=False)
+        cerebro.adddata(testcommon.getdata(0))
+        cerebro.optstrategy(StopStrategy, period=chkperiods)
+        lens = [len(r[0]) for r in cerebro.run()]
+        if main:
+            print(lens)
+
+        assert lens[0] == 50
+        assert all(x < 50 for x in lens[1:])
+
+
+if __name__ == '__main__':
+    test_bounds(main=True)
+    test_median(main=True)
+    test_runstop(main=True)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+
+TODATE = datetime.date(2006, 6, 30)  # checkpoint
+FROMDATE = datetime.date(2006, 7, 1)  # resume
+
+
+class RunStrategy(bt.Strategy):
+    '''Trades with market and limit orders and records the values seen on
+    each bar'''
+    def __init__(self):
+        self.sma = btind.SMA(period=30)
+        self.ema = btind.EMA(period=15)
+        self.highest = btind.Highest(self.data.high, period=10)
+        self.psar = btind.PSAR()
+        self.cross = btind.CrossOver(self.data.close, self.sma)
+        self.bars = list()
+        self.orders = list()
+
+    def notify_order(self, order):
+        if order.status in [order.Completed, order.Canceled, order.Expired]:
+            self.orders.append((order.ref, order.getstatusname(),
+                                order.executed.price))
+
+    def next(self):
+        self.bars.append((
+            self.data.datetime.date(0), len(self), len(self.sma),
+            self.sma[0], self.ema[0], self.highest[0], self.psar[0],
+            self.sma[-29], self.broker.getvalue(), self.broker.getcash(),
+            self.position.size,
+        ))
+
+        if self.cross > 0:
+            self.buy()
+            # stays pending for some bars
+            self.buy(exectype=bt.Order.Limit, price=self.data.close[0] * 0.97,
+                     valid=datetime.timedelta(days=10))
+        elif self.cross < 0 and self.position:
+            self.close()
+
+
+class LockStrategy(RunStrategy):
+    '''Holds an attribute which cannot be pickled and the first order, which
+    the broker holds too'''
+    def __init__(self):
+        super(LockStrategy, self).__init__()
+        self.lock = threading.Lock()
+        self.firstorder = None
+
+    def next(self):
+        super(LockStrategy, self).next()
+        if self.cross > 0 and self.firstorder is None:
+            self.firstorder = self.broker.orders[-1]
+
+
+def runcerebro(strategy=RunStrategy, cerebro=False, **kwargs):
+    cb = bt.Cerebro(preload=False, runonce=False, stdstats=True)
+    cb.adddata(testcommon.getdata(0, **kwargs.pop('dates', {})))
+    cb.addstrategy(strategy)
+    strat = cb.run(**kwargs)[0]
+    return (cb, strat) if cerebro else strat
+
+
+def relrefs(orders):
+    '''References counted from the first order of the run'''
+    first = orders[0][0]
+    return [(ref - first, status, price) for ref, status, price in orders]
+
+
+def test_run(main=False):
+    chkstrat = runcerebro()
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, 'run.ckpt')
+
+        # nothing to resume: the file doesn't exist yet
+        strat1 = runcerebro(dates=dict(todate=TODATE),
+                            checkpoint=filename, resume=filename)
+
+        strat2 = runcerebro(dates=dict(fromdate=FROMDATE), resume=filename)
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if main:
+        print(len(strat1.bars), len(strat2.bars), len(chkstrat.bars))
+        print(chkstrat.bars[-1])
+        print(strat2.bars[-1])
+
+    # the attributes of the strategy (ex: bars) are resumed as well
+    assert 30 < len(strat1.bars) < len(strat2.bars)
+    assert repr(strat2.bars[:len(strat1.bars)]) == repr(strat1.bars)
+    assert repr(strat2.bars) == repr(chkstrat.bars)  # nan != nan
+    # the references go on from those of the checkpoint
+    assert relrefs(strat2.orders) == relrefs(chkstrat.orders)
+    assert strat1.getposition().size  # open at the checkpoint
+
+    # the lines of the observers go on as well
+    assert (list(strat2.stats.broker.value.get(size=10)) ==
+            list(chkstrat.stats.broker.value.get(size=10)))
+
+
+def test_attributes(main=False):
+    tmpdir = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(tmpdir, 'run.ckpt')
+        cerebro, strat1 = runcerebro(LockStrategy, cerebro=True,
+                                     dates=dict(todate=TODATE),
+                                     checkpoint=filename)
+        strat2 = runcerebro(LockStrategy, dates=dict(fromdate=FROMDATE),
+                            resume=filename)
+
+        # not silently dropped, or an error if strict
+        try:
+            runcerebro(LockStrategy, dates=dict(todate=TODATE),
+                       checkpoint=filename, checkpointstrict=True)
+        except pickle.PicklingError:
+            pass
+        else:
+            assert False, 'lock pickled'
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if main:
+        print(cerebro.checkpointskipped)
+
+    assert cerebro.checkpointskipped == ['LockStrategy.lock']
+    assert strat2.lock is not strat1.lock  # the one of the new run
+
+    # the order of the strategy is (still) the one held by the broker
+    ref = strat1.firstorder.ref
+    assert strat2.firstorder.ref == ref
+    assert any(x is strat2.firstorder for x in strat2.broker.orders)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_attributes(main=True)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import random
+
+import testcommon
+
+import backtrader as bt
+from backtrader.utils import date2num, num2date, num2dates
+
+chkdatas = 1
+
+
+class DtStrategy(bt.Strategy):
+    '''Checks the memoized and bulk decoding against num2date'''
+    def next(self):
+        dtline = self.data.datetime
+        dt = dtline.datetime(0)
+        assert dt == num2date(dtline[0])
+        assert dtline.datetime(0) is dt  # memoized
+        assert dtline.date(0) == dt.date() and dtline.time(0) == dt.time()
+
+        dts = dtline.datetimes()
+        assert len(dts) == len(self.data) and dts[-1] == dt
+        if len(self.data) > 1:
+            assert dts[-2] == dtline.datetime(-1)
+
+    def stop(self):
+        dtline = self.data.datetime
+        dts = dtline.datetimes(ago=-1, size=3)
+        assert dts == [dtline.datetime(-i) for i in range(3, 0, -1)]
+
+
+def test_num2dates(main=False):
+    rnd = random.Random(1)
+    dt0 = datetime.datetime(2000, 1, 1)
+    nums = [date2num(dt0 + datetime.timedelta(seconds=rnd.randint(0, 10 ** 9)))
+            for i in range(1000)]
+    nums += [rnd.uniform(700000.0, 760000.0) for i in range(10000)]
+    assert num2dates(nums) == [num2date(x) for x in nums]
+
+
+def test_run(main=False):
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas, DtStrategy, exbar=False)
+
+
+if __name__ == '__main__':
+    test_num2dates(main=True)
+    test_run(main=True)
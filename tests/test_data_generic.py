@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+chkvals = [
+    ['4063.463000', '3644.444667', '3554.693333'],
+]
+
+chkmin = 30
+chkind = btind.SMA
+
+
+def getdata(index, **kwargs):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[index])
+    return bt.feeds.GenericCSVData(dataname=datapath,
+                                   dtformat='%Y-%m-%d',
+                                   fromdate=testcommon.FROMDATE,
+                                   todate=testcommon.TODATE,
+                                   **kwargs)
+
+
+class RecStrategy(bt.Strategy):
+    '''Records the values of each bar'''
+    def start(self):
+        self.bars = list()
+
+    def next(self):
+        self.bars.append(tuple(line[0] for line in self.data.lines))
+
+
+def test_run(main=False):
+    for bulkpreload in [True, False]:
+        datas = [getdata(i, bulkpreload=bulkpreload)
+                 for i in range(chkdatas)]
+        testcommon.runtest(datas,
+                           testcommon.TestStrategy,
+                           main=main,
+                           plot=main,
+                           chkind=chkind,
+                           chkmin=chkmin,
+                           chkvals=chkvals)
+
+    # whole file parsing against line by line parsing (missing field too)
+    cerebros = testcommon.runtest(getdata(0, openinterest=-1), RecStrategy,
+                                  preload=True, exbar=False)
+    chkcerebros = testcommon.runtest(
+        getdata(0, openinterest=-1, bulkpreload=False), RecStrategy,
+        preload=True, exbar=False)
+
+    for cerebro, chkcerebro in zip(cerebros, chkcerebros):
+        bars = cerebro.runstrats[0][0].bars
+        chkbars = chkcerebro.runstrats[0][0].bars
+        assert bars and repr(bars) == repr(chkbars)  # repr: nan == nan
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import io
+import os.path
+import shutil
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+from backtrader.feeds.journal import Journal, journalfiles, readjournal
+
+
+class RecStrategy(bt.Strategy):
+    '''Records the last values seen for each bar'''
+    def start(self):
+        self.bars = dict()
+
+    def next(self):
+        self.bars[len(self.data)] = tuple(line[0] for line in self.data.lines)
+
+
+def getbars():
+    # 1m bars over 3 UTC days, each one followed by an update in place
+    start = datetime.datetime(2024, 1, 1, 23, 0)
+    bars = list()
+    for i in range(1600):
+        dt = start + datetime.timedelta(minutes=i)
+        close = 100.0 + (i * 7) % 13
+        bars.append(dict(datetime=dt, open=close, high=close + 1.0,
+                         low=close - 1.0, close=close, volume=1.0))
+        bars.append(dict(bars[-1], close=close + 0.5, volume=2.0,
+                         update=True))
+
+    return bars
+
+
+def runlive(prefix):
+    data = bt.feeds.LiveQueueData(journal=prefix, qcheck=0.0,
+                                  timeframe=bt.TimeFrame.Minutes)
+    for bar in getbars():
+        data.qlive.put(bar)
+    data.qlive.put(None)
+
+    cerebro = bt.Cerebro()
+    cerebro.adddata(data)
+    cerebro.addstrategy(RecStrategy)
+    return cerebro.run()[0]
+
+
+def runreplay(prefix, preload):
+    cerebro = bt.Cerebro(preload=preload)
+    cerebro.adddata(bt.feeds.JournalData(dataname=prefix))
+    cerebro.addstrategy(RecStrategy)
+    return cerebro.run()[0]
+
+
+def test_run(main=False):
+    dirname = tempfile.mkdtemp()
+    prefix = os.path.join(dirname, 'BTCUSDT_1m')
+    try:
+        live = runlive(prefix)
+        assert len(journalfiles(prefix)) == 3  # daily rotation
+
+        header, columns = readjournal(prefix)
+        assert header['timeframe'] == bt.TimeFrame.Minutes
+        assert len(columns['datetime']) == 3200
+        assert sum(columns['update']) == 1600
+
+        # replays the bars as the strategy saw them once complete
+        chkbars = [live.bars[i] for i in sorted(live.bars)]
+        for preload in [True, False]:
+            replay = runreplay(prefix, preload)
+            bars = [replay.bars[i] for i in sorted(replay.bars)]
+            if main:
+                print('preload', preload, len(bars), bars[-1])
+
+            assert bars == chkbars
+
+        # a block cut short by a crash is ignored and then overwritten
+        last = journalfiles(prefix)[-1]
+        with io.open(last, 'ab') as f:
+            f.write(b'\x05\x00\x00\x00garbage')
+
+        assert len(readjournal(prefix)[1]['datetime']) == 3200
+
+        journal = Journal(prefix, columns=header['columns'])
+        journal.append(list(columns[x][-1] + 0.0001 * (x == 'datetime')
+                            for x in header['columns']))
+        journal.close()
+        assert len(readjournal(prefix)[1]['datetime']) == 3201
+
+        # a header cut short (crash while creating a file): no records, and
+        # the file is written again
+        dt = columns['datetime'][-1] + 1.0
+        journal = Journal(prefix, columns=header['columns'])
+        with io.open(journal.filename(int(dt)), 'wb') as f:
+            f.write(b'BTJRN')
+
+        assert len(readjournal(prefix)[1]['datetime']) == 3201
+        journal.append([dt] * len(header['columns']))
+        journal.close()
+        assert len(journalfiles(prefix)) == 4
+        assert len(readjournal(prefix)[1]['datetime']) == 3202
+    finally:
+        shutil.rmtree(dirname)
+
+
+def test_delay(main=False):
+    dirname = tempfile.mkdtemp()
+    prefix = os.path.join(dirname, 'delay')
+    columns = ['datetime', 'close']
+    day = bt.date2num(datetime.datetime(2024, 1, 1))
+    try:
+        # the 1st record is written at once, the next ones wait for the delay
+        journal = Journal(prefix, columns=columns, delay=3600.0)
+        for i in range(100):
+            journal.append([day + i / 1440.0, float(i)])
+            journal.flushdue()
+
+        assert len(readjournal(prefix)[1]['datetime']) == 1
+
+        journal.close()
+        assert len(readjournal(prefix)[1]['datetime']) == 100
+
+        # no delay: a block per record, as soon as it is appended
+        journal = Journal(prefix, columns=columns, delay=0.0)
+        journal.append([day + 0.5, 100.0])
+        assert len(readjournal(prefix)[1]['datetime']) == 101
+        journal.close()
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_delay(main=True)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+import threading
+import time
+
+import testcommon
+
+import backtrader as bt
+
+
+class RecStrategy(bt.Strategy):
+    '''Records the values of each bar and the data notifications'''
+    def start(self):
+        self.bars = list()
+        self.status = list()
+
+    def notify_data(self, data, status, *args, **kwargs):
+        self.status.append(data._getstatusname(status))
+
+    def next(self):
+        self.bars.append(tuple(line[0] for line in self.data.lines))
+
+
+class TimeStrategy(RecStrategy):
+    '''Records when each bar is delivered'''
+    def start(self):
+        super(TimeStrategy, self).start()
+        self.times = list()
+
+    def next(self):
+        self.times.append(time.time())
+
+
+class ThreadData(bt.feeds.LiveQueueData):
+    '''Delivers the given bars from a thread, after a pause'''
+    params = (('bars', ()), ('pause', 0.3), ('lapse', 0.001))
+
+    def _startlive(self):
+        self.timeouts = 0
+        self._thread = threading.Thread(target=self._produce)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _stoplive(self):
+        self._thread.join()
+
+    def _produce(self):
+        time.sleep(self.p.pause)  # nothing to load during the pause
+        half = len(self.p.bars) // 2
+        for i, bar in enumerate(self.p.bars):
+            if i == half:
+                self.qlive.put(self.CONNBROKEN)  # reconnection
+                self.qlive.put(self.p.bars[i - 1])  # seen again: discarded
+
+            self.qlive.put(bar)
+            time.sleep(self.p.lapse)
+
+        self.qlive.put(None)
+
+    def _load(self):
+        ret = super(ThreadData, self)._load()
+        if ret is None:
+            self.timeouts += 1
+
+        return ret
+
+
+def test_run(main=False):
+    cerebro = testcommon.runtest(testcommon.getdata(0), RecStrategy,
+                                 runonce=True, preload=True, exbar=False)
+    chkbars = cerebro[0].runstrats[0][0].bars
+    names = cerebro[0].datas[0].getlinealiases()
+    bars = [dict(zip(names, bar)) for bar in chkbars]
+
+    cerebro = bt.Cerebro()
+    data = ThreadData(bars=bars, timeframe=bt.TimeFrame.Days)
+    cerebro.adddata(data)
+    cerebro.addstrategy(RecStrategy)
+    start = time.time()
+    strat = cerebro.run()[0]
+    if main:
+        print('time', time.time() - start, 'timeouts', data.timeouts)
+        print(strat.status)
+
+    assert strat.bars == chkbars
+    # waiting on the queue during the pause instead of spinning
+    assert data.timeouts <= 2
+    assert strat.status[-1] == 'DISCONNECTED'
+    assert 'LIVE' in strat.status
+    assert strat.status.index('LIVE') < strat.status.index('CONNBROKEN')
+
+
+class RingData(ThreadData):
+    '''Reads the bars from a ring buffer shared with other datas'''
+    params = (('group', None),)
+
+    def __init__(self):
+        self.qlive = bt.feeds.RingQueue(maxlen=4, group=self.p.group)
+
+    def _startlive(self):
+        self.timeouts = 0
+        self._thread = None
+
+    def _stoplive(self):
+        pass
+
+
+def test_ring(main=False):
+    q = bt.feeds.RingQueue(maxlen=3)
+    for i in range(5):
+        q.put(i)
+    assert q.qsize() == 3 and [q.get() for i in range(3)] == [2, 3, 4]
+
+    start = time.time()
+    try:
+        q.get(timeout=0.1)
+    except bt.utils.py3.queue.Empty:
+        assert time.time() - start >= 0.1
+    else:
+        assert False
+
+    # a bar of the 2nd data wakes up the wait on the queue of the 1st
+    group = bt.feeds.RingGroup()
+    datas = [RingData(group=group, qcheck=5.0) for i in range(2)]
+    puts = list()
+
+    def produce():
+        for data in datas:
+            data.qlive.put(dict(datetime=729999.0, close=-1.0))
+
+        for i in range(5):
+            time.sleep(0.05)
+            puts.append(time.time())
+            datas[1].qlive.put(dict(datetime=730000.0 + i, close=float(i)))
+
+        time.sleep(0.5)
+        for data in datas:
+            data.qlive.put(None)
+
+    cerebro = bt.Cerebro()
+    for data in datas:
+        cerebro.adddata(data)
+
+    cerebro.addstrategy(TimeStrategy)
+    thread = threading.Thread(target=produce)
+    thread.start()
+    strat = cerebro.run()[0]
+    thread.join()
+
+    delays = [b - a for a, b in zip(puts, strat.times[1:])]
+    if main:
+        print('delays', delays)
+
+    assert list(datas[1].close.array) == [-1.0] + [float(i) for i in range(5)]
+    assert max(delays) < 0.25  # not waiting for the qcheck of the 1st data
+
+
+class AggStrategy(bt.Strategy):
+    '''Records the forming 5m bar and an indicator on it'''
+    def __init__(self):
+        self.sma = bt.indicators.SMA(self.data1, period=2)
+
+    def start(self):
+        self.seen = list()
+
+    def next(self):
+        self.seen.append((len(self.data1), self.data1.close[0]))
+
+
+def test_aggregate(main=False):
+    agg = bt.feeds.LiveAggregator(group=bt.feeds.RingGroup())
+    d1 = agg.getdata(bt.TimeFrame.Minutes, 1)
+    d5 = agg.getdata(bt.TimeFrame.Minutes, 5, partial=True)
+    d15 = agg.getdata(bt.TimeFrame.Minutes, 15)
+
+    # 3 trades a minute during 30 minutes, all ingested in one pass
+    start = datetime.datetime(2024, 1, 1)
+    prices = [100.0 + (i * 7) % 13 for i in range(90)]
+    for i, price in enumerate(prices):
+        agg.trade(start + datetime.timedelta(seconds=20 * i), price, 1.0)
+
+    agg.flush(start + datetime.timedelta(minutes=30))
+    agg.put(None)
+
+    cerebro = bt.Cerebro()
+    for data in (d1, d5, d15):
+        cerebro.adddata(data)
+
+    cerebro.addstrategy(AggStrategy)
+    strat = cerebro.run()[0]
+    if main:
+        print(len(strat.seen), strat.seen[-5:])
+
+    closes5 = [prices[i + 14] for i in range(0, 90, 15)]
+    assert list(d1.close.array) == [prices[i + 2] for i in range(0, 90, 3)]
+    assert list(d5.close.array) == closes5  # updated in place
+    assert list(d5.volume.array) == [15.0] * 6
+    assert list(d5.high.array) == [max(prices[i:i + 15])
+                                   for i in range(0, 90, 15)]
+    assert list(d15.close.array) == [prices[44], prices[89]]
+    assert d5.datetime.datetime(0) == start + datetime.timedelta(minutes=30)
+
+    # the strategy sees the forming bar before the 5m length grows
+    assert [n for n, close in strat.seen].count(6) > 1
+    assert strat.sma[0] == (closes5[-1] + closes5[-2]) / 2.0
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_ring(main=True)
+    test_aggregate(main=True)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import array
+import os
+import os.path
+import pickle
+import tempfile
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.feeds.memmap import readheader, writedata, _MappedArray
+
+chkdatas = 1
+chkvals = [
+    ['4063.463000', '3644.444667', '3554.693333'],
+]
+
+chkmin = 30
+chkind = btind.SMA
+
+
+class RecStrategy(bt.Strategy):
+    '''Records the values of each bar'''
+    def start(self):
+        self.bars = list()
+
+    def next(self):
+        self.bars.append(tuple(line[0] for line in self.data.lines))
+
+
+def getmemmap(filename, **kwargs):
+    return bt.feeds.MemMapData(dataname=filename,
+                               fromdate=testcommon.FROMDATE,
+                               todate=testcommon.TODATE,
+                               **kwargs)
+
+
+def test_run(main=False):
+    fd, filename = tempfile.mkstemp(suffix='.btmm')
+    os.close(fd)
+
+    try:
+        # convert the csv data
+        cerebro = testcommon.runtest(testcommon.getdata(0), RecStrategy,
+                                     runonce=True, preload=True, exbar=False)
+        chkbars = cerebro[0].runstrats[0][0].bars
+        writedata(filename, cerebro[0].datas[0])
+
+        header = readheader(filename)
+        assert header['size'] == len(chkbars)
+        assert header['timeframe'] == bt.TimeFrame.Days
+
+        datas = [getmemmap(filename)]
+        testcommon.runtest(datas,
+                           testcommon.TestStrategy,
+                           main=main,
+                           plot=main,
+                           chkind=chkind,
+                           chkmin=chkmin,
+                           chkvals=chkvals)
+
+        for preload in [True, False]:
+            cerebros = testcommon.runtest(getmemmap(filename), RecStrategy,
+                                          preload=preload, exbar=False)
+            for cerebro in cerebros:
+                assert cerebro.runstrats[0][0].bars == chkbars
+    finally:
+        os.remove(filename)
+
+
+class ViewStrategy(bt.Strategy):
+    params = (('period', 10),)
+
+    def __init__(self):
+        self.sma = btind.SMA(period=self.p.period)
+
+    def stop(self):
+        array = self.data.close.array
+        self.mapped = isinstance(array, _MappedArray)
+
+
+def runviews(filename, **kwargs):
+    cerebro = bt.Cerebro(runonce=True, preload=True, stdstats=False)
+    data = getmemmap(filename)
+    if kwargs.pop('filter', False):
+        data.addfilter(bt.filters.SessionFilter)
+
+    cerebro.adddata(data)
+    cerebro.addstrategy(ViewStrategy)
+    return cerebro.run(**kwargs)
+
+
+def test_views(main=False):
+    fd, filename = tempfile.mkstemp(suffix='.btmm')
+    os.close(fd)
+
+    try:
+        cerebro = testcommon.runtest(testcommon.getdata(0), RecStrategy,
+                                     runonce=True, preload=True, exbar=False)
+        writedata(filename, cerebro[0].datas[0])
+        chkclose = list(cerebro[0].datas[0].close.array)
+
+        # the line points into the mapping, not into a copy
+        strat = runviews(filename)[0]
+        close = strat.data.close.array
+        assert strat.mapped and close._mview.readonly
+        assert list(close) == chkclose
+
+        # pickled as its location: mapped again, the values are not copied
+        line = pickle.loads(pickle.dumps(strat.data.close))
+        assert isinstance(line.array, _MappedArray)
+        assert list(line.array) == chkclose
+
+        # other memoryviews are not pickled
+        try:
+            pickle.dumps(memoryview(b'12345678').cast('d'))
+        except TypeError:
+            pass
+        else:
+            assert False, 'memoryview pickled'
+
+        # with filters the bars go one by one to a copy
+        strat = runviews(filename, filter=True)[0]
+        assert not strat.mapped
+        assert isinstance(strat.data.close.array, array.array)
+        assert list(strat.data.close.array) == chkclose
+
+        # the workers of an optimization get the mapping
+        for optdatas in [False, True]:
+            cerebro = bt.Cerebro(maxcpus=2, optreturn=False, stdstats=False,
+                                 optdatas=optdatas)
+            cerebro.adddata(getmemmap(filename))
+            cerebro.optstrategy(ViewStrategy, period=[10, 20])
+            results = cerebro.run()
+            assert [strats[0].mapped for strats in results] == [True, True]
+    finally:
+        os.remove(filename)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_views(main=True)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import os.path
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+try:
+    import pandas
+except ImportError:
+    pandas = None  # the feed cannot be tested
+
+chkdatas = 1
+chkvals = [
+    ['4063.463000', '3644.444667', '3554.693333'],
+]
+
+chkmin = 30
+chkind = btind.SMA
+
+
+def getdata(index):
+    datapath = os.path.join(testcommon.modpath, testcommon.dataspath,
+                            testcommon.datafiles[index])
+    df = pandas.read_csv(datapath, parse_dates=[0], index_col=0)
+    return bt.feeds.PandasData(dataname=df,
+                               fromdate=testcommon.FROMDATE,
+                               todate=testcommon.TODATE)
+
+
+class RecStrategy(bt.Strategy):
+    '''Records the date and prices of each bar'''
+    def start(self):
+        self.bars = list()
+
+    def next(self):
+        # the csv feed moves daily bars to the end of the session: use date
+        self.bars.append((self.data.datetime.date(0),) + tuple(
+            getattr(self.data, alias)[0]
+            for alias in ['open', 'high', 'low', 'close', 'volume']))
+
+
+def test_run(main=False):
+    if pandas is None:
+        return
+
+    datas = [getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas,
+                       testcommon.TestStrategy,
+                       main=main,
+                       plot=main,
+                       chkind=chkind,
+                       chkmin=chkmin,
+                       chkvals=chkvals)
+
+    # preloaded in bulk and loaded bar by bar against the csv reference
+    for preload in [True, False]:
+        cerebros = testcommon.runtest(getdata(0), RecStrategy,
+                                      preload=preload, exbar=False)
+        chkcerebros = testcommon.runtest(testcommon.getdata(0), RecStrategy,
+                                         preload=preload, exbar=False)
+        for cerebro, chkcerebro in zip(cerebros, chkcerebros):
+            bars = cerebro.runstrats[0][0].bars
+            assert bars and bars == chkcerebro.runstrats[0][0].bars
+
+
+if __name__ == '__main__':
+    test_run(main=True)
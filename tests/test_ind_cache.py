@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+
+
+class StateIndicator(bt.Indicator):
+    '''Calculated through next, with a state outside of its lines'''
+    lines = ('value',)
+
+    def __init__(self):
+        self.seen = 0
+
+    def next(self):
+        self.seen += 1
+        self.lines.value[0] = self.data[0] * self.seen
+
+
+class CacheStrategy(bt.Strategy):
+    params = (('period', 15), ('buyonly', False))
+
+    def __init__(self):
+        self.rsi = btind.RSI(self.data, period=14)
+        self.macd = btind.MACD(self.data)
+        self.ema = btind.EMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, self.ema)
+        self.rsiema = btind.EMA(self.rsi, period=self.p.period)
+        self.stoch = btind.Stochastic(self.data)
+        self.psar = btind.PSAR(self.data)
+        self.state = StateIndicator(self.data)
+
+    def next(self):
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy()
+
+        elif self.cross < 0.0 and not self.p.buyonly:
+            self.close()
+
+
+def reducer(strat):
+    # values of all indicators at each bar and result of the run
+    # the sub-indicators (k, d) of a cached indicator are delivered too
+    inds = [strat.rsi, strat.macd.macd, strat.macd.signal, strat.ema,
+            strat.cross, strat.rsiema, strat.stoch, strat.stoch.k,
+            strat.stoch.d, strat.psar, strat.state]
+    vals = [tuple(x if x == x else None for x in ind.array)  # NaN != NaN
+            for ind in inds]
+    # stateful indicators are always calculated
+    status = [(x.sar, x.af) for x in strat.psar._status] + [strat.state.seen]
+    return (strat.p.period, strat.p.buyonly, strat.broker.getvalue(), vals,
+            status)
+
+
+def runopt(**kwargs):
+    cerebro = bt.Cerebro(optreducer=reducer, maxcpus=1, **kwargs)
+    for i in range(chkdatas):
+        cerebro.adddata(testcommon.getdata(i))
+
+    cerebro.optstrategy(CacheStrategy, period=[10, 15], buyonly=[False, True])
+    return cerebro.run()
+
+
+def test_run(main=False):
+    results = runopt()
+
+    cache = bt.IndicatorCache()
+    assert runopt(indcache=cache) == results
+    # rsi, macd and the sub-indicators are calculated once, ema and cross
+    # once per period
+    assert cache.hits > 0
+    misses = cache.misses
+
+    # new datas (identical values) on a new cerebro: nothing calculated
+    assert runopt(indcache=cache) == results
+    assert cache.misses == misses
+
+    assert runopt(indcache=cache, npbuffers=True) == results
+    assert cache.misses == misses
+
+    # the process wide cache
+    assert runopt(indcache=True) == results
+    assert bt.IndicatorCache.default.hits > 0
+
+    if main:
+        print(cache.hits, cache.misses, len(cache))
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import datetime
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+chkvals = [
+    ['9.512782', '-3.083263', '5.950714'],
+    ['3975.512571', '3650.476000', '3526.363714'],
+    ['4156.255429', '3591.894000', '3639.427286'],
+    ['0.771531', '0.153276', '0.294045'],
+]
+
+chkmin = 20
+chkind = btind.RollingLinReg
+
+
+def test_run(main=False):
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas,
+                       testcommon.TestStrategy,
+                       main=main,
+                       plot=main,
+                       chkind=chkind,
+                       chkmin=chkmin,
+                       chkvals=chkvals)
+
+
+class PeriodStrategy(bt.Strategy):
+    params = (('ind', chkind), ('period', 1),)
+
+    def __init__(self):
+        self.p.ind(period=self.p.period)
+
+
+def test_period(main=False):
+    # no regression over a single bar, in any mode
+    for ind in [chkind, btind.LinRegChannel]:
+        for runonce in [True, False]:
+            cerebro = bt.Cerebro(runonce=runonce)
+            cerebro.adddata(testcommon.getdata(0))
+            cerebro.addstrategy(PeriodStrategy, ind=ind)
+            try:
+                cerebro.run()
+            except ValueError:
+                pass
+            else:
+                assert False, 'period 1 accepted'
+
+
+class ShortStrategy(bt.Strategy):
+    def __init__(self):
+        self.ind = chkind(period=chkmin)
+
+
+def test_short(main=False):
+    # fewer bars than the period: no values and no growth of the lines
+    for runonce in [True, False]:
+        cerebro = bt.Cerebro(runonce=runonce)
+        cerebro.adddata(testcommon.getdata(
+            0, todate=datetime.datetime(2006, 1, 9)))
+        cerebro.addstrategy(ShortStrategy)
+        strat = cerebro.run()[0]
+        if main:
+            print(runonce, len(strat.data), len(strat.ind.slope.array))
+
+        assert len(strat.data) == 5
+        for line in strat.ind.lines:
+            assert len(line.array) == len(strat.data.close.array)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_period(main=True)
+    test_short(main=True)
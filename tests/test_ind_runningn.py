@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import math
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.indicators.basicops import OperationN
+
+chkdatas = 1
+
+# Indicators with running kernels and the function they must match
+chkinds = [
+    (btind.SumN, math.fsum),
+    (btind.Highest, max),
+    (btind.Lowest, min),
+    (btind.AnyN, any),
+    (btind.AllN, all),
+]
+
+chkperiods = [1, 2, 5, 30]
+
+
+class FuncN(OperationN):
+    '''Applies the function to the whole period on each bar'''
+    lines = ('funcn',)
+    params = (('chkfunc', None),)
+
+    def __init__(self):
+        self.func = self.p.chkfunc
+        super(FuncN, self).__init__()
+
+
+class RunningStrategy(bt.Strategy):
+    params = dict(main=False)
+
+    def __init__(self):
+        close = self.data.close
+        diff = close - btind.SMA(close, period=3)
+        sources = [
+            close,
+            bt.If(diff > 20.0, float('NaN'), diff),  # NaN in the periods
+            diff > 0.0,  # boolean values
+        ]
+
+        self.pairs = list()
+        for src in sources:
+            for ind, func in chkinds:
+                for period in chkperiods:
+                    self.pairs.append((ind(src, period=period),
+                                       FuncN(src, period=period,
+                                             chkfunc=func)))
+
+    def next(self):
+        for ind, chk in self.pairs:
+            v, chkv = ind[0], chk[0]
+            if self.p.main and not math.isclose(v, chkv, rel_tol=1e-9):
+                print(ind.__class__.__name__, ind.p.period, v, chkv)
+
+            if math.isnan(chkv):
+                assert math.isnan(v)
+            else:
+                assert math.isclose(v, chkv, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def test_run(main=False):
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas, RunningStrategy, main=main)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import pickle
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # numpy buffers cannot be tested
+
+chkdatas = 1
+chkvals = [
+    ['4063.463000', '3644.444667', '3554.693333'],
+]
+
+chkmin = 30
+chkind = btind.SMA
+
+
+class GetStrategy(bt.Strategy):
+    params = dict(size=10)
+
+    def __init__(self):
+        self.sma = btind.SMA(self.data, period=self.p.size)
+
+    def next(self):
+        if len(self.data) < self.p.size:
+            return
+
+        window = self.data.close.get(size=self.p.size)
+        assert isinstance(window, np.ndarray)
+        assert not window.flags.writeable
+        assert window[-1] == self.data.close[0]
+        assert abs(window.mean() - self.sma[0]) < 1e-9
+
+
+def test_buffers(main=False):
+    if np is None:
+        return
+
+    from backtrader.utils.npbuffer import NumPyBuffer, NumPyRingBuffer
+
+    buf = NumPyBuffer(capacity=2)
+    for i in range(5):
+        buf.append(float(i))
+
+    view = buf[1:3]
+    for i in range(5, 10):  # forces a reallocation, the view must be kept
+        buf.append(float(i))
+
+    assert list(view) == [1.0, 2.0]
+    assert len(buf) == 10 and buf[-1] == 9.0 and buf[0] == 0.0
+    for i in range(5):
+        buf.pop()
+
+    assert len(buf) == 5
+
+    buf[0] = 10.0
+    assert buf.tolist() == [10.0, 1.0, 2.0, 3.0, 4.0]
+    assert not buf[:].flags.writeable
+
+    ring = NumPyRingBuffer(maxlen=3)
+    for i in range(200):  # several compactions of the storage
+        ring.append(float(i))
+
+    assert len(ring) == 3 and ring.tolist() == [197.0, 198.0, 199.0]
+    assert ring[0] == 197.0 and ring[-1] == 199.0
+    assert ring.pop() == 199.0 and ring.tolist() == [197.0, 198.0]
+
+    ring2 = pickle.loads(pickle.dumps(ring))
+    assert ring2.maxlen == 3 and ring2.tolist() == ring.tolist()
+
+    try:
+        ring[5]
+    except IndexError:
+        pass
+    else:
+        assert False  # pragma: no cover
+
+
+def test_run(main=False):
+    if np is None:
+        return
+
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas,
+                       testcommon.TestStrategy,
+                       main=main,
+                       plot=main,
+                       chkind=chkind,
+                       chkmin=chkmin,
+                       chkvals=chkvals,
+                       npbuffers=True)
+
+    datas = [testcommon.getdata(i) for i in range(chkdatas)]
+    testcommon.runtest(datas, GetStrategy, npbuffers=True)
+
+
+if __name__ == '__main__':
+    test_buffers(main=True)
+    test_run(main=True)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+
+class ExecValue(bt.Analyzer):
+    def stop(self):
+        self.rets['value'] = round(self.strategy.broker.getvalue(), 2)
+
+
+class ExecStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def start(self):
+        self.broker.setcommission(commission=2.0, mult=10.0, margin=1000.0)
+
+    def next(self):
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy()
+
+        elif self.cross < 0.0:
+            self.close()
+
+
+def runopt(executor, **kwargs):
+    cerebro = bt.Cerebro(optexecutor=executor, **kwargs)
+    for i in range(chkdatas):
+        cerebro.adddata(testcommon.getdata(i))
+
+    cerebro.optstrategy(ExecStrategy, period=range(5, 11))
+    cerebro.addanalyzer(ExecValue)
+    results = cerebro.run()
+    return [(r[0].params.period, r[0].analyzers[0].get_analysis()['value'])
+            for r in results]
+
+
+def test_run(main=False):
+    chkresults = runopt(None, maxcpus=1)  # in this process
+
+    with bt.ProcessExecutor(processes=2, chunksize=2) as executor:
+        assert runopt(executor) == chkresults
+        pool = executor._pool
+        assert runopt(executor, optdatas=False) == chkresults
+        assert executor._pool is pool  # reused across runs
+
+    assert executor._pool is None
+
+    executor = bt.ProcessExecutor(processes=2, ordered=False)
+    assert sorted(runopt(executor, optreturn=False)) == chkresults
+    executor.close()
+
+    with bt.ThreadExecutor(processes=2) as executor:
+        assert runopt(executor) == chkresults
+
+    if main:
+        print(chkresults)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
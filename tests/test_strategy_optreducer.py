@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+
+chkdatas = 1
+
+
+class ReducerStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy()
+
+        elif self.cross < 0.0:
+            self.close()
+
+
+def reducer(strat):
+    return (strat.p.period, round(strat.broker.getvalue(), 2))
+
+
+def runopt(**kwargs):
+    cerebro = bt.Cerebro(optreducer=reducer, **kwargs)
+    for i in range(chkdatas):
+        cerebro.adddata(testcommon.getdata(i))
+
+    cerebro.optstrategy(ReducerStrategy, period=range(5, 11))
+
+    cbresults = list()
+    cerebro.optcallback(cbresults.append)
+    results = cerebro.run()
+    assert results == cbresults
+    return results
+
+
+def test_run(main=False):
+    results = runopt(maxcpus=1)
+    assert [r[0][0] for r in results] == list(range(5, 11))
+    assert all(isinstance(r[0][1], float) for r in results)
+
+    assert runopt(maxcpus=2) == results
+    assert runopt(maxcpus=2, optreturn=False) == results
+    if main:
+        print(results)
+
+
+if __name__ == '__main__':
+    test_run(main=True)
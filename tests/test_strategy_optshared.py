@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8; py-indent-offset:4 -*-
+###############################################################################
+#
+# Copyright (C) 2015-2023 Daniel Rodriguez
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+###############################################################################
+from __future__ import (absolute_import, division, print_function,
+                        unicode_literals)
+
+import testcommon
+
+import backtrader as bt
+import backtrader.indicators as btind
+from backtrader.utils import sharedlines
+
+chkdatas = 1
+
+
+class SharedValue(bt.Analyzer):
+    def stop(self):
+        self.rets['value'] = self.strategy.broker.getvalue()
+
+
+class SharedStrategy(bt.Strategy):
+    params = (('period', 15),)
+
+    def __init__(self):
+        sma = btind.SMA(self.data, period=self.p.period)
+        self.cross = btind.CrossOver(self.data.close, sma)
+
+    def next(self):
+        if not self.position.size:
+            if self.cross > 0.0:
+                self.buy()
+
+        elif self.cross < 0.0:
+            self.close()
+
+
+def getvalues(optdatas, optreturn=True):
+    cerebro = bt.Cerebro(maxcpus=2, optdatas=optdatas, optreturn=optreturn)
+    for i in range(chkdatas):
+        cerebro.adddata(testcommon.getdata(i))
+
+    cerebro.optstrategy(SharedStrategy, period=range(5, 11))
+    cerebro.addanalyzer(SharedValue)
+    results = cerebro.run()
+
+    # the datas of the main process are usable again
+    assert len(cerebro.datas[0].close.array) == 255
+
+    if not optreturn:  # the strategies carry (local copies of) the datas
+        for r in results:
+            assert r[0].data.close.array[-1] == cerebro.datas[0].close[0]
+
+    return [r[0].analyzers[0].get_analysis()['value'] for r in results]
+
+
+def test_run(main=False):
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        return  # python < 3.8
+
+    values = getvalues(optdatas=True)
+    assert getvalues(optdatas='shared') == values
+    assert getvalues(optdatas='shared', optreturn=False) == values
+    if main:
+        print(values)
+
+
+def getvalue(strat):
+    return strat.broker.getvalue()
+
+
+def test_detach(main=False):
+    # the lines are only copied if the results carry the datas
+    detached = list()
+
+    def detach(lines):
+        detached.append(lines)
+
+    orig, sharedlines.detach = sharedlines.detach, detach
+    try:
+        for optreducer in [None, getvalue]:
+            del detached[:]
+            with bt.ThreadExecutor(processes=1) as executor:
+                cerebro = bt.Cerebro(optreturn=False, optreducer=optreducer,
+                                     optexecutor=executor)
+                cerebro.adddata(testcommon.getdata(0))
+                cerebro.optstrategy(SharedStrategy, period=range(5, 7))
+                cerebro.run()
+
+            if main:
+                print(optreducer, len(detached))
+
+            assert bool(detached) == (optreducer is None)
+    finally:
+        sharedlines.detach = orig
+
+
+if __name__ == '__main__':
+    test_run(main=True)
+    test_detach(main=True)
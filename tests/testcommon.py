@@ -68,6 +68,7 @@ def runtest(datas,
             maxcpus=1,
             writer=None,
             analyzer=None,
+            npbuffers=False,
             **kwargs):
 
     runonces = [True, False] if runonce is None else [runonce]
@@ -81,7 +82,8 @@ def runtest(datas,
                 cerebro = bt.Cerebro(runonce=ronce,
                                      preload=prload,
                                      maxcpus=maxcpus,
-                                     exactbars=exbar)
+                                     exactbars=exbar,
+                                     npbuffers=npbuffers)
 
                 if kwargs.get('main', False):
                     print('prload {} / ronce {} exbar {}'.format(
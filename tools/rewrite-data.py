@@ -29,16 +29,27 @@ import sys
 
 
 import backtrader as bt
+from backtrader.feeds.memmap import writedata
 from backtrader.utils.py3 import bytes
 
 
+def PandasCSVData(dataname, **kwargs):
+    '''Reads a csv file with pandas (1st column is the datetime index) and
+    delivers it as PandasData'''
+    import pandas  # keep the import very local
+
+    df = pandas.read_csv(dataname, index_col=0, parse_dates=True)
+    return bt.feeds.PandasData(dataname=df, **kwargs)
+
+
 DATAFORMATS = dict(
     btcsv=bt.feeds.BacktraderCSVData,
+    genericcsv=bt.feeds.GenericCSVData,
+    pandascsv=PandasCSVData,
+    memmap=bt.feeds.MemMapData,
     vchartcsv=bt.feeds.VChartCSVData,
     vchart=bt.feeds.VChartData,
-    vcdata=bt.feeds.VCData,
     vcfile=bt.feeds.VChartFile,
-    ibdata=bt.feeds.IBData,
     sierracsv=bt.feeds.SierraChartCSVData,
     mt4csv=bt.feeds.MT4CSVData,
     yahoocsv=bt.feeds.YahooFinanceCSVData,
@@ -46,6 +57,11 @@ DATAFORMATS = dict(
     yahoo=bt.feeds.YahooFinanceData,
 )
 
+# feeds which depend on packages which may not be installed
+for fmt, clsname in (('vcdata', 'VCData'), ('ibdata', 'IBData')):
+    if hasattr(bt.feeds, clsname):
+        DATAFORMATS[fmt] = getattr(bt.feeds, clsname)
+
 
 class RewriteStrategy(bt.Strategy):
     params = (
@@ -93,6 +109,16 @@ class RewriteStrategy(bt.Strategy):
         self.f.write(bytes(txt))
 
 
+class MemMapRewriteStrategy(bt.Strategy):
+    params = (
+        ('outfile', None),
+    )
+
+    def stop(self):
+        # the data has been entirely seen, write it in one go
+        writedata(self.p.outfile, self.data)
+
+
 def runstrat(pargs=None):
     args = parse_args(pargs)
 
@@ -119,13 +145,22 @@ def runstrat(pargs=None):
         todate = datetime.datetime.strptime(args.todate, fmtstr)
         dfkwargs['todate'] = todate
 
+    if args.dargs:
+        dfkwargs.update(eval('dict(' + args.dargs + ')'))
+
     dfcls = DATAFORMATS[args.format]
     data = dfcls(dataname=args.infile, **dfkwargs)
     cerebro.adddata(data)
 
-    cerebro.addstrategy(RewriteStrategy,
-                        separator=args.separator,
-                        outfile=args.outfile)
+    if args.outformat == 'memmap':
+        if args.outfile is None:
+            raise ValueError('An output file is needed for memmap')
+
+        cerebro.addstrategy(MemMapRewriteStrategy, outfile=args.outfile)
+    else:
+        cerebro.addstrategy(RewriteStrategy,
+                            separator=args.separator,
+                            outfile=args.outfile)
 
     cerebro.run(stdstats=False)
 
@@ -141,7 +176,8 @@ def runstrat(pargs=None):
 def parse_args(pargs=None):
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
-        description='Rewrite formats to BacktraderCSVData format')
+        description=('Rewrite formats to BacktraderCSVData format or to the '
+                     'memory mapped binary format (MemMapData)'))
 
     parser.add_argument('--format', '-fmt', required=False,
                         choices=DATAFORMATS.keys(),
@@ -154,6 +190,17 @@ def parse_args(pargs=None):
     parser.add_argument('--outfile', '-o', default=None, required=False,
                         help='File to write to')
 
+    parser.add_argument('--outformat', '-ofmt', required=False,
+                        choices=['btcsv', 'memmap'], default='btcsv',
+                        help='Format of the output')
+
+    parser.add_argument('--dargs', '-da', required=False, default='',
+                        metavar='kwargs',
+                        help=('kwargs in key=value format for the data feed, '
+                              'for example:\n'
+                              '\n'
+                              '  --dargs dtformat="%%Y-%%m-%%d",time=1\n'))
+
     parser.add_argument('--fromdate', '-f', required=False,
                         help='Starting date in YYYY-MM-DD format')
 